@@ -0,0 +1,338 @@
+from collections import deque
+from typing import Callable, Iterable, List, NamedTuple, Optional, Tuple
+import numpy as np
+
+from community_quality import modularity
+from csr_graph import CSRGraph
+
+
+# Smallest modularity gain (in edge-weight units) that justifies moving a node
+_MIN_GAIN = 1e-10
+
+# Adjacency entries gathered per block by the streaming kernels
+_BLOCK_ENTRIES = 1 << 22
+
+
+class CommunityResult(NamedTuple):
+    """Partition found by ``louvain`` or ``leiden``.
+    
+    ``labels[i]`` is the community of node ``i``. Communities are numbered by
+    decreasing size, with ties broken by their smallest node index, so the
+    same seed always yields the same labels. ``modularity`` is evaluated at
+    the ``resolution`` that was optimized; ``levels`` counts aggregation
+    levels (propagation sweeps for label propagation).
+    """
+    labels: np.ndarray
+    modularity: float
+    levels: int
+    method: str
+    resolution: float
+
+
+class _Level(NamedTuple):
+    """Weighted graph of one aggregation level.
+    
+    The CSR adjacency has no self loops. Internal weight is kept in ``loops``
+    (each edge counted once), and ``degree`` includes twice the loop weight.
+    """
+    indptr: np.ndarray
+    indices: np.ndarray
+    weights: np.ndarray
+    loops: np.ndarray
+    degree: np.ndarray
+    
+    @property
+    def num_nodes(self) -> int:
+        return len(self.degree)
+
+
+def _base_level(csr: CSRGraph) -> _Level:
+    """Unit-weight level for the original graph (self loops become loop weight)."""
+    return _Level(
+        csr.indptr.astype(np.int64),
+        csr.indices.astype(np.int64),
+        np.ones(len(csr.indices), dtype=np.float64),
+        csr.self_loops.astype(np.float64),
+        csr.degree().astype(np.float64),
+    )
+
+
+def _aggregate(level: _Level, labels: np.ndarray) -> _Level:
+    """Collapse every community of ``labels`` (dense 0..k-1) into one weighted node."""
+    k = int(labels.max()) + 1
+    rows = labels[np.repeat(np.arange(level.num_nodes), np.diff(level.indptr))]
+    cols = labels[level.indices]
+    inside = rows == cols
+    loops = (np.bincount(labels, weights=level.loops, minlength=k)
+             + np.bincount(rows[inside], weights=level.weights[inside], minlength=k) / 2)
+    
+    keys, inverse = np.unique(rows[~inside] * k + cols[~inside], return_inverse=True)
+    weights = np.bincount(inverse, weights=level.weights[~inside], minlength=len(keys))
+    indptr = np.zeros(k + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys // k, minlength=k), out=indptr[1:])
+    return _Level(indptr, keys % k, weights, loops, np.bincount(labels, weights=level.degree, minlength=k))
+
+
+def _dense(labels: np.ndarray) -> np.ndarray:
+    """Renumber labels to 0..k-1 in order of first appearance."""
+    _, first, inverse = np.unique(labels, return_index=True, return_inverse=True)
+    rank = np.empty(len(first), dtype=np.int64)
+    rank[np.argsort(first, kind='stable')] = np.arange(len(first))
+    return rank[inverse.ravel()]
+
+
+def _canonical(labels: np.ndarray) -> np.ndarray:
+    """Number communities by decreasing size, then by smallest member."""
+    if len(labels) == 0:
+        return labels.astype(np.int64)
+    _, first, inverse = np.unique(labels, return_index=True, return_inverse=True)
+    sizes = np.bincount(inverse.ravel())
+    rank = np.empty(len(first), dtype=np.int64)
+    rank[np.lexsort((first, -sizes))] = np.arange(len(first))
+    return rank[inverse.ravel()]
+
+
+def _move_nodes(level: _Level, community: List[int], resolution: float, rng: np.random.Generator) -> bool:
+    """Greedy local moving with a work queue (the fast local move of Leiden).
+    
+    Nodes are visited in random order. Each joins the neighboring community
+    with the largest modularity gain, or an empty one if every option loses.
+    Only neighbors that now sit outside the node's new community are queued
+    again. ``community`` is updated in place; returns whether any node moved.
+    """
+    n = level.num_nodes
+    indptr = level.indptr.tolist()
+    indices = level.indices.tolist()
+    weights = level.weights.tolist()
+    degree = level.degree.tolist()
+    scale = resolution / level.degree.sum()
+    total = np.bincount(community, weights=level.degree, minlength=n).tolist()
+    size = np.bincount(community, minlength=n).tolist()
+    empty = [c for c in range(n) if size[c] == 0]
+    
+    queue = deque(rng.permutation(n).tolist())
+    queued = [True] * n
+    moved = False
+    while queue:
+        v = queue.popleft()
+        queued[v] = False
+        old = community[v]
+        kv = degree[v]
+        links = {}
+        for i in range(indptr[v], indptr[v + 1]):
+            c = community[indices[i]]
+            links[c] = links.get(c, 0.0) + weights[i]
+        
+        total[old] -= kv
+        size[old] -= 1
+        best = old
+        best_gain = links.get(old, 0.0) - scale * kv * total[old]
+        for c, w in links.items():
+            gain = w - scale * kv * total[c]
+            if gain > best_gain + _MIN_GAIN:
+                best, best_gain = c, gain
+        if best_gain < -_MIN_GAIN and size[old] > 0:
+            best = empty.pop()
+        total[best] += kv
+        size[best] += 1
+        if best == old:
+            continue
+        
+        if size[old] == 0:
+            empty.append(old)
+        community[v] = best
+        moved = True
+        for i in range(indptr[v], indptr[v + 1]):
+            u = indices[i]
+            if not queued[u] and community[u] != best:
+                queued[u] = True
+                queue.append(u)
+    return moved
+
+
+def _refine(level: _Level, partition: np.ndarray, resolution: float, rng: np.random.Generator,
+            theta: float) -> np.ndarray:
+    """Leiden refinement: merge singletons into well-connected subcommunities of each community.
+    
+    Every node starts alone. Visited in random order, a node that is still a
+    singleton and is well connected to its community joins a well-connected
+    subcommunity of that community. The subcommunity is drawn with probability
+    proportional to ``exp(gain / theta)`` among those with non-negative gain.
+    The result keeps every refined community connected.
+    """
+    n = level.num_nodes
+    indptr = level.indptr.tolist()
+    indices = level.indices.tolist()
+    weights = level.weights.tolist()
+    degree = level.degree.tolist()
+    scale = resolution / level.degree.sum()
+    half_total = level.degree.sum() / 2
+    part = partition.tolist()
+    community_total = np.bincount(partition, weights=level.degree).tolist()
+    
+    # Weight from each node (later each subcommunity) to the rest of its community
+    rows = np.repeat(np.arange(n), np.diff(level.indptr))
+    same = partition[rows] == partition[level.indices]
+    external = np.bincount(rows[same], weights=level.weights[same], minlength=n).tolist()
+    
+    refined = list(range(n))
+    refined_total = list(degree)
+    refined_size = [1] * n
+    for v in rng.permutation(n).tolist():
+        if refined_size[refined[v]] != 1:
+            continue
+        s = part[v]
+        kv = degree[v]
+        if external[v] < scale * kv * (community_total[s] - kv):
+            continue
+        
+        links = {}
+        for i in range(indptr[v], indptr[v + 1]):
+            u = indices[i]
+            if part[u] == s:
+                c = refined[u]
+                links[c] = links.get(c, 0.0) + weights[i]
+        candidates, gains = [], []
+        for c, w in links.items():
+            if external[c] >= scale * refined_total[c] * (community_total[s] - refined_total[c]):
+                gain = w - scale * kv * refined_total[c]
+                if gain >= 0:
+                    candidates.append(c)
+                    gains.append(gain / half_total)
+        if not candidates:
+            continue
+        
+        odds = np.exp((np.array(gains) - max(gains)) / theta)
+        target = candidates[int(rng.choice(len(candidates), p=odds / odds.sum()))]
+        refined_size[refined[v]] = 0
+        refined[v] = target
+        refined_total[target] += kv
+        refined_size[target] += 1
+        external[target] += external[v] - 2 * links[target]
+    return _dense(np.array(refined))
+
+
+def _result(csr: CSRGraph, labels: np.ndarray, levels: int, method: str, resolution: float) -> CommunityResult:
+    labels = _canonical(labels)
+    return CommunityResult(labels, modularity(csr, labels, resolution), levels, method, resolution)
+
+
+def louvain(csr: CSRGraph, resolution: float = 1.0, seed: Optional[int] = None,
+            max_levels: Optional[int] = None) -> CommunityResult:
+    """Louvain modularity optimization: local moving, then aggregation, repeated.
+    
+    The graph is treated as unweighted, with parallel structure carried as
+    edge weights between aggregated levels. Higher ``resolution`` gives
+    smaller communities. ``seed`` fixes the node visiting order and so the
+    result.
+    """
+    rng = np.random.default_rng(seed)
+    membership = np.arange(csr.num_nodes)
+    if csr.num_nodes == 0 or csr.degree().sum() == 0:
+        return _result(csr, membership, 0, 'louvain', resolution)
+    
+    level = _base_level(csr)
+    levels = 0
+    while max_levels is None or levels < max_levels:
+        community = list(range(level.num_nodes))
+        moved = _move_nodes(level, community, resolution, rng)
+        labels = _dense(np.array(community))
+        membership = labels[membership]
+        levels += 1
+        if not moved or labels.max() + 1 == level.num_nodes:
+            break
+        level = _aggregate(level, labels)
+    return _result(csr, membership, levels, 'louvain', resolution)
+
+
+def leiden(csr: CSRGraph, resolution: float = 1.0, seed: Optional[int] = None, theta: float = 0.01,
+           max_levels: Optional[int] = None) -> CommunityResult:
+    """Leiden modularity optimization (Traag, Waltman and van Eck, 2019).
+    
+    Works like Louvain, with a refinement step before each aggregation. The
+    next level is built from the refined communities and starts from the
+    unrefined partition. Communities therefore never end up internally
+    disconnected, as they can under Louvain. Stops once every community is a
+    single aggregate node.
+    """
+    rng = np.random.default_rng(seed)
+    membership = np.arange(csr.num_nodes)
+    if csr.num_nodes == 0 or csr.degree().sum() == 0:
+        return _result(csr, membership, 0, 'leiden', resolution)
+    
+    level = _base_level(csr)
+    community = list(range(level.num_nodes))
+    levels = 0
+    while True:
+        _move_nodes(level, community, resolution, rng)
+        partition = _dense(np.array(community))
+        levels += 1
+        if partition.max() + 1 == level.num_nodes or (max_levels is not None and levels >= max_levels):
+            break
+        refined = _refine(level, partition, resolution, rng, theta)
+        membership = refined[membership]
+        # Each aggregate node starts in the community its members were moved to
+        initial = np.zeros(int(refined.max()) + 1, dtype=np.int64)
+        initial[refined] = partition
+        level = _aggregate(level, refined)
+        community = initial.tolist()
+    return _result(csr, partition[membership], levels, 'leiden', resolution)
+
+
+def propagate_labels(num_nodes: int, blocks: Callable[[], Iterable[Tuple[np.ndarray, np.ndarray]]],
+                     max_iterations: int = 20, seed: Optional[int] = None) -> Tuple[np.ndarray, int]:
+    """Semi-synchronous label propagation over a re-readable stream of adjacency blocks.
+    
+    ``blocks()`` must return a fresh iterable of ``(rows, neighbors)`` arrays
+    that lists both directions of every edge, with all entries of a node in
+    one block. CSR row blocks satisfy this, and so does a source-sorted
+    symmetric edge list read chunk by chunk.
+    
+    Each iteration splits the nodes into two random halves and updates one
+    half at a time, synchronously within the half. A node takes the label
+    most frequent among its neighbors, keeping its own label on ties and
+    otherwise breaking ties at random. This avoids the label oscillation of
+    fully synchronous updates. Memory is a few arrays of ``num_nodes`` plus
+    one block. Returns the labels and the number of iterations, stopping
+    early once an iteration changes nothing.
+    """
+    rng = np.random.default_rng(seed)
+    labels = np.arange(num_nodes, dtype=np.int64)
+    iterations = 0
+    while iterations < max_iterations:
+        iterations += 1
+        half = rng.random(num_nodes) < 0.5
+        changed = 0
+        for part in (half, ~half):
+            updated = labels.copy()
+            for rows, neighbors in blocks():
+                active = part[rows]
+                if not active.any():
+                    continue
+                keys, counts = np.unique(rows[active] * num_nodes + labels[neighbors[active]], return_counts=True)
+                key_rows, key_labels = keys // num_nodes, keys % num_nodes
+                # Own label wins ties; a random jitter below 1 breaks the others
+                score = counts + np.where(key_labels == labels[key_rows], 0.5, rng.random(len(keys)) * 0.5)
+                starts = np.flatnonzero(np.concatenate(([True], key_rows[1:] != key_rows[:-1])))
+                segment = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, len(keys))))
+                winners = np.flatnonzero(score == np.maximum.reduceat(score, starts)[segment])
+                winners = winners[np.unique(segment[winners], return_index=True)[1]]
+                updated[key_rows[winners]] = key_labels[winners]
+            changed += int(np.count_nonzero(updated != labels))
+            labels = updated
+        if changed == 0:
+            break
+    return labels, iterations
+
+
+def label_propagation(csr: CSRGraph, max_iterations: int = 20, seed: Optional[int] = None,
+                      block_entries: int = _BLOCK_ENTRIES) -> CommunityResult:
+    """Label-propagation communities for graphs too large for modularity optimization.
+    
+    Runs ``propagate_labels`` over CSR row blocks of at most
+    ``block_entries`` entries, so it also works on memory-mapped adjacency.
+    The modularity of the result (resolution 1) is reported for comparison
+    with Louvain and Leiden.
+    """
+    labels, iterations = propagate_labels(csr.num_nodes, lambda: csr.row_blocks(block_entries), max_iterations, seed)
+    return _result(csr, labels, iterations, 'label_propagation', 1.0)
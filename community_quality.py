@@ -0,0 +1,191 @@
+from typing import Any, Dict, Hashable, List, NamedTuple, Tuple
+import numpy as np
+
+from csr_graph import CSRGraph
+
+
+class CommunityQuality(NamedTuple):
+    """Partition-level and per-community quality of a labeling.
+    
+    Per-community arrays are indexed by label. ``cut_edges`` counts edges
+    leaving a community, ``volume`` its degree sum, and ``conductance`` is
+    ``cut / min(volume, 2m - volume)`` (0 for a community with no edges).
+    ``internal_density`` is internal edges over possible pairs.
+    """
+    modularity: float
+    coverage: float
+    sizes: np.ndarray
+    internal_edges: np.ndarray
+    cut_edges: np.ndarray
+    volume: np.ndarray
+    conductance: np.ndarray
+    internal_density: np.ndarray
+
+
+def _edge_counts(csr: CSRGraph, labels: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Internal and cut edge counts per community, from one pass over the adjacency blocks."""
+    internal = np.bincount(labels, weights=csr.self_loops, minlength=k)
+    cut = np.zeros(k, dtype=np.float64)
+    for rows, neighbors in csr.row_blocks():
+        source, target = labels[rows], labels[neighbors]
+        inside = source == target
+        # Every undirected edge appears once from each side
+        internal += np.bincount(source[inside], minlength=k) / 2
+        cut += np.bincount(source[~inside], minlength=k)
+    return internal, cut
+
+
+def community_quality(csr: CSRGraph, labels: np.ndarray, resolution: float = 1.0) -> CommunityQuality:
+    """Modularity, coverage, conductance, internal density and edge counts of a labeling.
+    
+    ``labels`` gives the community (0..k-1) of every node. Everything is
+    aggregated with ``np.bincount`` from a single pass over the edges.
+    """
+    labels = np.asarray(labels, dtype=np.int64)
+    k = int(labels.max()) + 1 if len(labels) else 0
+    internal, cut = _edge_counts(csr, labels, k)
+    degree = csr.degree().astype(np.float64)
+    two_m = degree.sum()
+    sizes = np.bincount(labels, minlength=k)
+    volume = np.bincount(labels, weights=degree, minlength=k)
+    
+    smaller_side = np.minimum(volume, two_m - volume)
+    conductance = np.divide(cut, smaller_side, out=np.zeros(k), where=smaller_side > 0)
+    pairs = sizes * (sizes - 1) / 2
+    internal_density = np.divide(internal, pairs, out=np.zeros(k), where=pairs > 0)
+    if two_m > 0:
+        quality = float(2 * internal.sum() / two_m - resolution * (volume ** 2).sum() / two_m ** 2)
+        coverage = float(2 * internal.sum() / two_m)
+    else:
+        quality, coverage = 0.0, 0.0
+    return CommunityQuality(quality, coverage, sizes, internal.astype(np.int64), cut.astype(np.int64),
+                            volume, conductance, internal_density)
+
+
+def modularity(csr: CSRGraph, labels: np.ndarray, resolution: float = 1.0) -> float:
+    """Newman modularity of a labeling (same value as ``nx.community.modularity`` with ``weight=None``)."""
+    return community_quality(csr, labels, resolution).modularity
+
+
+def summarize_quality(quality: CommunityQuality, top: int = 10) -> Dict[str, Any]:
+    """JSON-ready digest: partition scores plus per-community stats of the ``top`` largest communities."""
+    largest = np.argsort(-quality.sizes, kind='stable')[:top].tolist()
+    return {
+        'modularity': quality.modularity,
+        'coverage': quality.coverage,
+        'mean_conductance': float(quality.conductance.mean()) if len(quality.conductance) else 0.0,
+        'communities': [{
+            'community': label,
+            'size': int(quality.sizes[label]),
+            'internal_edges': int(quality.internal_edges[label]),
+            'cut_edges': int(quality.cut_edges[label]),
+            'conductance': float(quality.conductance[label]),
+            'internal_density': float(quality.internal_density[label]),
+        } for label in largest],
+    }
+
+
+class InterCommunityIndex:
+    """Edges between communities, grouped by community pair for instant lookups.
+    
+    Each inter-community edge is stored once, oriented from the lower label
+    to the higher, and sorted by its ``(low, high)`` pair. A symmetric
+    community-level adjacency ``(indptr, neighbors, weights)`` gives the
+    communities linked to any community and how many edges link them.
+    """
+    
+    def __init__(self, csr: CSRGraph, labels: np.ndarray):
+        """Build the index from one pass over the adjacency blocks."""
+        self.csr = csr
+        self.labels = np.asarray(labels, dtype=np.int64)
+        k = int(self.labels.max()) + 1 if len(self.labels) else 0
+        self.num_communities = k
+        
+        sources, targets = [], []
+        for rows, neighbors in csr.row_blocks():
+            crossing = (rows < neighbors) & (self.labels[rows] != self.labels[neighbors])
+            sources.append(rows[crossing])
+            targets.append(neighbors[crossing])
+        src = np.concatenate(sources) if sources else np.empty(0, dtype=np.int64)
+        dst = np.concatenate(targets) if targets else np.empty(0, dtype=np.int64)
+        # Orient every edge from the lower to the higher community label
+        flip = self.labels[src] > self.labels[dst]
+        src, dst = np.where(flip, dst, src), np.where(flip, src, dst)
+        keys = self.labels[src] * max(k, 1) + self.labels[dst]
+        order = np.argsort(keys, kind='stable')
+        self.src, self.dst, keys = src[order].astype(np.int32), dst[order].astype(np.int32), keys[order]
+        self.pair_keys, self.pair_offsets = np.unique(keys, return_index=True)
+        self.pair_offsets = np.append(self.pair_offsets, len(keys))
+        
+        # Symmetric community graph: pair (a, b) listed under both a and b
+        low, high = self.pair_keys // max(k, 1), self.pair_keys % max(k, 1)
+        counts = np.diff(self.pair_offsets)
+        rows = np.concatenate([low, high])
+        order = np.lexsort((np.concatenate([high, low]), rows))
+        self.neighbors = np.concatenate([high, low])[order]
+        self.weights = np.concatenate([counts, counts])[order]
+        self.indptr = np.zeros(k + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=k), out=self.indptr[1:])
+    
+    @property
+    def num_edges(self) -> int:
+        """Number of edges whose endpoints lie in different communities."""
+        return len(self.src)
+    
+    def _pair_slice(self, a: int, b: int) -> slice:
+        low, high = min(a, b), max(a, b)
+        position = int(np.searchsorted(self.pair_keys, low * max(self.num_communities, 1) + high))
+        if position == len(self.pair_keys) or self.pair_keys[position] != low * max(self.num_communities, 1) + high:
+            return slice(0, 0)
+        return slice(int(self.pair_offsets[position]), int(self.pair_offsets[position + 1]))
+    
+    def edge_count(self, a: int, b: int) -> int:
+        """Number of edges between communities a and b."""
+        span = self._pair_slice(a, b)
+        return span.stop - span.start
+    
+    def edges_between(self, a: int, b: int) -> List[Tuple[Hashable, Hashable]]:
+        """Edges ``(u, v)`` with u in community a and v in community b."""
+        span = self._pair_slice(a, b)
+        src, dst = self.src[span], self.dst[span]
+        if a > b:
+            src, dst = dst, src
+        nodes = self.csr.nodes
+        return [(nodes[u], nodes[v]) for u, v in zip(src.tolist(), dst.tolist())]
+    
+    def bridge_nodes(self, a: int, b: int) -> Dict[int, List[Hashable]]:
+        """Nodes of each community that have an edge into the other."""
+        span = self._pair_slice(a, b)
+        low, high = min(a, b), max(a, b)
+        nodes = self.csr.nodes
+        return {
+            low: [nodes[i] for i in np.unique(self.src[span]).tolist()],
+            high: [nodes[i] for i in np.unique(self.dst[span]).tolist()],
+        }
+    
+    def linked_communities(self, a: int) -> Dict[int, int]:
+        """Communities sharing edges with community a, with the edge counts."""
+        start, stop = int(self.indptr[a]), int(self.indptr[a + 1])
+        return dict(zip(self.neighbors[start:stop].tolist(), self.weights[start:stop].tolist()))
+    
+    def strongest_links(self, top: int = 5) -> List[Tuple[int, int, int]]:
+        """The ``top`` community pairs joined by the most edges, as ``(a, b, edges)``."""
+        counts = np.diff(self.pair_offsets)
+        best = np.argsort(-counts, kind='stable')[:top]
+        k = max(self.num_communities, 1)
+        return [(int(self.pair_keys[i] // k), int(self.pair_keys[i] % k), int(counts[i])) for i in best.tolist()]
+    
+    def top_bridges(self, top: int = 5) -> List[Tuple[Hashable, int]]:
+        """Nodes with the most edges into other communities, as ``(node, edges)``."""
+        crossing = np.bincount(np.concatenate([self.src, self.dst]), minlength=self.csr.num_nodes)
+        best = np.argsort(-crossing, kind='stable')[:top]
+        return [(self.csr.nodes[i], int(crossing[i])) for i in best.tolist() if crossing[i] > 0]
+    
+    def summary(self, top: int = 5) -> Dict[str, Any]:
+        """JSON-ready digest: how many edges cross, the strongest links and the main bridging nodes."""
+        return {
+            'inter_community_edges': self.num_edges,
+            'linked_community_pairs': len(self.pair_keys),
+            'strongest_links': [{'communities': [a, b], 'edges': edges} for a, b, edges in self.strongest_links(top)],
+            'top_bridges': [{'node': node, 'inter_community_edges': edges} for node, edges in self.top_bridges(top)],
+        }
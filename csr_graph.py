@@ -0,0 +1,401 @@
+from typing import Any, Dict, Hashable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+import networkx as nx
+
+
+class TriangleStats(NamedTuple):
+    """Triangle counts and the clustering metrics derived from them."""
+    triangles: np.ndarray
+    transitivity: float
+    average_clustering: float
+
+
+class EgoStats(NamedTuple):
+    """Per-source statistics of k-hop ego networks (the source itself included)."""
+    size: np.ndarray
+    edges: np.ndarray
+    density: np.ndarray
+
+
+class CSRGraph:
+    """Compact, array-backed adjacency for undirected graphs.
+    
+    Nodes are interned to consecutive integers ``0..n-1``; ``nodes[i]`` gives the
+    original ID and ``index[node]`` the integer. The neighbors of ``i`` are
+    ``indices[indptr[i]:indptr[i + 1]]``, sorted ascending. Every undirected edge
+    is stored in both directions and self loops are kept out of the adjacency
+    (they are only counted in ``self_loops``), matching what the clustering and
+    path algorithms in NetworkX ignore anyway.
+    """
+    
+    def __init__(self, nodes: Sequence[Hashable], indptr: np.ndarray, indices: np.ndarray,
+                 self_loops: Optional[np.ndarray] = None):
+        """Wrap prebuilt CSR arrays; use ``from_networkx`` or ``from_edge_array`` instead."""
+        self.nodes: List[Hashable] = list(nodes)
+        self._index: Optional[Dict[Hashable, int]] = None
+        self.indptr = indptr
+        self.indices = indices
+        self.self_loops = self_loops if self_loops is not None else np.zeros(len(self.nodes), dtype=np.int32)
+    
+    @classmethod
+    def from_edge_array(cls, nodes: Sequence[Hashable], src: np.ndarray, dst: np.ndarray) -> "CSRGraph":
+        """Build from integer edge endpoints (each undirected edge listed once or twice)."""
+        n = len(nodes)
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        
+        loops = src == dst
+        self_loops = np.bincount(src[loops], minlength=n).astype(np.int32)
+        src, dst = src[~loops], dst[~loops]
+        
+        # Symmetrize and drop duplicate (u, v) pairs
+        both_src = np.concatenate([src, dst])
+        both_dst = np.concatenate([dst, src])
+        keys = np.sort(both_src * n + both_dst)
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))] if len(keys) else keys
+        rows = keys // n if n else keys
+        cols = keys % n if n else keys
+        
+        counts = np.bincount(rows, minlength=n)
+        offset_dtype = np.int32 if len(cols) < np.iinfo(np.int32).max else np.int64
+        indptr = np.zeros(n + 1, dtype=offset_dtype)
+        np.cumsum(counts, out=indptr[1:])
+        return cls(nodes, indptr, cols.astype(np.int32), self_loops)
+    
+    @classmethod
+    def from_networkx(cls, G: nx.Graph) -> "CSRGraph":
+        """Intern node IDs and build the CSR arrays from a NetworkX graph."""
+        nodes = list(G.nodes())
+        index = {node: i for i, node in enumerate(nodes)}
+        edges = np.array([(index[u], index[v]) for u, v in G.edges()], dtype=np.int64).reshape(-1, 2)
+        return cls.from_edge_array(nodes, edges[:, 0], edges[:, 1])
+    
+    @property
+    def index(self) -> Dict[Hashable, int]:
+        """Integer of every node ID, built on first use."""
+        if self._index is None:
+            self._index = {node: i for i, node in enumerate(self.nodes)}
+        return self._index
+    
+    @property
+    def num_nodes(self) -> int:
+        return len(self.nodes)
+    
+    @property
+    def num_edges(self) -> int:
+        """Number of undirected edges, self loops included (as in NetworkX)."""
+        return len(self.indices) // 2 + int(self.self_loops.sum())
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the adjacency arrays."""
+        return self.indptr.nbytes + self.indices.nbytes + self.self_loops.nbytes
+    
+    def neighbors(self, i: int) -> np.ndarray:
+        """Sorted neighbor indices of node i."""
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+    
+    def degree(self) -> np.ndarray:
+        """Degree of every node (a self loop adds two, as in NetworkX)."""
+        return np.diff(self.indptr).astype(np.int64) + 2 * self.self_loops
+    
+    def to_dict(self, values: np.ndarray) -> Dict[Hashable, Any]:
+        """Map a per-node array back onto the original node IDs."""
+        return dict(zip(self.nodes, values.tolist()))
+    
+    def edge_array(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(src, dst) integer arrays with every undirected edge listed once (src < dst)."""
+        src = np.repeat(np.arange(self.num_nodes, dtype=np.int32), np.diff(self.indptr))
+        mask = src < self.indices
+        return src[mask], self.indices[mask]
+    
+    def expand(self, frontier: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Gather all (source, neighbor) pairs leaving the given frontier nodes."""
+        starts = self.indptr[frontier].astype(np.int64)
+        counts = self.indptr[frontier + 1].astype(np.int64) - starts
+        total = int(counts.sum())
+        if total == 0:
+            empty = np.empty(0, dtype=np.int32)
+            return empty, empty
+        # Position of every gathered entry: its row start plus its rank within the row
+        row_offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+        positions = row_offsets + np.arange(total)
+        return np.repeat(frontier, counts), self.indices[positions]
+    
+    def expand_blocks(self, frontier: np.ndarray, max_entries: int = 1 << 22) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """``expand`` over consecutive slices of the frontier holding at most ``max_entries`` entries each.
+        
+        A single larger row gets a slice of its own; the gathered arrays stay
+        bounded however large the frontier grows.
+        """
+        counts = self.indptr[frontier + 1].astype(np.int64) - self.indptr[frontier]
+        cumulative = np.cumsum(counts)
+        start = 0
+        while start < len(frontier):
+            done = cumulative[start - 1] if start else 0
+            stop = max(int(np.searchsorted(cumulative, done + max_entries, side='right')), start + 1)
+            yield self.expand(frontier[start:stop])
+            start = stop
+    
+    def row_blocks(self, max_entries: int = 1 << 22) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Adjacency of consecutive row ranges as ``(rows, neighbors)`` entry arrays.
+        
+        Each block holds at most ``max_entries`` entries (a single larger row
+        gets a block of its own) and reads only its slice of ``indices``, so
+        memory-mapped arrays are streamed rather than loaded.
+        """
+        n = self.num_nodes
+        start = 0
+        while start < n:
+            stop = int(np.searchsorted(self.indptr, self.indptr[start] + max_entries, side='right')) - 1
+            stop = min(max(stop, start + 1), n)
+            rows = np.repeat(np.arange(start, stop), np.diff(self.indptr[start:stop + 1]))
+            yield rows, np.asarray(self.indices[int(self.indptr[start]):int(self.indptr[stop])])
+            start = stop
+    
+    def bfs_levels(self, source: int) -> Iterator[np.ndarray]:
+        """Yield the BFS frontier of each level, starting with ``[source]``.
+        
+        Each frontier is expanded in bounded slices (``expand_blocks``), so a
+        level never gathers more than one slice of adjacency at a time.
+        """
+        visited = np.zeros(self.num_nodes, dtype=bool)
+        visited[source] = True
+        frontier = np.array([source], dtype=np.int32)
+        while len(frontier):
+            yield frontier
+            found = []
+            for _, reached in self.expand_blocks(frontier):
+                reached = np.unique(reached[~visited[reached]])
+                visited[reached] = True
+                found.append(reached)
+            frontier = np.sort(np.concatenate(found))
+    
+    def bfs(self, source: int) -> np.ndarray:
+        """Hop distance from source to every node (-1 where unreachable)."""
+        dist = np.full(self.num_nodes, -1, dtype=np.int32)
+        for depth, frontier in enumerate(self.bfs_levels(source)):
+            dist[frontier] = depth
+        return dist
+    
+    def k_hop_neighborhoods(self, sources: np.ndarray, radius: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Members of the ``radius``-hop neighborhood of every source, as sorted (ego, node) pairs.
+        
+        ``ego`` indexes into ``sources``; each source is a member of its own
+        neighborhood. All BFS runs advance together: a level is one
+        ``expand`` over the concatenated frontiers, deduplicated with
+        ``ego * n + node`` keys.
+        """
+        n = self.num_nodes
+        sources = np.asarray(sources, dtype=np.int64)
+        frontier_ego = np.arange(len(sources), dtype=np.int64)
+        frontier_node = sources
+        visited = np.sort(frontier_ego * n + frontier_node)
+        for _ in range(radius):
+            counts = self.indptr[frontier_node + 1] - self.indptr[frontier_node]
+            _, reached = self.expand(frontier_node)
+            keys = np.unique(np.repeat(frontier_ego, counts) * n + reached)
+            keys = keys[~np.isin(keys, visited, assume_unique=True)]
+            if not len(keys):
+                break
+            visited = np.union1d(visited, keys)
+            frontier_ego, frontier_node = keys // n, keys % n
+        return visited // n, visited % n
+    
+    def ego_stats(self, sources: np.ndarray, radius: int = 1, batch_size: int = 4096) -> EgoStats:
+        """Size, edge count and density of the ``radius``-hop ego network of every source.
+        
+        Matches ``nx.ego_graph`` (self loops count as edges, as in
+        ``nx.density``). Sources are processed ``batch_size`` at a time to
+        bound the memory held by the (ego, node) pair arrays.
+        """
+        sources = np.asarray(sources, dtype=np.int64)
+        n = self.num_nodes
+        size = np.zeros(len(sources), dtype=np.int64)
+        edges = np.zeros(len(sources), dtype=np.int64)
+        for start in range(0, len(sources), batch_size):
+            batch = sources[start:start + batch_size]
+            ego, member = self.k_hop_neighborhoods(batch, radius)
+            keys = ego * n + member
+            
+            # Every internal edge is seen once from each endpoint
+            counts = self.indptr[member + 1] - self.indptr[member]
+            _, reached = self.expand(member)
+            edge_ego = np.repeat(ego, counts)
+            edge_keys = edge_ego * n + reached
+            slot = np.minimum(np.searchsorted(keys, edge_keys), len(keys) - 1)
+            inside = keys[slot] == edge_keys
+            
+            width = len(batch)
+            size[start:start + width] = np.bincount(ego, minlength=width)
+            edges[start:start + width] = (np.bincount(edge_ego[inside], minlength=width) // 2
+                                          + np.bincount(ego, weights=self.self_loops[member], minlength=width).astype(np.int64))
+        
+        possible = size * (size - 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            density = np.where(possible > 0, 2 * edges / possible, 0.0)
+        return EgoStats(size, edges, density)
+    
+    def connected_components(self) -> np.ndarray:
+        """Component label of every node (the smallest node index in its component).
+        
+        Uses min-label hooking plus pointer jumping, which converges in a
+        handful of vectorized rounds instead of one BFS per component. Each
+        round streams the adjacency with ``row_blocks``, so only the labels
+        are held in memory.
+        """
+        labels = np.arange(self.num_nodes, dtype=np.int64)
+        while True:
+            hooked = False
+            for rows, neighbors in self.row_blocks():
+                # Every undirected edge once, from its lower endpoint
+                forward = rows < neighbors
+                label_src, label_dst = labels[rows[forward]], labels[neighbors[forward]]
+                differ = label_src != label_dst
+                if not differ.any():
+                    continue
+                hooked = True
+                # Hook each label onto the smallest label it touches
+                low = np.minimum(label_src[differ], label_dst[differ])
+                high = np.maximum(label_src[differ], label_dst[differ])
+                np.minimum.at(labels, high, low)
+            if not hooked:
+                return labels
+            # Pointer jumping until every node points at its root
+            while True:
+                jumped = labels[labels]
+                if np.array_equal(jumped, labels):
+                    break
+                labels = jumped
+    
+    def component_sizes(self) -> np.ndarray:
+        """Sizes of all connected components."""
+        labels = self.connected_components()
+        sizes = np.bincount(labels, minlength=self.num_nodes)
+        return sizes[sizes > 0]
+    
+    def core_numbers(self) -> np.ndarray:
+        """Core number of every node (self loops ignored), as ``nx.core_number`` gives.
+        
+        Peels the graph level by level: at level k every remaining node with
+        at most k remaining neighbors gets core number k and is removed at
+        once, which lowers its neighbors' counts and may peel them in the
+        same level. Each node's adjacency row is gathered exactly once, when
+        the node is peeled (in ``expand_blocks`` slices), so memory-mapped
+        adjacency is read page by page.
+        """
+        remaining = np.diff(self.indptr).astype(np.int64)
+        core = np.zeros(self.num_nodes, dtype=np.int64)
+        alive = np.ones(self.num_nodes, dtype=bool)
+        candidates = np.arange(self.num_nodes)
+        while len(candidates):
+            level = int(remaining[candidates].min())
+            peeled = candidates[remaining[candidates] <= level]
+            while len(peeled):
+                core[peeled] = level
+                alive[peeled] = False
+                found = []
+                for _, reached in self.expand_blocks(peeled):
+                    touched, counts = np.unique(reached[alive[reached]], return_counts=True)
+                    remaining[touched] -= counts
+                    found.append(touched)
+                touched = np.sort(np.concatenate(found))
+                touched = touched[np.concatenate(([True], touched[1:] != touched[:-1]))] if len(touched) else touched
+                peeled = touched[remaining[touched] <= level]
+            candidates = candidates[alive[candidates]]
+        return core
+    
+    def eigenvector_centrality(self, max_iter: int = 100, tol: float = 1.0e-6) -> np.ndarray:
+        """Eigenvector centrality by power iteration on ``A + I``, as ``nx.eigenvector_centrality`` runs it.
+        
+        Self loops count once, as in NetworkX. Each iteration is one
+        ``row_blocks`` pass; raises ``nx.PowerIterationFailedConvergence``
+        after ``max_iter`` iterations.
+        """
+        n = self.num_nodes
+        if n == 0:
+            raise nx.NetworkXPointlessConcept("cannot compute centrality for the null graph")
+        x = np.full(n, 1.0 / n)
+        for _ in range(max_iter):
+            last = x
+            x = last * (1 + self.self_loops)
+            for rows, neighbors in self.row_blocks():
+                x += np.bincount(neighbors, weights=last[rows], minlength=n)
+            x /= np.linalg.norm(x) or 1
+            if np.abs(x - last).sum() < n * tol:
+                return x
+        raise nx.PowerIterationFailedConvergence(max_iter)
+    
+    def triangles(self, pair_chunk: int = 1 << 22) -> np.ndarray:
+        """Number of triangles through each node (compact-forward counting).
+        
+        Edges are oriented from lower to higher (degree, id) rank, which caps
+        every forward list at O(sqrt(m)). Each triangle is then found exactly
+        once as a pair of forward neighbors ``(a, b)`` of its lowest-ranked
+        corner that are themselves joined by a forward edge ``a -> b``; the
+        candidate pairs are generated and checked with sorted-key lookups in
+        chunks of at most ``pair_chunk`` pairs.
+        """
+        n = self.num_nodes
+        counts = np.zeros(n, dtype=np.int64)
+        if n < 3 or len(self.indices) == 0:
+            return counts
+        
+        degree = np.diff(self.indptr)
+        rank = np.empty(n, dtype=np.int64)
+        rank[np.lexsort((np.arange(n), degree))] = np.arange(n)
+        
+        src = np.repeat(np.arange(n, dtype=np.int64), degree)
+        forward = rank[src] < rank[self.indices]
+        # Forward edges in rank space, sorted by (tail, head) so every row is ascending
+        keys = np.sort(rank[src[forward]] * n + rank[self.indices[forward]])
+        tails, heads = keys // n, keys % n
+        row_end = np.cumsum(np.bincount(tails, minlength=n))
+        
+        # Position p in a row pairs with every later position of the same row
+        pairs_per_edge = row_end[tails] - np.arange(len(keys)) - 1
+        cumulative = np.cumsum(pairs_per_edge)
+        found = np.zeros(n, dtype=np.int64)
+        start = 0
+        while start < len(keys):
+            done = cumulative[start - 1] if start else 0
+            stop = max(int(np.searchsorted(cumulative, done + pair_chunk, side='right')), start + 1)
+            width = pairs_per_edge[start:stop]
+            total = int(width.sum())
+            if total:
+                first = np.repeat(np.arange(start, stop), width)
+                offset = np.arange(total) - np.repeat(np.cumsum(width) - width, width)
+                second = first + 1 + offset
+                closing = heads[first] * n + heads[second]
+                slot = np.minimum(np.searchsorted(keys, closing), len(keys) - 1)
+                hit = keys[slot] == closing
+                for corner in (tails[first[hit]], heads[first[hit]], heads[second[hit]]):
+                    found += np.bincount(corner, minlength=n)
+            start = stop
+        
+        counts[:] = found[rank]
+        return counts
+    
+    def triangle_stats(self) -> TriangleStats:
+        """Per-node triangles, transitivity and average clustering from one counting pass."""
+        triangles = self.triangles()
+        return TriangleStats(
+            triangles=triangles,
+            transitivity=self.transitivity(triangles),
+            average_clustering=float(self.clustering(triangles).mean()) if self.num_nodes else 0.0,
+        )
+    
+    def clustering(self, triangles: Optional[np.ndarray] = None) -> np.ndarray:
+        """Local clustering coefficient of each node (self loops ignored)."""
+        triangles = self.triangles() if triangles is None else triangles
+        degree = np.diff(self.indptr).astype(np.float64)
+        possible = degree * (degree - 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(possible > 0, 2 * triangles / possible, 0.0)
+    
+    def transitivity(self, triangles: Optional[np.ndarray] = None) -> float:
+        """Global clustering: fraction of connected triples that close into triangles."""
+        triangles = self.triangles() if triangles is None else triangles
+        degree = np.diff(self.indptr).astype(np.float64)
+        triads = float((degree * (degree - 1)).sum())
+        return float(2 * triangles.sum() / triads) if triads > 0 else 0.0
@@ -0,0 +1,223 @@
+from typing import Any, Dict, Hashable, List, NamedTuple, Optional, Tuple
+import numpy as np
+
+from csr_graph import CSRGraph
+
+
+class OracleQuery(NamedTuple):
+    """Answer to one point-to-point query (node indices; ``path`` is None when unreachable)."""
+    distance: Optional[int]
+    path: Optional[List[int]]
+    expanded: int
+
+
+class DistanceOracle:
+    """Exact point-to-point hop distances and paths from precomputed landmark distances.
+    
+    A few landmarks (``num_landmarks``, taken from the largest component) get
+    one full BFS each at build time. For a query ``(s, t)`` the triangle
+    inequality then gives, in O(landmarks) time,
+    
+    - an upper bound ``min_l d(s, l) + d(l, t)`` realized by an actual path
+      through the best landmark, and
+    - a lower bound ``max_l |d(s, l) - d(t, l)|`` (the ALT bound).
+    
+    When both meet the answer is known without touching the graph. Otherwise a
+    bidirectional BFS runs from both ends, expanding the cheaper side first and
+    discarding every node whose depth plus its ALT bound to the far end cannot
+    beat the best path found so far; on unit-weight graphs this is A* with the
+    landmark potential, so only a thin corridor around the answer is expanded.
+    Pairs in different components are rejected from the stored labels alone.
+    """
+    
+    def __init__(self, csr: CSRGraph, landmarks: np.ndarray, distances: np.ndarray, components: np.ndarray):
+        """Wrap prebuilt landmark data; use ``build`` or ``load`` instead."""
+        self.csr = csr
+        self.landmarks = landmarks
+        self.distances = distances
+        self.components = components
+        # Plain-list offsets keep the per-node slicing in queries cheap
+        self._indptr: List[int] = csr.indptr.tolist()
+        # Component holding the landmarks (-1 when there are none)
+        self.landmark_component = int(components[landmarks[0]]) if len(landmarks) else -1
+    
+    @classmethod
+    def build(cls, csr: CSRGraph, num_landmarks: int = 16, strategy: str = 'mixed') -> "DistanceOracle":
+        """Pick landmarks in the largest component and run one BFS from each.
+        
+        ``strategy='degree'`` takes the best-connected nodes (tight upper bounds
+        on social graphs, whose shortest paths run through hubs), ``'farthest'``
+        repeatedly takes the node farthest from the landmarks chosen so far
+        (tight lower bounds at the periphery) and ``'mixed'`` splits the budget.
+        """
+        if strategy not in ('degree', 'farthest', 'mixed'):
+            raise ValueError(f"Unknown landmark strategy: {strategy}")
+        n = csr.num_nodes
+        components = csr.connected_components()
+        if n == 0 or num_landmarks <= 0:
+            return cls(csr, np.empty(0, dtype=np.int64), np.empty((n, 0), dtype=np.int32), components)
+        
+        labels, sizes = np.unique(components, return_counts=True)
+        in_largest = components == labels[np.argmax(sizes)]
+        num_landmarks = min(num_landmarks, int(in_largest.sum()))
+        by_degree = num_landmarks if strategy == 'degree' else num_landmarks // 2 if strategy == 'mixed' else 0
+        
+        degree = np.where(in_largest, csr.degree(), -1)
+        landmarks = np.argsort(-degree, kind='stable')[:max(by_degree, 1)].tolist()
+        columns = [csr.bfs(landmark) for landmark in landmarks]
+        nearest = np.min(columns, axis=0)
+        while len(landmarks) < num_landmarks:
+            # Farthest-point selection: ties go to the lowest index
+            candidate = int(np.argmax(np.where(in_largest, nearest, -1)))
+            if nearest[candidate] == 0:
+                break
+            landmarks.append(candidate)
+            columns.append(csr.bfs(candidate))
+            nearest = np.minimum(nearest, columns[-1])
+        
+        # Row-major (node, landmark) so a query reads two contiguous rows
+        distances = np.ascontiguousarray(np.stack(columns, axis=1))
+        return cls(csr, np.array(landmarks, dtype=np.int64), distances, components)
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the landmark distances and component labels."""
+        return self.distances.nbytes + self.components.nbytes
+    
+    def bounds(self, source: int, target: int) -> Tuple[int, float, int]:
+        """ALT lower bound, landmark upper bound and the landmark column realizing it.
+        
+        Without landmarks in the pair's component the bounds are ``(0, inf, -1)``.
+        """
+        if len(self.landmarks) == 0 or self.components[source] != self.landmark_component:
+            return 0, float('inf'), -1
+        row_s = self.distances[source].astype(np.int64)
+        row_t = self.distances[target].astype(np.int64)
+        through = row_s + row_t
+        best = int(np.argmin(through))
+        return int(np.abs(row_s - row_t).max()), int(through[best]), best
+    
+    def query(self, source: int, target: int) -> OracleQuery:
+        """Exact hop distance and one shortest path between two node indices."""
+        if source == target:
+            return OracleQuery(0, [source], 0)
+        if self.components[source] != self.components[target]:
+            return OracleQuery(None, None, 0)
+        
+        lower, best, column = self.bounds(source, target)
+        if lower == best:
+            return OracleQuery(int(best), self._path_via_landmark(source, target, column), 0)
+        
+        indptr, indices = self._indptr, self.csr.indices
+        pruned = column >= 0
+        far_rows = (self.distances[target].astype(np.int64), self.distances[source].astype(np.int64))
+        parents: Tuple[Dict[int, int], Dict[int, int]] = ({source: -1}, {target: -1})
+        depths: Tuple[Dict[int, int], Dict[int, int]] = ({source: 0}, {target: 0})
+        frontiers = [[source], [target]]
+        levels = [0, 0]
+        meeting = -1
+        expanded = 0
+        while len(frontiers[0]) and len(frontiers[1]) and levels[0] + levels[1] + 1 < best:
+            # Grow the side whose frontier has fewer edges to scan
+            work = [sum(indptr[v + 1] - indptr[v] for v in frontier) for frontier in frontiers]
+            side = 0 if work[0] <= work[1] else 1
+            own_parents, own_depths = parents[side], depths[side]
+            other_depths = depths[1 - side]
+            depth = levels[side] + 1
+            
+            reached = []
+            for v in frontiers[side]:
+                for w in indices[indptr[v]:indptr[v + 1]].tolist():
+                    if w in own_parents:
+                        continue
+                    own_parents[w] = v
+                    own_depths[w] = depth
+                    reached.append(w)
+                    if w in other_depths and depth + other_depths[w] < best:
+                        best = depth + other_depths[w]
+                        meeting = w
+            expanded += len(frontiers[side])
+            
+            if pruned and reached:
+                # Drop nodes that cannot lie on a path shorter than the best one
+                reached = np.array(reached, dtype=np.int64)
+                lower_bounds = np.abs(self.distances[reached] - far_rows[side]).max(axis=1)
+                reached = reached[depth + lower_bounds < best].tolist()
+            frontiers[side] = reached
+            levels[side] = depth
+        
+        if meeting < 0:
+            return OracleQuery(int(best), self._path_via_landmark(source, target, column), expanded)
+        return OracleQuery(int(best), self._path_via_meeting(parents, meeting), expanded)
+    
+    def distance(self, source: Hashable, target: Hashable) -> Optional[int]:
+        """Hop distance between two node IDs (None when no path exists)."""
+        return self.query(self.csr.index[source], self.csr.index[target]).distance
+    
+    def shortest_path(self, source: Hashable, target: Hashable) -> Optional[List[Hashable]]:
+        """One shortest path between two node IDs (None when no path exists)."""
+        path = self.query(self.csr.index[source], self.csr.index[target]).path
+        return None if path is None else [self.csr.nodes[i] for i in path]
+    
+    def _descend(self, node: int, column: int) -> List[int]:
+        """Walk from node to the landmark of ``column`` along its BFS distances."""
+        distances = self.distances[:, column]
+        walk = [node]
+        while distances[node] > 0:
+            neighbors = self.csr.neighbors(node)
+            node = int(neighbors[np.argmax(distances[neighbors] == distances[node] - 1)])
+            walk.append(node)
+        return walk
+    
+    def _path_via_landmark(self, source: int, target: int, column: int) -> List[int]:
+        """Path source -> landmark -> target (shortest whenever the upper bound is tight)."""
+        return self._descend(source, column) + self._descend(target, column)[-2::-1]
+    
+    def _path_via_meeting(self, parents: Tuple[Dict[int, int], Dict[int, int]], meeting: int) -> List[int]:
+        """Join the two search trees at the node where they met."""
+        forward, backward = [], []
+        node = meeting
+        while node >= 0:
+            forward.append(node)
+            node = parents[0][node]
+        node = parents[1][meeting]
+        while node >= 0:
+            backward.append(node)
+            node = parents[1][node]
+        return forward[::-1] + backward
+    
+    def summary(self) -> Dict[str, Any]:
+        """Size of the oracle, for reports."""
+        return {
+            'landmarks': [self.csr.nodes[i] for i in self.landmarks.tolist()],
+            'num_landmarks': len(self.landmarks),
+            'memory_bytes': self.nbytes,
+        }
+    
+    def save(self, path: str) -> None:
+        """Persist the landmark data to an ``.npz`` file next to the graph it indexes.
+        
+        Node IDs are stored as strings so ``load`` can check that the file
+        still matches the graph's node order.
+        """
+        np.savez_compressed(
+            path,
+            landmarks=self.landmarks,
+            distances=self.distances,
+            components=self.components,
+            nodes=np.array([str(node) for node in self.csr.nodes]),
+            num_edges=np.array(self.csr.num_edges),
+        )
+    
+    @classmethod
+    def load(cls, path: str, csr: CSRGraph) -> "DistanceOracle":
+        """Reattach an oracle saved by ``save`` to the CSR view of the same graph.
+        
+        Raises ValueError if the file was built for a different graph.
+        """
+        with np.load(path) as data:
+            nodes = data['nodes']
+            if (len(nodes) != csr.num_nodes or int(data['num_edges']) != csr.num_edges
+                    or nodes.tolist() != [str(node) for node in csr.nodes]):
+                raise ValueError(f"Distance oracle {path} was built for a different graph")
+            return cls(csr, data['landmarks'], data['distances'], data['components'])
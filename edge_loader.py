@@ -0,0 +1,504 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Callable, Dict, Hashable, Iterator, List, NamedTuple, Optional, Tuple, Union
+import io
+import os
+import numpy as np
+import pandas as pd
+import networkx as nx
+
+from csr_graph import CSRGraph
+from shortest_paths import resolve_workers
+
+
+Column = Union[str, int]
+
+# Called after every chunk with (rows read, bytes read, file size in bytes)
+ProgressCallback = Callable[[int, int, int], None]
+
+# Lines parsed per chunk; bounds the DataFrame held at any time
+DEFAULT_CHUNK_ROWS = 1 << 20
+
+# Smallest byte range worth shipping to a worker process
+_MIN_RANGE_BYTES = 1 << 23
+
+# Edges handed to NetworkX per bulk insert
+_INSERT_BATCH = 1 << 20
+
+# 10**0 .. 10**18: the number of these at most v is the digit count of v > 0
+_POWERS_OF_TEN = 10 ** np.arange(19, dtype=np.int64)
+
+
+class EdgeList(NamedTuple):
+    """An edge-list file parsed into interned endpoints and per-edge attribute arrays.
+    
+    ``nodes[i]`` is the ID of node ``i``, numbered in order of first appearance
+    (row by row, source before target). Row ``e`` of the file is the edge
+    ``(src[e], dst[e])`` and ``attributes[name][e]`` holds its value in every
+    other column; the weight column, if any, is stored as ``'weight'``.
+    """
+    nodes: List[str]
+    src: np.ndarray
+    dst: np.ndarray
+    attributes: Dict[str, np.ndarray]
+    
+    @property
+    def num_edges(self) -> int:
+        """Number of rows read, duplicates and self loops included."""
+        return len(self.src)
+    
+    def to_networkx(self, directed: bool = False) -> nx.Graph:
+        """Build the NetworkX graph with bulk inserts (edge weights included when present)."""
+        G = nx.DiGraph() if directed else nx.Graph()
+        G.add_nodes_from(self.nodes)
+        lookup = self.nodes.__getitem__
+        weights = self.attributes.get('weight')
+        # Batches keep the temporary Python lists small on huge edge lists
+        for start in range(0, self.num_edges, _INSERT_BATCH):
+            batch = slice(start, start + _INSERT_BATCH)
+            sources = map(lookup, self.src[batch].tolist())
+            targets = map(lookup, self.dst[batch].tolist())
+            if weights is not None:
+                G.add_weighted_edges_from(zip(sources, targets, weights[batch].tolist()))
+            else:
+                G.add_edges_from(zip(sources, targets))
+        return G
+    
+    def to_csr(self) -> CSRGraph:
+        """Undirected CSR core straight from the endpoint arrays, node order as in ``to_networkx``."""
+        loops = self.src == self.dst
+        # A repeated self loop is still a single edge
+        loop_nodes = np.unique(self.src[loops])
+        return CSRGraph.from_edge_array(self.nodes,
+                                        np.concatenate([self.src[~loops], loop_nodes]),
+                                        np.concatenate([self.dst[~loops], loop_nodes]))
+
+
+def _resolve_column(column: Optional[Column], by_position: bool) -> Optional[Hashable]:
+    """Column label as pandas sees it (digit strings are positions in headerless files)."""
+    if by_position and isinstance(column, str) and column.isdigit():
+        return int(column)
+    return column
+
+
+def _check_columns(chunk: pd.DataFrame, columns: Tuple[Optional[Hashable], ...], by_position: bool) -> None:
+    """Raise ValueError if a requested column is missing from the file."""
+    for column in columns:
+        if column is None:
+            continue
+        if by_position and column >= len(chunk.columns):
+            raise ValueError(f"Required column index {column} not found. Available columns: {len(chunk.columns)}")
+        if not by_position and column not in chunk.columns:
+            raise ValueError(f"Required column {column!r} not found. Available columns: {list(chunk.columns)}")
+
+
+def _integer_ids(texts: np.ndarray) -> Optional[np.ndarray]:
+    """The IDs as int64 if every one is written as a canonical decimal integer, else None.
+    
+    Canonical means exactly how the integer prints (no sign, padding or leading
+    zeros), so converting loses nothing and ``007`` always stays text.
+    """
+    try:
+        values = texts.astype(np.int64)
+    except (ValueError, OverflowError):
+        return None
+    # int() also accepts signs, spaces, underscores and non-ASCII digits; the
+    # text length matches the digit count only without any of those
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    digits = np.searchsorted(_POWERS_OF_TEN, values, side='right')
+    if (values >= 0).all() and np.array_equal(lengths, np.maximum(digits, 1)) and ''.join(texts).isascii():
+        return values
+    return None
+
+
+class _GrowableArray:
+    """Append-only NumPy buffer that doubles its capacity as it fills."""
+    
+    def __init__(self, dtype: np.dtype, capacity: int = 1 << 16):
+        self._data = np.empty(capacity, dtype=dtype)
+        self._size = 0
+    
+    def append(self, values: np.ndarray) -> None:
+        """Copy values onto the end, widening the dtype if they do not fit it."""
+        if not np.can_cast(values.dtype, self._data.dtype):
+            self._data = self._data.astype(np.result_type(self._data.dtype, values.dtype))
+        end = self._size + len(values)
+        if end > len(self._data):
+            grown = np.empty(max(end, 2 * len(self._data)), dtype=self._data.dtype)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size:end] = values
+        self._size = end
+    
+    def finish(self) -> np.ndarray:
+        """The filled part, with the spare capacity released."""
+        self._data.resize(self._size, refcheck=False)
+        return self._data
+
+
+class _Interner:
+    """Incremental node-ID interning: every distinct ID gets the next integer.
+    
+    IDs arrive as the text written in the file. While every ID is a
+    canonical integer (the norm in SNAP files) they live as int64 in a
+    sorted table that each chunk's new IDs are merged into, so lookups are
+    one ``np.searchsorted`` per chunk. The first other ID switches to a dict
+    keyed by each ID's text; canonical integers print back to the same
+    text, so the switch never merges or splits nodes.
+    """
+    
+    def __init__(self):
+        self._sorted_ids = np.empty(0, dtype=np.int64)
+        self._sorted_codes = np.empty(0, dtype=np.int64)
+        # Integer ID of every node, by code, until text IDs appear
+        self._numeric_nodes: Optional[_GrowableArray] = _GrowableArray(np.int64)
+        self._text: Optional[Dict[str, int]] = None
+        self.size = 0
+    
+    def codes(self, values: np.ndarray) -> np.ndarray:
+        """Integer IDs of a chunk of endpoint IDs read as text (Python only sees its new text IDs)."""
+        if self._text is None:
+            # Integer text is converted once and factorized as integers, much cheaper than as strings
+            numeric = _integer_ids(values)
+            if numeric is not None:
+                local, uniques = pd.factorize(numeric)
+                return self._narrow(self._numeric_codes(uniques)[local])
+        local, uniques = pd.factorize(values)
+        return self._narrow(self._intern(uniques)[local])
+    
+    def intern_distinct(self, values: np.ndarray, order: Optional[np.ndarray] = None) -> np.ndarray:
+        """Integer IDs of already distinct values in order of first appearance.
+        
+        Used to merge another interner's ``values()``; ``order`` is their
+        argsort when the caller already has it.
+        """
+        return self._narrow(self._intern(values, order))
+    
+    def _narrow(self, codes: np.ndarray) -> np.ndarray:
+        return codes.astype(np.int32) if self.size <= np.iinfo(np.int32).max else codes
+    
+    def _intern(self, uniques: np.ndarray, order: Optional[np.ndarray] = None) -> np.ndarray:
+        if self._text is None:
+            numeric = uniques if uniques.dtype.kind in 'iu' else _integer_ids(uniques)
+            if numeric is not None:
+                return self._numeric_codes(numeric.astype(np.int64, copy=False), order)
+        return self._text_codes(uniques)
+    
+    def _numeric_codes(self, uniques: np.ndarray, order: Optional[np.ndarray] = None) -> np.ndarray:
+        # Sorted queries keep the binary searches cache-friendly
+        if order is None:
+            order = np.argsort(uniques)
+        ordered = uniques[order]
+        slots = np.searchsorted(self._sorted_ids, ordered)
+        if len(self._sorted_ids):
+            known = self._sorted_ids[np.minimum(slots, len(self._sorted_ids) - 1)] == ordered
+        else:
+            known = np.zeros(len(uniques), dtype=bool)
+        mapping = np.empty(len(uniques), dtype=np.int64)
+        mapping[order[known]] = self._sorted_codes[slots[known]]
+        
+        # Uniques are in order of first appearance, so new codes follow it
+        fresh = np.zeros(len(uniques), dtype=bool)
+        fresh[order[~known]] = True
+        num_fresh = int(fresh.sum())
+        mapping[fresh] = np.arange(self.size, self.size + num_fresh, dtype=np.int64)
+        self._numeric_nodes.append(uniques[fresh])
+        self.size += num_fresh
+        
+        # Merge the (sorted) new IDs into the table: each lands after the old IDs below it
+        positions = slots[~known] + np.arange(num_fresh)
+        kept = np.ones(len(self._sorted_ids) + num_fresh, dtype=bool)
+        kept[positions] = False
+        for name, new_values in (('_sorted_ids', ordered[~known]), ('_sorted_codes', mapping[order[~known]])):
+            merged = np.empty(len(kept), dtype=np.int64)
+            merged[kept] = getattr(self, name)
+            merged[positions] = new_values
+            setattr(self, name, merged)
+        return mapping
+    
+    def _text_codes(self, uniques: np.ndarray) -> np.ndarray:
+        if self._text is None:
+            numeric = self._numeric_nodes.finish().tolist()
+            self._text = dict(zip(map(str, numeric), range(len(numeric))))
+            self._numeric_nodes = None
+            self._sorted_ids = self._sorted_codes = np.empty(0, dtype=np.int64)
+        index = self._text
+        mapping = np.fromiter((index.setdefault(node, len(index)) for node in map(str, uniques.tolist())),
+                              dtype=np.int64, count=len(uniques))
+        self.size = len(index)
+        return mapping
+    
+    def values(self) -> np.ndarray:
+        """Node IDs by code, as integers while every ID was one, else as text."""
+        if self._text is not None:
+            return np.array(list(self._text), dtype=object)
+        return self._numeric_nodes.finish()
+    
+    def nodes(self) -> List[str]:
+        """Node IDs as text, by code."""
+        if self._text is not None:
+            return list(self._text)
+        return [str(node) for node in self._numeric_nodes.finish().tolist()]
+
+
+class _ReadOptions(NamedTuple):
+    """How to parse the file, shared by the serial reader and every range worker."""
+    sep: str
+    comment: str
+    header: Optional[int]
+    names: Optional[List[Hashable]]
+    source_col: Hashable
+    target_col: Hashable
+    weight_col: Optional[Hashable]
+    chunk_rows: int
+
+
+class _RangeResult(NamedTuple):
+    """Edges of one byte range, interned locally (``nodes[i]`` is local node i).
+    
+    ``order`` is the argsort of integer ``nodes`` (None for text IDs), computed
+    in the worker so the merge does not have to.
+    """
+    nodes: np.ndarray
+    order: Optional[np.ndarray]
+    src: np.ndarray
+    dst: np.ndarray
+    attributes: Dict[str, np.ndarray]
+    rows: int
+
+
+def _chunk_endpoints(interner: _Interner, chunk: pd.DataFrame,
+                     options: _ReadOptions) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+    """Drop rows missing an endpoint and intern the rest; returns the kept rows and their (src, dst) codes."""
+    chunk = chunk.dropna(subset=[options.source_col, options.target_col])
+    sources = chunk[options.source_col].to_numpy(dtype=object)
+    targets = chunk[options.target_col].to_numpy(dtype=object)
+    # Interleave endpoints so IDs are numbered in order of first appearance
+    codes = interner.codes(np.column_stack([sources, targets]).ravel())
+    return chunk, codes[0::2], codes[1::2]
+
+
+class _EdgeSink:
+    """Accumulates parsed chunks (or whole parsed ranges) into growable arrays."""
+    
+    def __init__(self):
+        self.interner = _Interner()
+        self.src, self.dst = _GrowableArray(np.int32), _GrowableArray(np.int32)
+        self.attributes: Dict[str, _GrowableArray] = {}
+        self.rows = 0
+    
+    def _append_attribute(self, name: str, values: np.ndarray) -> None:
+        if name not in self.attributes:
+            self.attributes[name] = _GrowableArray(values.dtype)
+        self.attributes[name].append(values)
+    
+    def add_chunk(self, chunk: pd.DataFrame, options: _ReadOptions) -> None:
+        """Intern and append one parsed DataFrame chunk."""
+        chunk, src, dst = _chunk_endpoints(self.interner, chunk, options)
+        self.src.append(src)
+        self.dst.append(dst)
+        
+        for column in chunk.columns:
+            if column in (options.source_col, options.target_col):
+                continue
+            if column == options.weight_col:
+                self._append_attribute('weight', chunk[column].to_numpy(dtype=np.float64))
+            else:
+                self._append_attribute(str(column), chunk[column].to_numpy())
+        self.rows += len(chunk)
+    
+    def add_range(self, part: _RangeResult) -> None:
+        """Append a range parsed by a worker, translating its local node numbers.
+        
+        Feeding each range's nodes in their local first-appearance order, range
+        after range, numbers them exactly as one serial pass over the file would.
+        """
+        mapping = self.interner.intern_distinct(part.nodes, part.order)
+        self.src.append(mapping[part.src])
+        self.dst.append(mapping[part.dst])
+        for name, values in part.attributes.items():
+            self._append_attribute(name, values)
+        self.rows += part.rows
+    
+    def partial(self) -> _RangeResult:
+        """This sink's edges with its local numbering, for sending back from a worker."""
+        nodes = self.interner.values()
+        order = np.argsort(nodes) if nodes.dtype.kind in 'iu' else None
+        return _RangeResult(nodes, order, self.src.finish(), self.dst.finish(),
+                            {name: column.finish() for name, column in self.attributes.items()}, self.rows)
+    
+    def finish(self) -> EdgeList:
+        return EdgeList(self.interner.nodes(), self.src.finish(), self.dst.finish(),
+                        {name: column.finish() for name, column in self.attributes.items()})
+
+
+class _ByteRange(io.RawIOBase):
+    """Read-only stream over bytes ``[start, end)`` of a file."""
+    
+    def __init__(self, filepath: str, start: int, end: int):
+        super().__init__()
+        self._file = open(filepath, 'rb')
+        self._file.seek(start)
+        self._remaining = end - start
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        count = self._file.readinto(memoryview(buffer)[:self._remaining])
+        self._remaining -= count
+        return count
+    
+    def close(self) -> None:
+        self._file.close()
+        super().close()
+
+
+def _read_chunks(handle, options: _ReadOptions) -> Iterator[pd.DataFrame]:
+    # IDs are read as text in every chunk, never as whatever dtype that chunk's values suggest
+    ids = {options.source_col: str, options.target_col: str}
+    return pd.read_csv(handle, sep=options.sep, comment=options.comment, header=options.header,
+                       names=options.names, dtype=ids, engine="c", chunksize=options.chunk_rows)
+
+
+def _parse_range(filepath: str, start: int, end: int, options: _ReadOptions) -> _RangeResult:
+    """Worker: parse one newline-aligned byte range with its own local interning."""
+    sink = _EdgeSink()
+    with io.BufferedReader(_ByteRange(filepath, start, end)) as handle:
+        for chunk in _read_chunks(handle, options):
+            sink.add_chunk(chunk, options)
+    return sink.partial()
+
+
+def _data_start(filepath: str, comment: str) -> int:
+    """Byte offset just past the header line (the first line neither blank nor a comment)."""
+    with open(filepath, 'rb') as handle:
+        for line in iter(handle.readline, b''):
+            stripped = line.strip()
+            if stripped and not stripped.startswith(comment.encode()):
+                return handle.tell()
+        return handle.tell()
+
+
+def _byte_ranges(filepath: str, start: int, end: int, count: int) -> List[Tuple[int, int]]:
+    """Split ``[start, end)`` into up to ``count`` ranges that each begin at a line start."""
+    bounds = [start]
+    with open(filepath, 'rb') as handle:
+        for k in range(1, count):
+            nominal = start + (end - start) * k // count
+            if nominal <= bounds[-1]:
+                continue
+            # Finish the line holding byte nominal - 1 (a no-op right after a newline)
+            handle.seek(nominal - 1)
+            handle.readline()
+            if bounds[-1] < handle.tell() < end:
+                bounds.append(handle.tell())
+    bounds.append(end)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _read_options(filepath: str, source_col: Column, target_col: Column, weight_col: Optional[Column],
+                  delimiter: str, comment: str, chunk_rows: int) -> Tuple[_ReadOptions, pd.DataFrame]:
+    """Resolve the columns and check them against the first line; returns the options and that line."""
+    by_position = all(isinstance(_resolve_column(column, True), int)
+                      for column in (source_col, target_col, weight_col) if column is not None)
+    source_col, target_col, weight_col = (_resolve_column(column, by_position)
+                                          for column in (source_col, target_col, weight_col))
+    options = _ReadOptions(r"\s+" if delimiter.isspace() else delimiter, comment, None if by_position else 0,
+                           None, source_col, target_col, weight_col, chunk_rows)
+    probe = pd.read_csv(filepath, sep=options.sep, comment=comment, header=options.header, nrows=1, engine="c")
+    _check_columns(probe, (source_col, target_col, weight_col), by_position)
+    return options, probe
+
+
+class EdgeStream:
+    """The endpoints of an edge-list file as a stream of interned chunks.
+    
+    For consumers that never hold every edge at once (see ``memmap_graph``):
+    iterating parses the file ``chunk_rows`` lines at a time, exactly as
+    ``read_edge_list`` does, and yields each chunk's ``(src, dst)`` integer
+    codes. Codes are stable across chunks; ``nodes()`` gives the ID of each
+    code once the stream has been consumed. Other columns are not read.
+    """
+    
+    def __init__(self, filepath: str, source_col: Column = 0, target_col: Column = 1, delimiter: str = ",",
+                 comment: str = "#", chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                 progress: Optional[ProgressCallback] = None):
+        """Check the columns against the first line; nothing else is read until iteration."""
+        self.filepath = filepath
+        self.options, _ = _read_options(filepath, source_col, target_col, None, delimiter, comment, chunk_rows)
+        self.progress = progress
+        self.rows = 0
+        self._interner = _Interner()
+    
+    def __iter__(self) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        total_bytes = os.path.getsize(self.filepath)
+        with open(self.filepath, 'rb') as handle:
+            for chunk in _read_chunks(handle, self.options):
+                chunk, src, dst = _chunk_endpoints(self._interner, chunk, self.options)
+                self.rows += len(chunk)
+                if self.progress is not None:
+                    self.progress(self.rows, handle.tell(), total_bytes)
+                yield src, dst
+    
+    @property
+    def num_nodes(self) -> int:
+        """Distinct node IDs seen so far."""
+        return self._interner.size
+    
+    def values(self) -> np.ndarray:
+        """Node IDs by code, as integers while every ID was one, else as text."""
+        return self._interner.values()
+    
+    def nodes(self) -> List[str]:
+        """Node IDs as text, by code."""
+        return self._interner.nodes()
+
+
+def read_edge_list(filepath: str, source_col: Column = 0, target_col: Column = 1,
+                   weight_col: Optional[Column] = None, delimiter: str = ",",
+                   comment: str = "#", chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                   progress: Optional[ProgressCallback] = None, workers: Optional[int] = 1) -> EdgeList:
+    """Stream an edge-list file into an ``EdgeList`` with bounded memory.
+    
+    Integer columns are positions in a headerless file; string column names
+    read the first line as a header. A whitespace ``delimiter`` accepts any
+    run of spaces and tabs, and lines starting with ``comment`` are skipped
+    (as in the SNAP files). The file is parsed ``chunk_rows`` lines at a
+    time: node IDs are interned incrementally (kept as the strings written
+    in the file, numbered in order of first appearance) and endpoints and
+    other columns are appended to growable arrays, so no more than one
+    chunk is ever held as a DataFrame.
+    
+    With ``workers`` > 1 (None or <= 0 for every CPU core) files of more
+    than a few megabytes are split into newline-aligned byte ranges parsed
+    by a process pool, each interning its own IDs; the ranges are then
+    merged in file order, which gives exactly the serial result.
+    ``progress(rows, bytes_read, total_bytes)`` is called after every chunk
+    (every range when parallel).
+    """
+    options, probe = _read_options(filepath, source_col, target_col, weight_col, delimiter, comment, chunk_rows)
+    
+    total_bytes = os.path.getsize(filepath)
+    workers = resolve_workers(workers)
+    num_ranges = min(workers * 4, total_bytes // _MIN_RANGE_BYTES)
+    sink = _EdgeSink()
+    if workers > 1 and num_ranges > 1:
+        # Every range is parsed headerless with the column labels found above
+        start = 0 if options.header is None else _data_start(filepath, comment)
+        ranges = _byte_ranges(filepath, start, total_bytes, num_ranges)
+        options = options._replace(header=None, names=list(probe.columns))
+        with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+            parts = pool.map(_parse_range, repeat(filepath), *zip(*ranges), repeat(options))
+            for (_, end), part in zip(ranges, parts):
+                sink.add_range(part)
+                if progress is not None:
+                    progress(sink.rows, end, total_bytes)
+        return sink.finish()
+    
+    with open(filepath, 'rb') as handle:
+        for chunk in _read_chunks(handle, options):
+            sink.add_chunk(chunk, options)
+            if progress is not None:
+                progress(sink.rows, handle.tell(), total_bytes)
+    return sink.finish()
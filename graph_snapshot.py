@@ -0,0 +1,270 @@
+from typing import Any, Dict, Hashable, List, NamedTuple, Optional, Tuple
+import json
+import os
+import warnings
+import numpy as np
+import networkx as nx
+
+from csr_graph import CSRGraph
+
+
+SNAPSHOT_EXTENSION = ".gsnap"
+
+_MAGIC = b"GSNAP\x00\x00\x01"
+_VERSION = 1
+# Every array starts on a 64-byte boundary so memory-mapped views stay aligned
+_ALIGN = 64
+
+
+class AttributeColumn(NamedTuple):
+    """One node or edge attribute as a column; ``present`` is None when every row has a value."""
+    values: Any
+    present: Optional[np.ndarray]
+
+
+class GraphSnapshot(NamedTuple):
+    """A graph read back from a snapshot file.
+    
+    Arrays are read-only memory maps into the file, so opening a snapshot
+    costs little more than decoding the node IDs. ``csr`` is the undirected
+    CSR view the analyzer works on; ``src``/``dst`` list every edge once in
+    the graph's own order (directed edges keep their orientation) and edge
+    attribute columns are aligned with them.
+    """
+    nodes: List[Hashable]
+    csr: CSRGraph
+    src: np.ndarray
+    dst: np.ndarray
+    node_attributes: Dict[str, AttributeColumn]
+    edge_attributes: Dict[str, AttributeColumn]
+    directed: bool
+    graph_attributes: Dict[str, Any]
+    info: Dict[str, Any]
+    
+    def to_networkx(self) -> nx.Graph:
+        """Rebuild the NetworkX graph with its node, edge and graph attributes."""
+        G = nx.DiGraph() if self.directed else nx.Graph()
+        G.graph.update(self.graph_attributes)
+        G.add_nodes_from(zip(self.nodes, _attribute_dicts(self.node_attributes, len(self.nodes))))
+        nodes = self.nodes
+        G.add_edges_from(zip(map(nodes.__getitem__, self.src.tolist()), map(nodes.__getitem__, self.dst.tolist()),
+                             _attribute_dicts(self.edge_attributes, len(self.src))))
+        return G
+
+
+def _attribute_dicts(columns: Dict[str, AttributeColumn], rows: int) -> List[Dict[str, Any]]:
+    """Per-row attribute dicts from columns, leaving out missing values."""
+    dicts: List[Dict[str, Any]] = [{} for _ in range(rows)]
+    for name, column in columns.items():
+        values = column.values.tolist() if isinstance(column.values, np.ndarray) else column.values
+        present = column.present.tolist() if column.present is not None else [True] * rows
+        for attributes, value, has_value in zip(dicts, values, present):
+            if has_value:
+                attributes[name] = value
+    return dicts
+
+
+def _value_kind(value: Any) -> str:
+    if isinstance(value, (bool, np.bool_)):
+        return 'bool'
+    if isinstance(value, (int, np.integer)):
+        return 'int'
+    if isinstance(value, (float, np.floating)):
+        return 'float'
+    if isinstance(value, str):
+        return 'text'
+    return 'other'
+
+
+def _encode_text(values: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """UTF-8 bytes of all strings back to back, plus the offset of each one."""
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _decode_text(blob: np.ndarray, offsets: np.ndarray) -> List[str]:
+    data = blob.tobytes()
+    bounds = offsets.tolist()
+    return [data[start:end].decode('utf-8') for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+def _encode_column(values: List[Any], prefix: str, arrays: Dict[str, np.ndarray]) -> Optional[str]:
+    """Add the arrays of one column under ``prefix``; returns its kind, or None if it cannot be stored.
+    
+    Booleans, integers, floats (integers mixed with floats become floats) and
+    strings are supported; missing rows are marked in ``<prefix>.present``.
+    """
+    present = np.array([value is not None for value in values], dtype=bool)
+    kinds = {_value_kind(value) for value in values if value is not None}
+    if kinds <= {'text'}:
+        kind = 'text'
+        arrays[prefix + '.blob'], arrays[prefix + '.offsets'] = _encode_text(
+            ['' if value is None else value for value in values])
+    elif kinds == {'bool'} or kinds <= {'int', 'float'}:
+        kind = 'bool' if kinds == {'bool'} else 'int' if kinds == {'int'} else 'float'
+        filler = {'bool': False, 'int': 0, 'float': 0.0}[kind]
+        try:
+            arrays[prefix] = np.array([filler if value is None else value for value in values],
+                                      dtype={'bool': bool, 'int': np.int64, 'float': np.float64}[kind])
+        except OverflowError:
+            return None
+    else:
+        return None
+    if not present.all():
+        arrays[prefix + '.present'] = present
+    return kind
+
+
+def _decode_column(kind: str, prefix: str, arrays: Dict[str, np.ndarray]) -> AttributeColumn:
+    if kind == 'text':
+        values = _decode_text(arrays[prefix + '.blob'], arrays[prefix + '.offsets'])
+    else:
+        values = arrays[prefix]
+    return AttributeColumn(values, arrays.get(prefix + '.present'))
+
+
+def _encode_attributes(rows: List[Dict[str, Any]], scope: str,
+                       arrays: Dict[str, np.ndarray]) -> List[Tuple[str, str, str]]:
+    """Encode every attribute found on the rows; returns ``(name, kind, prefix)`` of the stored ones."""
+    names = list(dict.fromkeys(name for attributes in rows for name in attributes))
+    stored = []
+    for position, name in enumerate(names):
+        prefix = f"{scope}.{position}"
+        kind = _encode_column([attributes.get(name) for attributes in rows], prefix, arrays)
+        if kind is None:
+            warnings.warn(f"Skipping {scope} attribute {name!r}: only bool, numeric and string values are stored")
+            continue
+        stored.append((str(name), kind, prefix))
+    return stored
+
+
+def _padded(size: int) -> int:
+    return -(-size // _ALIGN) * _ALIGN
+
+
+def _json_value(value: Any) -> Any:
+    """The value as it reads back from a JSON header (tuples become lists, other objects strings)."""
+    return json.loads(json.dumps(value, default=str))
+
+
+def save_snapshot(path: str, G: nx.Graph, csr: Optional[CSRGraph] = None,
+                  info: Optional[Dict[str, Any]] = None,
+                  source_options: Optional[Dict[str, Any]] = None) -> None:
+    """Write G to a single-file binary snapshot.
+    
+    The file holds a small JSON header followed by raw, aligned arrays: the
+    CSR view (``csr`` if given, which must be the view of G, else built),
+    the edge list, the node ID table and one column per node or edge
+    attribute. ``info`` (e.g. a loader's ``graph_info``) is stored in the
+    header, and so are ``source_options``, the options G was loaded with
+    (delimiter, columns, directed, ...), which ``snapshot_is_current``
+    compares before the snapshot stands in for its source file. The file is
+    written next to ``path`` and moved into place, so readers never see a
+    partial snapshot.
+    """
+    csr = csr if csr is not None else CSRGraph.from_networkx(G)
+    nodes = list(G.nodes())
+    index = {node: i for i, node in enumerate(nodes)}
+    edges = list(G.edges(data=True))
+    arrays: Dict[str, np.ndarray] = {
+        'csr.indptr': csr.indptr,
+        'csr.indices': csr.indices,
+        'csr.self_loops': csr.self_loops,
+        'edges.src': np.fromiter((index[u] for u, _, _ in edges), dtype=np.int32, count=len(edges)),
+        'edges.dst': np.fromiter((index[v] for _, v, _ in edges), dtype=np.int32, count=len(edges)),
+    }
+    id_kind = _encode_column(nodes, 'ids', arrays)
+    if id_kind not in ('int', 'text'):
+        raise ValueError("Graph snapshots need node IDs that are all integers or all strings")
+    meta = {
+        'version': _VERSION,
+        'directed': G.is_directed(),
+        'id_kind': id_kind,
+        'node_attributes': _encode_attributes([data for _, data in G.nodes(data=True)], 'node', arrays),
+        'edge_attributes': _encode_attributes([data for _, _, data in edges], 'edge', arrays),
+        'graph_attributes': _json_value(G.graph),
+        'info': _json_value(info or {}),
+        'source_options': _json_value(source_options or {}),
+    }
+    
+    entries, offset = {}, 0
+    for name, array in arrays.items():
+        entries[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset += _padded(array.nbytes)
+    header = json.dumps({'meta': meta, 'arrays': entries}).encode('utf-8')
+    
+    partial = path + ".partial"
+    with open(partial, 'wb') as handle:
+        handle.write(_MAGIC)
+        handle.write(np.uint64(len(header)).tobytes())
+        handle.write(header)
+        handle.write(b"\0" * (_padded(handle.tell()) - handle.tell()))
+        for array in arrays.values():
+            data = np.ascontiguousarray(array).tobytes()
+            handle.write(data)
+            handle.write(b"\0" * (_padded(len(data)) - len(data)))
+    os.replace(partial, path)
+
+
+def _read_header(path: str, raw: np.ndarray) -> Tuple[int, Dict[str, Any]]:
+    """Length and contents of the JSON header; raises ValueError unless it is a supported snapshot."""
+    if len(raw) < 16 or raw[:8].tobytes() != _MAGIC:
+        raise ValueError(f"{path} is not a graph snapshot")
+    length = int(raw[8:16].view(np.uint64)[0])
+    header = json.loads(raw[16:16 + length].tobytes())
+    if header['meta'].get('version') != _VERSION:
+        raise ValueError(f"Unsupported graph snapshot version in {path}: {header['meta'].get('version')}")
+    return length, header
+
+
+def load_snapshot(path: str) -> GraphSnapshot:
+    """Open a snapshot written by ``save_snapshot``; arrays are memory-mapped, not read.
+    
+    Raises ValueError if the file is not a snapshot of a supported version.
+    """
+    raw = np.memmap(path, dtype=np.uint8, mode='r')
+    length, header = _read_header(path, raw)
+    meta = header['meta']
+    
+    start = _padded(16 + length)
+    arrays = {}
+    for name, entry in header['arrays'].items():
+        dtype = np.dtype(entry['dtype'])
+        count = int(np.prod(entry['shape'], dtype=np.int64))
+        begin = start + entry['offset']
+        arrays[name] = raw[begin:begin + count * dtype.itemsize].view(dtype).reshape(entry['shape'])
+    
+    if meta['id_kind'] == 'text':
+        nodes: List[Hashable] = _decode_text(arrays['ids.blob'], arrays['ids.offsets'])
+    else:
+        nodes = arrays['ids'].tolist()
+    csr = CSRGraph(nodes, arrays['csr.indptr'], arrays['csr.indices'], arrays['csr.self_loops'])
+    return GraphSnapshot(
+        nodes=nodes,
+        csr=csr,
+        src=arrays['edges.src'],
+        dst=arrays['edges.dst'],
+        node_attributes={name: _decode_column(kind, prefix, arrays) for name, kind, prefix in meta['node_attributes']},
+        edge_attributes={name: _decode_column(kind, prefix, arrays) for name, kind, prefix in meta['edge_attributes']},
+        directed=meta['directed'],
+        graph_attributes=meta['graph_attributes'],
+        info=meta['info'],
+    )
+
+
+def snapshot_is_current(snapshot_path: str, source_path: str,
+                        source_options: Optional[Dict[str, Any]] = None) -> bool:
+    """True if the snapshot can stand in for loading ``source_path`` with ``source_options``.
+    
+    It must exist, be at least as new as the source file and record the
+    same loader options; a snapshot that cannot be read is never current.
+    """
+    if not (os.path.exists(snapshot_path) and os.path.getmtime(snapshot_path) >= os.path.getmtime(source_path)):
+        return False
+    try:
+        _, header = _read_header(snapshot_path, np.memmap(snapshot_path, dtype=np.uint8, mode='r'))
+    except (ValueError, KeyError):
+        return False
+    return header['meta'].get('source_options') == _json_value(source_options or {})
@@ -1,16 +1,97 @@
-from typing import Dict, List, Optional, Tuple, Any, Set
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Any, Set, Union
+import heapq
 import networkx as nx
 import numpy as np
 from models import GraphMetrics, NodeData, EdgeData, GraphAnalysisResult
+from metrics_cache import MetricsCache, get_metrics_cache
+from centrality import approximate_betweenness_centrality, top_k_betweenness_centrality
+import community_detection
+import community_quality
+from csr_graph import CSRGraph, TriangleStats
+from distance_oracle import DistanceOracle
+from incremental_metrics import IncrementalMetrics
+from memmap_graph import MemmapGraph
+import hyperanf
+import robustness
+import shortest_paths
 import warnings
 
 
+# Fields that are always present on GraphMetrics (constant-time to compute)
+BASIC_METRIC_FIELDS = ('num_nodes', 'num_edges', 'density')
+
+# Cache keys whose values survive add_edges/remove_edges/remove_nodes as stale
+# results (recomputed only after refresh_stale_metrics), with the fields they feed
+STALE_METRIC_KEYS = {
+    'betweenness_centrality': ('betweenness_centrality', 'betweenness_approximation'),
+    'top_k_betweenness': ('betweenness_centrality', 'betweenness_approximation'),
+    'closeness_centrality': ('closeness_centrality',),
+    'top_k_closeness': ('closeness_centrality',),
+    'eigenvector_centrality': ('eigenvector_centrality',),
+    'average_shortest_path_length': ('average_shortest_path_length', 'average_shortest_path_length_estimate'),
+    'diameter_radius': ('diameter', 'radius'),
+}
+
+# Named groups accepted by calculate_comprehensive_metrics(fields=...)
+METRIC_FIELD_GROUPS = {
+    'basic_stats': BASIC_METRIC_FIELDS,
+    'connectivity': ('clustering_coefficient', 'num_connected_components', 'largest_component_size'),
+    'components': ('num_connected_components', 'largest_component_size'),
+    'clustering': ('clustering_coefficient', 'average_clustering'),
+    'centrality': ('degree_centrality', 'betweenness_centrality', 'betweenness_approximation',
+                   'closeness_centrality', 'eigenvector_centrality'),
+    # Betweenness always travels with its approximation guarantee
+    'betweenness_centrality': ('betweenness_centrality', 'betweenness_approximation'),
+    'paths': ('average_shortest_path_length', 'average_shortest_path_length_estimate', 'diameter', 'radius'),
+    # HyperANF sketches: approximate distance distribution without any BFS
+    'neighborhood_function': ('effective_diameter', 'neighborhood_function'),
+}
+
+
 class SocialGraphAnalyzer:
     """Comprehensive social graph analysis tools using NetworkX."""
     
-    def __init__(self, graph: Optional[nx.Graph] = None):
-        """Initialize with an optional NetworkX graph."""
+    def __init__(self, graph: Optional[nx.Graph] = None, approx_betweenness_threshold: Optional[int] = 2000,
+                 betweenness_epsilon: float = 0.02, betweenness_delta: float = 0.1,
+                 betweenness_seed: Optional[int] = None, workers: Optional[int] = 1,
+                 aspl_sample_budget: int = 500, aspl_seed: Optional[int] = None,
+                 oracle_landmarks: int = 16, anf_precision: int = 6, anf_seed: Optional[int] = None):
+        """Initialize with an optional NetworkX graph.
+        
+        Betweenness centrality is estimated by shortest-path sampling (within
+        ``betweenness_epsilon`` of the exact value with probability
+        ``1 - betweenness_delta``) on graphs with more than
+        ``approx_betweenness_threshold`` nodes; pass None to always compute it exactly.
+        
+        Exact betweenness and closeness are sums over independent single-source
+        BFS passes; ``workers`` splits the sources across that many processes
+        (None uses every CPU core, 1 runs in-process).
+        
+        Average shortest path length is estimated over the largest component
+        from at most ``aspl_sample_budget`` sampled BFS sources (exact when the
+        component is no larger than the budget).
+        
+        Point-to-point path queries are answered by a distance oracle with
+        ``oracle_landmarks`` landmarks, built on the first query of a graph version.
+        
+        The neighborhood function, effective diameter and per-node reach come
+        from HyperANF with ``2**anf_precision`` registers per counter.
+        
+        ``graph`` may be a ``MemmapGraph`` (see ``memmap_graph``): the
+        array-based metrics then run on its memory-mapped CSR view and the
+        NetworkX-based ones read it through its read-only adjacency.
+        """
         self.graph = graph or nx.Graph()
+        self.approx_betweenness_threshold = approx_betweenness_threshold
+        self.betweenness_epsilon = betweenness_epsilon
+        self.betweenness_delta = betweenness_delta
+        self.betweenness_seed = betweenness_seed
+        self.workers = workers
+        self.aspl_sample_budget = aspl_sample_budget
+        self.aspl_seed = aspl_seed
+        self.oracle_landmarks = oracle_landmarks
+        self.anf_precision = anf_precision
+        self.anf_seed = anf_seed
     
     def load_graph_from_data(self, nodes: List[NodeData], edges: List[EdgeData]) -> nx.Graph:
         """Load graph from structured node and edge data."""
@@ -74,136 +155,487 @@ class SocialGraphAnalyzer:
         
         return self.graph
     
-    def calculate_comprehensive_metrics(self) -> GraphMetrics:
-        """Calculate comprehensive social network metrics."""
-        if not self.graph:
-            raise ValueError("No graph loaded")
+    @property
+    def metrics_cache(self) -> MetricsCache:
+        """Metrics cache shared by every analyzer holding the current graph."""
+        return get_metrics_cache(self.graph)
+    
+    def invalidate_metrics(self) -> None:
+        """Discard cached metrics after the graph was mutated in place."""
+        self.metrics_cache.invalidate()
+    
+    def add_edges(self, edges: Iterable[Tuple[Any, ...]]) -> None:
+        """Insert edges given as ``(u, v)`` or ``(u, v, attributes)``.
         
-        # Basic metrics
-        num_nodes = self.graph.number_of_nodes()
-        num_edges = self.graph.number_of_edges()
-        density = nx.density(self.graph)
+        Degree, components, triangles, clustering and density stay current at a
+        cost proportional to the touched neighborhoods; expensive centralities
+        and path metrics are kept but marked stale (see ``stale_metrics``).
+        """
+        def insert(state: IncrementalMetrics) -> None:
+            for u, v, *attributes in edges:
+                state.add_edge(u, v, **(attributes[0] if attributes else {}))
+        self._apply_update(insert)
+    
+    def remove_edges(self, edges: Iterable[Tuple[Any, Any]]) -> None:
+        """Delete edges, updating maintained metrics incrementally (see ``add_edges``)."""
+        def delete(state: IncrementalMetrics) -> None:
+            for u, v, *_ in edges:
+                state.remove_edge(u, v)
+        self._apply_update(delete)
+    
+    def remove_nodes(self, nodes: Iterable[Any]) -> None:
+        """Delete nodes and their edges, updating maintained metrics incrementally."""
+        nodes = list(nodes)
+        def delete(state: IncrementalMetrics) -> None:
+            for node in nodes:
+                state.remove_node(node)
+        self._apply_update(delete, removed=nodes)
+    
+    @property
+    def stale_metrics(self) -> List[str]:
+        """GraphMetrics fields whose cached values predate the latest graph edits."""
+        return sorted(self.metrics_cache.peek('stale_fields', self.graph, set()))
+    
+    def refresh_stale_metrics(self) -> None:
+        """Drop stale values so the next request recomputes them on the edited graph."""
+        cache = self.metrics_cache
+        cache.invalidate([key for key in cache.keys(self.graph) if self._stale_key_name(key)] + ['stale_fields'])
+    
+    def _incremental_metrics(self) -> IncrementalMetrics:
+        """State maintained across edits; built on the first edit of a graph version."""
+        return self._cached_metric('incremental', lambda: IncrementalMetrics(self.graph, self.csr))
+    
+    def _stale_key_name(self, key: Any) -> Optional[str]:
+        """Name of a cache key that may be served stale after edits, else None."""
+        name = key[0] if isinstance(key, tuple) else key
+        return name if name in STALE_METRIC_KEYS else None
+    
+    def _apply_update(self, update: Callable[[IncrementalMetrics], None], removed: Iterable[Any] = ()) -> None:
+        """Run an edit through the incremental state and carry surviving cache entries over."""
+        cache = self.metrics_cache
+        state = self._incremental_metrics()
+        carried = [key for key in cache.keys(self.graph) if self._stale_key_name(key)]
+        stale_fields = set(cache.peek('stale_fields', self.graph, set()))
+        for key in carried:
+            stale_fields.update(STALE_METRIC_KEYS[self._stale_key_name(key)])
         
-        # Centrality metrics
-        degree_centrality = nx.degree_centrality(self.graph)
-        betweenness_centrality = nx.betweenness_centrality(self.graph)
-        closeness_centrality = nx.closeness_centrality(self.graph)
+        cache.update(self.graph, lambda: update(state), keep=['incremental'] + carried)
+        for key in carried:
+            self._drop_removed_nodes(cache.peek(key, self.graph), set(removed))
+        if stale_fields:
+            cache.put('stale_fields', self.graph, stale_fields)
+    
+    def _drop_removed_nodes(self, value: Any, removed: Set[Any]) -> None:
+        """Remove deleted nodes from a stale per-node result in place."""
+        if not removed:
+            return
+        if isinstance(value, dict):
+            for node in removed:
+                value.pop(node, None)
+        elif isinstance(value, list):
+            value[:] = [entry for entry in value if not (isinstance(entry, tuple) and entry[0] in removed)]
+        elif isinstance(value, tuple):
+            for part in value:
+                self._drop_removed_nodes(part, removed)
+    
+    def _cached_metric(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Memoize a single metric against the current graph version."""
+        return self.metrics_cache.get(key, self.graph, compute)
+    
+    @property
+    def csr(self) -> CSRGraph:
+        """Array-backed view of the current graph, built once per graph version.
         
-        # Handle eigenvector centrality carefully
+        A ``MemmapGraph`` already is one, memory-mapped, and is used as-is.
+        """
+        if isinstance(self.graph, MemmapGraph):
+            return self.graph.csr
+        return self._cached_metric('csr', lambda: CSRGraph.from_networkx(self.graph))
+    
+    def _degree_centrality(self) -> Dict[Any, float]:
+        """Degree centrality from the incremental state after edits, else the CSR degree array."""
+        state = self.metrics_cache.peek('incremental', self.graph)
+        if state is not None:
+            return state.degree_centrality()
+        csr = self.csr
+        if csr.num_nodes <= 1:
+            return {node: 1.0 for node in csr.nodes}
+        return csr.to_dict(csr.degree() * (1.0 / (csr.num_nodes - 1)))
+    
+    def _clustering_metrics(self) -> Tuple[float, float]:
+        """Transitivity and average clustering, from the incremental state after edits."""
+        state = self.metrics_cache.peek('incremental', self.graph)
+        if state is not None:
+            return state.transitivity, state.average_clustering
+        stats = self._triangle_stats()
+        return stats.transitivity, stats.average_clustering
+    
+    def _triangle_stats(self) -> TriangleStats:
+        """Triangle counts, transitivity and average clustering from one shared pass."""
+        return self._cached_metric('triangle_stats', self.csr.triangle_stats)
+    
+    def _eigenvector_centrality(self) -> Dict[Any, float]:
+        """Eigenvector centrality (power iteration over the CSR blocks), zeros when it does not converge."""
         try:
-            eigenvector_centrality = nx.eigenvector_centrality(self.graph, max_iter=1000)
+            return self.csr.to_dict(self.csr.eigenvector_centrality(max_iter=1000))
         except nx.PowerIterationFailedConvergence:
             warnings.warn("Eigenvector centrality did not converge, using zeros")
-            eigenvector_centrality = {node: 0.0 for node in self.graph.nodes()}
-        
-        # Clustering metrics
-        clustering_coefficient = nx.transitivity(self.graph)
-        average_clustering = nx.average_clustering(self.graph)
-        
-        # Path metrics (only for connected graphs)
-        average_shortest_path_length = None
-        diameter = None
-        if nx.is_connected(self.graph):
-            average_shortest_path_length = nx.average_shortest_path_length(self.graph)
-            diameter = nx.diameter(self.graph)
-        
-        # Component analysis
-        connected_components = list(nx.connected_components(self.graph))
-        num_connected_components = len(connected_components)
-        largest_component_size = len(max(connected_components, key=len)) if connected_components else 0
-        
-        return GraphMetrics(
-            num_nodes=num_nodes,
-            num_edges=num_edges,
-            density=density,
-            degree_centrality=degree_centrality,
-            betweenness_centrality=betweenness_centrality,
-            closeness_centrality=closeness_centrality,
-            eigenvector_centrality=eigenvector_centrality,
-            clustering_coefficient=clustering_coefficient,
-            average_clustering=average_clustering,
-            average_shortest_path_length=average_shortest_path_length,
-            diameter=diameter,
-            num_connected_components=num_connected_components,
-            largest_component_size=largest_component_size
-        )
+            return {node: 0.0 for node in self.graph.nodes()}
+    
+    def _use_approximate_betweenness(self) -> bool:
+        """Whether the current graph is above the exact-betweenness size threshold."""
+        return (self.approx_betweenness_threshold is not None
+                and self.graph.number_of_nodes() > self.approx_betweenness_threshold)
+    
+    def _sampling_graph(self) -> Union[nx.Graph, CSRGraph]:
+        """Graph the betweenness samplers walk: the CSR arrays of a ``MemmapGraph``, never its adjacency dicts."""
+        return self.csr if isinstance(self.graph, MemmapGraph) else self.graph
+    
+    def _betweenness_centrality(self) -> Tuple[Dict[Any, float], Optional[Dict[str, Any]]]:
+        """Betweenness centrality and its approximation guarantee (None when exact)."""
+        if self._use_approximate_betweenness():
+            key = ('betweenness_centrality', self.betweenness_epsilon, self.betweenness_delta, self.betweenness_seed)
+            return self._cached_metric(key, lambda: approximate_betweenness_centrality(
+                self._sampling_graph(),
+                epsilon=self.betweenness_epsilon,
+                delta=self.betweenness_delta,
+                seed=self.betweenness_seed
+            ))
+        return self._cached_metric('betweenness_centrality', lambda: (
+            shortest_paths.betweenness_from_sweep(self.csr, self._path_sweep(with_betweenness=True)), None))
+    
+    def _path_sweep(self, with_betweenness: bool = False) -> shortest_paths.PathSweep:
+        """Shared all-sources BFS sweep feeding betweenness, closeness, ASPL and diameter.
+        
+        The Brandes backward pass is included whenever betweenness is going to be
+        computed exactly anyway, so one traversal serves all four metrics.
+        """
+        cached = self.metrics_cache.peek('path_sweep', self.graph)
+        if cached is not None and (cached.dependency_sum is not None or not with_betweenness):
+            return cached
+        
+        with_betweenness = with_betweenness or not self._use_approximate_betweenness()
+        sweep = shortest_paths.all_sources_sweep(self.csr, betweenness=with_betweenness, workers=self.workers)
+        self.metrics_cache.put('path_sweep', self.graph, sweep)
+        return sweep
+    
+    def _is_connected(self) -> bool:
+        """Whether the graph forms a single connected component."""
+        return self._cached_metric('components', self._component_metrics)[0] == 1
+    
+    def _average_shortest_path_length(self) -> Dict[str, Any]:
+        """Average shortest path length of the largest component with its sampling error.
+        
+        Reuses an already computed all-sources sweep on connected graphs;
+        otherwise samples at most ``aspl_sample_budget`` BFS sources.
+        """
+        sweep = self.metrics_cache.peek('path_sweep', self.graph)
+        if sweep is not None and self._is_connected():
+            mean = shortest_paths.average_shortest_path_length_from_sweep(self.csr, sweep)
+            n = self.csr.num_nodes
+            return {"mean": mean, "stderr": 0.0, "ci95": [mean, mean], "samples": n,
+                    "population": n, "scope": "graph", "exact": True}
+        
+        key = ('average_shortest_path_length', self.aspl_sample_budget, self.aspl_seed)
+        return self._cached_metric(key, lambda: shortest_paths.estimate_average_shortest_path_length(
+            self.csr,
+            sample_budget=self.aspl_sample_budget,
+            seed=self.aspl_seed,
+            workers=self.workers
+        ))
+    
+    def _diameter_and_radius(self) -> Tuple[Optional[int], Optional[int]]:
+        """Exact diameter and radius via eccentricity bounds (only for connected graphs)."""
+        if not self._is_connected():
+            return None, None
+        diameter, radius, _ = shortest_paths.diameter_and_radius(self.csr)
+        return diameter, radius
+    
+    def _neighborhood_function(self) -> hyperanf.NeighborhoodFunction:
+        """HyperANF run shared by the effective diameter, the neighborhood function and node reach."""
+        key = ('neighborhood_function', self.anf_precision, self.anf_seed)
+        return self._cached_metric(key, lambda: hyperanf.hyperanf(self.csr, self.anf_precision, self.anf_seed))
+    
+    def node_reach(self) -> Dict[Any, float]:
+        """Estimated number of nodes each node can reach (itself included), from HyperANF."""
+        return self.csr.to_dict(self._neighborhood_function().reach)
+    
+    def core_numbers(self) -> Dict[Any, int]:
+        """Core number of every node (the largest k whose k-core holds it), self loops ignored."""
+        return self.csr.to_dict(self._cached_metric('core_numbers', self.csr.core_numbers))
+    
+    def _component_metrics(self) -> Tuple[int, int]:
+        """Number of connected components and size of the largest one."""
+        state = self.metrics_cache.peek('incremental', self.graph)
+        if state is not None:
+            return state.num_components, state.largest_component_size
+        sizes = self.csr.component_sizes()
+        return len(sizes), int(sizes.max()) if len(sizes) else 0
+    
+    def _metric_computations(self) -> Dict[str, Callable[[], Any]]:
+        """Map each optional GraphMetrics field to a memoized computation."""
+        return {
+            'degree_centrality': lambda: self._cached_metric('degree_centrality', self._degree_centrality),
+            'betweenness_centrality': lambda: self._betweenness_centrality()[0],
+            'betweenness_approximation': lambda: self._betweenness_centrality()[1],
+            'closeness_centrality': lambda: self._cached_metric('closeness_centrality', lambda: shortest_paths.closeness_from_sweep(self.csr, self._path_sweep())),
+            'eigenvector_centrality': lambda: self._cached_metric('eigenvector_centrality', self._eigenvector_centrality),
+            'clustering_coefficient': lambda: self._clustering_metrics()[0],
+            'average_clustering': lambda: self._clustering_metrics()[1],
+            'average_shortest_path_length': lambda: self._average_shortest_path_length()["mean"],
+            'average_shortest_path_length_estimate': self._average_shortest_path_length,
+            'diameter': lambda: self._cached_metric('diameter_radius', self._diameter_and_radius)[0],
+            'radius': lambda: self._cached_metric('diameter_radius', self._diameter_and_radius)[1],
+            'effective_diameter': lambda: hyperanf.effective_diameter(self._neighborhood_function()),
+            'neighborhood_function': lambda: hyperanf.summarize_neighborhood_function(self._neighborhood_function()),
+            'num_connected_components': lambda: self._cached_metric('components', self._component_metrics)[0],
+            'largest_component_size': lambda: self._cached_metric('components', self._component_metrics)[1],
+        }
+    
+    def _resolve_metric_fields(self, fields: Optional[Iterable[str]]) -> List[str]:
+        """Expand field group names and validate the requested metric fields."""
+        computations = self._metric_computations()
+        if fields is None:
+            return list(computations)
+        
+        if isinstance(fields, str):
+            fields = [fields]
+        
+        resolved = []
+        for field in fields:
+            names = METRIC_FIELD_GROUPS.get(field, (field,))
+            for name in names:
+                if name in BASIC_METRIC_FIELDS:
+                    continue
+                if name not in computations:
+                    raise ValueError(f"Unknown metric field: {name}")
+                if name not in resolved:
+                    resolved.append(name)
+        return resolved
+    
+    def get_metric(self, name: str) -> Any:
+        """Compute (or fetch from cache) a single GraphMetrics field on demand."""
+        if not self.graph:
+            raise ValueError("No graph loaded")
+        
+        if name == 'num_nodes':
+            return self.graph.number_of_nodes()
+        if name == 'num_edges':
+            return self.graph.number_of_edges()
+        if name == 'density':
+            return nx.density(self.graph)
+        
+        computations = self._metric_computations()
+        if name not in computations:
+            raise ValueError(f"Unknown metric field: {name}")
+        return computations[name]()
+    
+    def calculate_comprehensive_metrics(self, fields: Optional[Iterable[str]] = None) -> GraphMetrics:
+        """Calculate comprehensive social network metrics.
+        
+        By default every field is computed. Pass ``fields`` (field names or group
+        names from METRIC_FIELD_GROUPS, e.g. ``["basic_stats"]``) to compute only
+        what is needed; the remaining fields are left unset. Node count, edge
+        count and density are always included since they are O(1).
+        
+        Each metric is memoized in the graph's shared metrics cache, so repeated
+        calls (from this or any other analyzer on the same graph) reuse earlier
+        results until the graph changes.
+        """
+        if not self.graph:
+            raise ValueError("No graph loaded")
+        
+        values = {name: self.get_metric(name) for name in BASIC_METRIC_FIELDS}
+        for name in self._resolve_metric_fields(fields):
+            values[name] = self.get_metric(name)
+        values['stale_fields'] = [name for name in self.stale_metrics if name in values]
+        
+        return GraphMetrics(**values)
     
     def find_influential_nodes(self, top_k: int = 5) -> Dict[str, List[Tuple[str, float]]]:
-        """Find the most influential nodes by different centrality measures."""
-        metrics = self.calculate_comprehensive_metrics()
+        """Find the most influential nodes by different centrality measures.
+        
+        Closeness and betweenness leaders come from ``top_k_closeness`` and
+        ``top_k_betweenness``, which avoid full centrality runs on large graphs.
+        """
+        degree = self._cached_metric('degree_centrality', self._degree_centrality)
+        eigenvector = self._cached_metric('eigenvector_centrality', self._eigenvector_centrality)
         
         return {
-            'degree': sorted(metrics.degree_centrality.items(), key=lambda x: x[1], reverse=True)[:top_k],
-            'betweenness': sorted(metrics.betweenness_centrality.items(), key=lambda x: x[1], reverse=True)[:top_k],
-            'closeness': sorted(metrics.closeness_centrality.items(), key=lambda x: x[1], reverse=True)[:top_k],
-            'eigenvector': sorted(metrics.eigenvector_centrality.items(), key=lambda x: x[1], reverse=True)[:top_k]
+            'degree': heapq.nlargest(top_k, degree.items(), key=lambda x: x[1]),
+            'betweenness': self.top_k_betweenness(top_k)[0],
+            'closeness': self.top_k_closeness(top_k),
+            'eigenvector': heapq.nlargest(top_k, eigenvector.items(), key=lambda x: x[1])
         }
     
-    def detect_communities(self, method: str = 'louvain') -> List[Set[str]]:
-        """Detect communities in the social network."""
-        if method == 'louvain':
-            try:
-                import community as community_louvain
-                partition = community_louvain.best_partition(self.graph)
-                communities = {}
-                for node, comm_id in partition.items():
-                    if comm_id not in communities:
-                        communities[comm_id] = set()
-                    communities[comm_id].add(node)
-                return list(communities.values())
-            except ImportError:
-                # Fallback to greedy modularity communities
-                return self._greedy_modularity_communities()
-        
-        elif method == 'greedy_modularity':
-            return self._greedy_modularity_communities()
+    def top_k_closeness(self, top_k: int = 5) -> List[Tuple[Any, float]]:
+        """The ``top_k`` nodes by closeness centrality (exact values).
         
-        else:
+        Reuses full closeness when it is already cached or comes for free with
+        exact betweenness; otherwise runs a pruned BFS that stops exploring a
+        node as soon as it provably cannot enter the top set.
+        """
+        closeness = self.metrics_cache.peek('closeness_centrality', self.graph)
+        if closeness is None and not self._use_approximate_betweenness():
+            closeness = self.get_metric('closeness_centrality')
+        if closeness is not None:
+            return heapq.nlargest(top_k, closeness.items(), key=lambda x: x[1])
+        return self._cached_metric(('top_k_closeness', top_k), lambda: shortest_paths.top_k_closeness(self.csr, top_k))
+    
+    def top_k_betweenness(self, top_k: int = 5) -> Tuple[List[Tuple[Any, float]], Optional[Dict[str, Any]]]:
+        """The ``top_k`` nodes by betweenness and the approximation guarantee (None when exact).
+        
+        Above ``approx_betweenness_threshold`` the leaders are estimated by
+        adaptive path sampling, which stops once the top set is separated or
+        stays the same over a doubling round instead of estimating every node
+        to ``betweenness_epsilon``.
+        """
+        full_key = ('betweenness_centrality', self.betweenness_epsilon, self.betweenness_delta, self.betweenness_seed)
+        if not self._use_approximate_betweenness() or self.metrics_cache.peek(full_key, self.graph) is not None:
+            betweenness, approximation = self._betweenness_centrality()
+            return heapq.nlargest(top_k, betweenness.items(), key=lambda x: x[1]), approximation
+        
+        key = ('top_k_betweenness', top_k, self.betweenness_epsilon, self.betweenness_delta, self.betweenness_seed)
+        return self._cached_metric(key, lambda: top_k_betweenness_centrality(
+            self._sampling_graph(),
+            top_k,
+            epsilon=self.betweenness_epsilon,
+            delta=self.betweenness_delta,
+            seed=self.betweenness_seed
+        ))
+    
+    def detect_communities(self, method: str = 'louvain', resolution: float = 1.0,
+                           seed: Optional[int] = 0) -> List[Set[str]]:
+        """Detect communities in the social network (largest first).
+        
+        ``louvain`` and ``leiden`` run natively over the CSR adjacency (see
+        ``community_partition``), ``label_propagation`` streams row blocks of
+        it for graphs too large for modularity optimization, and
+        ``greedy_modularity`` uses NetworkX.
+        """
+        return self.community_partition(method, resolution, seed)['communities']
+        
+    def community_partition(self, method: str = 'louvain', resolution: float = 1.0,
+                            seed: Optional[int] = 0) -> Dict[str, Any]:
+        """Communities with their modularity and quality, memoized per method, resolution and seed.
+        
+        Higher ``resolution`` favors smaller communities. The same ``seed``
+        always gives the same partition, and ``modularity`` is evaluated at
+        ``resolution`` (label propagation ignores it and reports resolution 1).
+        ``quality`` adds coverage, conductance, internal density and cut edges
+        for the largest communities. Community ``i`` of ``communities`` is label
+        ``i`` of ``inter_community_index``.
+        """
+        return self._cached_metric(('communities', method, resolution, seed),
+                                   lambda: self._community_partition(method, resolution, seed))
+    
+    def inter_community_index(self, method: str = 'louvain', resolution: float = 1.0,
+                              seed: Optional[int] = 0) -> community_quality.InterCommunityIndex:
+        """Edges between the communities of ``community_partition``, grouped by community pair.
+        
+        Answers which communities are linked, by which edges and through which
+        bridging nodes without rescanning the graph.
+        """
+        return self._cached_metric(('inter_community_index', method, resolution, seed),
+                                   lambda: community_quality.InterCommunityIndex(
+                                       self.csr, self._community_labels(method, resolution, seed)))
+    
+    def _community_labels(self, method: str, resolution: float, seed: Optional[int]) -> np.ndarray:
+        """Community label of every CSR node, largest community first."""
+        if method not in ('louvain', 'leiden', 'label_propagation', 'greedy_modularity'):
             raise ValueError(f"Unknown community detection method: {method}")
+        return self._cached_metric(('community_labels', method, resolution, seed),
+                                   lambda: self._detect_community_labels(method, resolution, seed))
+    
+    def _detect_community_labels(self, method: str, resolution: float, seed: Optional[int]) -> np.ndarray:
+        """Run one community detection method."""
+        csr = self.csr
+        if method == 'greedy_modularity':
+            labels = np.zeros(csr.num_nodes, dtype=np.int64)
+            for label, community in enumerate(self._greedy_modularity_communities(resolution)):
+                labels[[csr.index[node] for node in community]] = label
+            return labels
+        if method == 'label_propagation':
+            return community_detection.label_propagation(csr, seed=seed).labels
+        detect = community_detection.louvain if method == 'louvain' else community_detection.leiden
+        return detect(csr, resolution=resolution, seed=seed).labels
     
-    def _greedy_modularity_communities(self) -> List[Set[str]]:
-        """Fallback community detection using greedy modularity."""
-        communities = nx.algorithms.community.greedy_modularity_communities(self.graph)
+    def _community_partition(self, method: str, resolution: float, seed: Optional[int]) -> Dict[str, Any]:
+        """Package a partition with its quality scores from one pass over the edges."""
+        csr = self.csr
+        labels = self._community_labels(method, resolution, seed)
+        quality = community_quality.community_quality(
+            csr, labels, 1.0 if method == 'label_propagation' else resolution)
+        communities = [set() for _ in range(len(quality.sizes))]
+        for node, label in zip(csr.nodes, labels.tolist()):
+            communities[label].add(node)
+        return {
+            'method': method,
+            'resolution': resolution,
+            'communities': communities,
+            'num_communities': len(communities),
+            'community_sizes': quality.sizes.tolist(),
+            'modularity': quality.modularity,
+            'coverage': quality.coverage,
+            'quality': community_quality.summarize_quality(quality),
+        }
+    
+    def _greedy_modularity_communities(self, resolution: float = 1.0) -> List[Set[str]]:
+        """Community detection using NetworkX greedy modularity."""
+        communities = nx.algorithms.community.greedy_modularity_communities(self.graph, resolution=resolution)
         return [set(community) for community in communities]
     
     def analyze_node_neighborhood(self, node_id: str, radius: int = 1) -> Dict[str, Any]:
         """Analyze the neighborhood of a specific node."""
-        if node_id not in self.graph:
-            raise ValueError(f"Node {node_id} not found in graph")
-        
-        # Get neighbors within radius
-        neighbors = set()
-        current_level = {node_id}
+        return self.analyze_neighborhoods([node_id], radius, include_members=True)[node_id]
         
-        for _ in range(radius):
-            next_level = set()
-            for node in current_level:
-                next_level.update(self.graph.neighbors(node))
-            neighbors.update(next_level)
-            current_level = next_level - neighbors
+    def analyze_neighborhoods(self, node_ids: Iterable[Any], radius: int = 1,
+                              include_members: bool = False) -> Dict[Any, Dict[str, Any]]:
+        """Analyze the ``radius``-hop neighborhoods of many nodes in one batched pass.
         
-        neighbors.discard(node_id)  # Remove the center node itself
+        All BFS frontiers advance together over the CSR adjacency, and ego
+        sizes, edge counts and densities come out as arrays, so profiling
+        thousands of nodes is a single call. Member lists are only returned
+        with ``include_members`` since they dominate the output size.
+        """
+        node_ids = list(node_ids)
+        csr = self.csr
+        missing = [node for node in node_ids if node not in csr.index]
+        if missing:
+            raise ValueError(f"Node {missing[0]} not found in graph")
         
-        # Create subgraph
-        subgraph = self.graph.subgraph([node_id] + list(neighbors))
+        sources = np.array([csr.index[node] for node in node_ids], dtype=np.int64)
+        stats = csr.ego_stats(sources, radius)
+        clustering = csr.clustering(self._triangle_stats().triangles)[sources]
+        degree = csr.degree()[sources]
+        if include_members:
+            ego, member = csr.k_hop_neighborhoods(sources, radius)
+            bounds = np.searchsorted(ego, np.arange(len(sources) + 1))
         
-        # Calculate local metrics
-        local_density = nx.density(subgraph)
-        local_clustering = nx.clustering(self.graph, node_id)
-        degree = self.graph.degree(node_id)
-        
-        return {
-            'node_id': node_id,
-            'neighbors': list(neighbors),
-            'neighborhood_size': len(neighbors),
-            'degree': degree,
-            'local_clustering': local_clustering,
-            'local_density': local_density,
-            'subgraph_edges': subgraph.number_of_edges()
-        }
+        results = {}
+        for i, node_id in enumerate(node_ids):
+            result = {
+                'node_id': node_id,
+                'neighborhood_size': int(stats.size[i]) - 1,
+                'degree': int(degree[i]),
+                'local_clustering': float(clustering[i]),
+                'local_density': float(stats.density[i]),
+                'subgraph_edges': int(stats.edges[i])
+            }
+            if include_members:
+                members = member[bounds[i]:bounds[i + 1]]
+                result['neighbors'] = [csr.nodes[j] for j in members.tolist() if j != sources[i]]
+            results[node_id] = result
+        return results
     
     def find_shortest_paths(self, source: str, target: Optional[str] = None) -> Dict[str, Any]:
-        """Find shortest paths from source to target or all nodes."""
+        """Find shortest paths from source to target or all nodes.
+        
+        Source-target queries go through the cached distance oracle, so repeated
+        questions about the same graph cost a few node expansions each. Without
+        a target the result summarizes one BFS (reach, eccentricity, distance
+        histogram) and ``paths`` maps every reachable node to its path lazily.
+        """
         if source not in self.graph:
             raise ValueError(f"Source node {source} not found in graph")
         
@@ -211,72 +643,131 @@ class SocialGraphAnalyzer:
             if target not in self.graph:
                 raise ValueError(f"Target node {target} not found in graph")
             
-            try:
-                path = nx.shortest_path(self.graph, source, target)
-                length = nx.shortest_path_length(self.graph, source, target)
+            path = self.distance_oracle().shortest_path(source, target)
+            if path is not None:
                 return {
                     'source': source,
                     'target': target,
                     'path': path,
-                    'length': length
+                    'length': len(path) - 1
                 }
-            except nx.NetworkXNoPath:
-                return {
-                    'source': source,
-                    'target': target,
-                    'path': None,
-                    'length': float('inf'),
-                    'error': 'No path exists'
-                }
-        else:
-            # All shortest paths from source
-            paths = nx.single_source_shortest_path(self.graph, source)
-            lengths = nx.single_source_shortest_path_length(self.graph, source)
-            
             return {
                 'source': source,
-                'paths': paths,
-                'lengths': lengths,
-                'reachable_nodes': len(paths)
+                'target': target,
+                'path': None,
+                'length': float('inf'),
+                'error': 'No path exists'
             }
+        else:
+            # One BFS tree from source; paths are rebuilt only when looked up
+            paths = self.single_source_paths(source)
+            return {**paths.summary(), 'paths': paths}
+            
+    def single_source_paths(self, source: str) -> shortest_paths.SingleSourcePaths:
+        """Distances and BFS predecessors from source, with paths reconstructed on demand."""
+        if source not in self.graph:
+            raise ValueError(f"Source node {source} not found in graph")
+        return shortest_paths.single_source_paths(self.csr, self.csr.index[source])
+    
+    def distance_oracle(self, build: bool = True) -> Optional[DistanceOracle]:
+        """Landmark distance oracle for the current graph version (None if not built and ``build`` is False)."""
+        if not build:
+            return self.metrics_cache.peek('distance_oracle', self.graph)
+        return self._cached_metric('distance_oracle', lambda: DistanceOracle.build(self.csr, self.oracle_landmarks))
     
-    def analyze_graph_robustness(self, num_removals: int = 5) -> Dict[str, Any]:
-        """Analyze network robustness by simulating node removals."""
-        original_metrics = self.calculate_comprehensive_metrics()
+    def save_distance_oracle(self, path: str) -> None:
+        """Write the distance oracle of the current graph to an ``.npz`` file."""
+        self.distance_oracle().save(path)
+    
+    def load_distance_oracle(self, path: str) -> DistanceOracle:
+        """Reuse an oracle saved for this graph instead of rebuilding it.
         
-        # Get most central nodes
-        central_nodes = sorted(
-            original_metrics.betweenness_centrality.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:num_removals]
+        Raises ValueError if the file belongs to a different graph.
+        """
+        oracle = DistanceOracle.load(path, self.csr)
+        self.metrics_cache.put('distance_oracle', self.graph, oracle)
+        return oracle
+    
+    def analyze_graph_robustness(self, num_removals: int = 5,
+                                 strategies: Iterable[str] = ('betweenness', 'degree', 'adaptive_degree'),
+                                 curve_points: int = 21) -> Dict[str, Any]:
+        """Analyze network robustness under targeted node removal.
         
-        robustness_results = []
+        Each attack strategy yields a full curve (largest component vs. fraction
+        of nodes removed) from one reverse union-find replay, so nothing is
+        recomputed per removal: ``degree`` and ``betweenness`` remove nodes in
+        order of their initial centrality, ``adaptive_degree`` always removes
+        the highest-degree node of what remains. ``removal_results`` lists the
+        connectivity after each of the first ``num_removals`` steps of the
+        first requested strategy (removals are cumulative), with each node's
+        initial betweenness or degree centrality. Betweenness is only computed
+        when the ``betweenness`` strategy is requested.
+        """
+        strategies = list(dict.fromkeys(strategies))
+        components, largest = self._cached_metric('components', self._component_metrics)
+        curves = {strategy: self._attack_curve(strategy) for strategy in strategies}
         
-        for node_id, centrality in central_nodes:
-            # Create copy and remove node
-            temp_graph = self.graph.copy()
-            temp_graph.remove_node(node_id)
-            
-            # Calculate new metrics
-            analyzer = SocialGraphAnalyzer(temp_graph)
-            new_metrics = analyzer.calculate_comprehensive_metrics()
-            
-            robustness_results.append({
-                'removed_node': node_id,
-                'original_centrality': centrality,
-                'connectivity_change': {
-                    'components_before': original_metrics.num_connected_components,
-                    'components_after': new_metrics.num_connected_components,
-                    'largest_component_before': original_metrics.largest_component_size,
-                    'largest_component_after': new_metrics.largest_component_size
-                }
-            })
+        robustness_results = []
+        if strategies:
+            strategy = strategies[0]
+            if strategy == 'betweenness':
+                centrality = self._betweenness_centrality()[0]
+            else:
+                centrality = self._cached_metric('degree_centrality', self._degree_centrality)
+            curve = curves[strategy]
+            for step, index in enumerate(curve.order[:num_removals]):
+                node_id = self.csr.nodes[int(index)]
+                robustness_results.append({
+                    'removed_node': node_id,
+                    'original_centrality': centrality.get(node_id, 0.0),
+                    'connectivity_change': {
+                        'components_before': int(curve.components[step]),
+                        'components_after': int(curve.components[step + 1]),
+                        'largest_component_before': int(curve.largest_component[step]),
+                        'largest_component_after': int(curve.largest_component[step + 1])
+                    }
+                })
         
         return {
             'original_connectivity': {
-                'components': original_metrics.num_connected_components,
-                'largest_component': original_metrics.largest_component_size
+                'components': components,
+                'largest_component': largest
             },
-            'removal_results': robustness_results
-        } 
\ No newline at end of file
+            'removal_strategy': strategies[0] if strategies else None,
+            'removal_results': robustness_results,
+            'attack_curves': {
+                strategy: robustness.summarize_curve(attack, curve_points) for strategy, attack in curves.items()
+            }
+        }
+    
+    def analyze_random_failure(self, percolation: str = 'node', runs: int = 100, seed: Optional[int] = None,
+                               curve_points: int = 21) -> Dict[str, Any]:
+        """Analyze resilience to random failures by Monte Carlo percolation.
+        
+        ``percolation`` selects random node (site) or edge (bond) failures. The
+        expected largest-component fraction over the whole occupation range is
+        averaged over ``runs`` Newman-Ziff sweeps (split across ``workers``),
+        together with an estimate of the critical occupation threshold.
+        """
+        curve = self._cached_metric(('percolation', percolation, runs, seed), lambda: robustness.percolation_curve(
+            self.csr,
+            mode=percolation,
+            runs=runs,
+            seed=seed,
+            workers=self.workers
+        ))
+        return robustness.summarize_percolation(curve, curve_points)
+    
+    def _attack_curve(self, strategy: str) -> robustness.AttackCurve:
+        """Full targeted-attack curve for one removal strategy, memoized per graph version."""
+        def compute() -> robustness.AttackCurve:
+            if strategy == 'degree':
+                order = robustness.degree_attack_order(self.csr)
+            elif strategy == 'betweenness':
+                order = robustness.centrality_attack_order(self.csr, self._betweenness_centrality()[0])
+            elif strategy == 'adaptive_degree':
+                order = robustness.adaptive_degree_attack_order(self.csr)
+            else:
+                raise ValueError(f"Unknown attack strategy: {strategy}")
+            return robustness.attack_curve(self.csr, order)
+        return self._cached_metric(('attack_curve', strategy), compute)
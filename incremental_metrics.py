@@ -0,0 +1,229 @@
+from collections import Counter, deque
+from typing import Any, Dict, Hashable, List, Optional, Set
+import weakref
+import networkx as nx
+import numpy as np
+
+from csr_graph import CSRGraph
+
+
+class IncrementalMetrics:
+    """Degree, component, triangle and clustering state kept current under graph edits.
+    
+    Edits go through ``add_edge``, ``remove_edge`` and ``remove_node``, which
+    mutate the wrapped graph and update the state in time proportional to the
+    neighborhoods they touch:
+    
+    - triangles change only at the endpoints and their common neighbors, found
+      by scanning the smaller of the two adjacency sets;
+    - components are a disjoint-set forest with explicit labels, merged by
+      relabeling the smaller side on insertion; on deletion an interleaved BFS
+      from both endpoints either meets (still connected, usually within a hop
+      or two in clustered graphs) or exhausts the smaller side, which is then
+      split off under a new label.
+    
+    Self loops are ignored, as in the CSR clustering code. The graph is only
+    referenced weakly: the state lives in the graph's metrics cache, whose
+    weak key would otherwise be kept alive by its own value.
+    """
+    
+    def __init__(self, graph: nx.Graph, csr: Optional[CSRGraph] = None):
+        """Build the state from scratch (one vectorized pass over ``csr``)."""
+        self._graph = weakref.ref(graph)
+        csr = csr if csr is not None else CSRGraph.from_networkx(graph)
+        degree = np.diff(csr.indptr).astype(np.int64)
+        triangles = csr.triangles()
+        labels = csr.connected_components()
+        
+        # Degrees here ignore self loops (they never close triangles)
+        self.degree: Dict[Hashable, int] = dict(zip(csr.nodes, degree.tolist()))
+        self.triangles: Dict[Hashable, int] = dict(zip(csr.nodes, triangles.tolist()))
+        self.total_triangles = int(triangles.sum()) // 3
+        self.triads = int((degree * (degree - 1)).sum())
+        self.clustering_sum = float(csr.clustering(triangles).sum())
+        
+        self.component: Dict[Hashable, int] = dict(zip(csr.nodes, labels.tolist()))
+        self.members: Dict[int, Set[Hashable]] = {}
+        for node, label in self.component.items():
+            self.members.setdefault(label, set()).add(node)
+        self.component_sizes = Counter(len(members) for members in self.members.values())
+        self._next_label = csr.num_nodes
+    
+    @property
+    def graph(self) -> nx.Graph:
+        """The graph this state describes (it must still be alive)."""
+        graph = self._graph()
+        if graph is None:
+            raise ReferenceError("The graph of this IncrementalMetrics state no longer exists")
+        return graph
+    
+    @property
+    def num_nodes(self) -> int:
+        return len(self.degree)
+    
+    @property
+    def num_components(self) -> int:
+        """Number of connected components."""
+        return len(self.members)
+    
+    @property
+    def largest_component_size(self) -> int:
+        """Size of the largest component, read off the size histogram."""
+        return max(self.component_sizes) if self.component_sizes else 0
+    
+    @property
+    def transitivity(self) -> float:
+        """Global clustering (same formula as ``CSRGraph.transitivity``)."""
+        return float(2 * (3 * self.total_triangles) / self.triads) if self.triads > 0 else 0.0
+    
+    @property
+    def average_clustering(self) -> float:
+        """Mean local clustering over all nodes (isolated ones count as 0)."""
+        return self.clustering_sum / self.num_nodes if self.num_nodes else 0.0
+    
+    def degree_centrality(self) -> Dict[Hashable, float]:
+        """Degree centrality over the current nodes (same values as the CSR path)."""
+        n = self.num_nodes
+        if n <= 1:
+            return {node: 1.0 for node in self.degree}
+        scale = 1.0 / (n - 1)
+        return {node: degree * scale for node, degree in self.graph.degree()}
+    
+    def add_node(self, node: Hashable, **attr: Any) -> None:
+        """Insert a node (a new singleton component) if it is not present yet."""
+        self.graph.add_node(node, **attr)
+        if node in self.degree:
+            return
+        self.degree[node] = 0
+        self.triangles[node] = 0
+        label = self._new_label()
+        self.component[node] = label
+        self.members[label] = {node}
+        self.component_sizes[1] += 1
+    
+    def add_edge(self, u: Hashable, v: Hashable, **attr: Any) -> None:
+        """Insert an undirected edge (attributes are updated if it already exists)."""
+        self.add_node(u)
+        self.add_node(v)
+        if u == v or self.graph.has_edge(u, v):
+            self.graph.add_edge(u, v, **attr)
+            return
+        
+        common = self._common_neighbors(u, v)
+        self.graph.add_edge(u, v, **attr)
+        self._update_triangles(u, v, common, +1)
+        self._union(u, v)
+    
+    def remove_edge(self, u: Hashable, v: Hashable) -> None:
+        """Delete an edge (raises ``nx.NetworkXError`` if it does not exist)."""
+        self.graph.remove_edge(u, v)
+        if u == v:
+            return
+        
+        common = self._common_neighbors(u, v)
+        self._update_triangles(u, v, common, -1)
+        self._split_if_disconnected(u, v)
+    
+    def remove_node(self, node: Hashable) -> None:
+        """Delete a node and its incident edges (raises ``nx.NetworkXError`` if absent)."""
+        if node not in self.graph:
+            raise nx.NetworkXError(f"The node {node} is not in the graph.")
+        for neighbor in [neighbor for neighbor in self.graph.adj[node] if neighbor != node]:
+            self.remove_edge(node, neighbor)
+        self.graph.remove_node(node)
+        
+        # Now an isolated singleton: contributes nothing to triangles or clustering
+        del self.degree[node]
+        del self.triangles[node]
+        label = self.component.pop(node)
+        del self.members[label]
+        self._resize(1, None)
+    
+    def _new_label(self) -> int:
+        """Component label never used before."""
+        label = self._next_label
+        self._next_label += 1
+        return label
+    
+    def _common_neighbors(self, u: Hashable, v: Hashable) -> List[Hashable]:
+        """Common neighbors of u and v (excluding both), scanning the smaller adjacency."""
+        adj_u, adj_v = self.graph.adj[u], self.graph.adj[v]
+        if len(adj_u) > len(adj_v):
+            adj_u, adj_v = adj_v, adj_u
+        return [w for w in adj_u if w in adj_v and w != u and w != v]
+    
+    def _local_clustering(self, node: Hashable) -> float:
+        """Local clustering of a node from its maintained counts."""
+        degree = self.degree[node]
+        return 2 * self.triangles[node] / (degree * (degree - 1)) if degree > 1 else 0.0
+    
+    def _set_node(self, node: Hashable, triangles: int, degree: int) -> None:
+        """Replace a node's triangle count and degree, keeping the running sums in step."""
+        old_degree = self.degree[node]
+        self.clustering_sum -= self._local_clustering(node)
+        self.triads += degree * (degree - 1) - old_degree * (old_degree - 1)
+        self.triangles[node] = triangles
+        self.degree[node] = degree
+        self.clustering_sum += self._local_clustering(node)
+    
+    def _update_triangles(self, u: Hashable, v: Hashable, common: List[Hashable], sign: int) -> None:
+        """Account for edge (u, v) appearing (+1) or disappearing (-1)."""
+        closed = sign * len(common)
+        for w in common:
+            self._set_node(w, self.triangles[w] + sign, self.degree[w])
+        self._set_node(u, self.triangles[u] + closed, self.degree[u] + sign)
+        self._set_node(v, self.triangles[v] + closed, self.degree[v] + sign)
+        self.total_triangles += closed
+    
+    def _resize(self, old_size: Optional[int], new_size: Optional[int]) -> None:
+        """Move one component between buckets of the size histogram."""
+        if old_size is not None:
+            self.component_sizes[old_size] -= 1
+            if not self.component_sizes[old_size]:
+                del self.component_sizes[old_size]
+        if new_size is not None:
+            self.component_sizes[new_size] += 1
+    
+    def _union(self, u: Hashable, v: Hashable) -> None:
+        """Merge the components of u and v, relabeling the smaller one."""
+        big, small = self.component[u], self.component[v]
+        if big == small:
+            return
+        if len(self.members[big]) < len(self.members[small]):
+            big, small = small, big
+        
+        moved = self.members.pop(small)
+        self._resize(len(moved), None)
+        self._resize(len(self.members[big]), len(self.members[big]) + len(moved))
+        for node in moved:
+            self.component[node] = big
+        self.members[big].update(moved)
+    
+    def _split_if_disconnected(self, u: Hashable, v: Hashable) -> None:
+        """After deleting (u, v), split their component if no other path joins them."""
+        adj = self.graph.adj
+        seen = ({u}, {v})
+        queues = (deque([u]), deque([v]))
+        side = 0
+        while queues[0] and queues[1]:
+            node = queues[side].popleft()
+            for neighbor in adj[node]:
+                if neighbor in seen[1 - side]:
+                    return
+                if neighbor not in seen[side]:
+                    seen[side].add(neighbor)
+                    queues[side].append(neighbor)
+            side = 1 - side
+        
+        # One search ran dry: its visited set is a whole component of its own
+        detached = seen[0] if not queues[0] else seen[1]
+        label = self.component[u]
+        remaining = self.members[label]
+        self._resize(len(remaining), len(remaining) - len(detached))
+        self._resize(None, len(detached))
+        remaining.difference_update(detached)
+        
+        new_label = self._new_label()
+        self.members[new_label] = detached
+        for node in detached:
+            self.component[node] = new_label
@@ -229,7 +229,8 @@ class InteractiveQA:
                     if '\t' in first_line and ' ' not in first_line.replace('\t', ''):
                         delimiter = "\t"
             
-            graph = analyzer.auto_detect_and_load(filepath, delimiter=delimiter)
+            # Parsed once, then read back from a binary snapshot next to the file
+            graph = analyzer.load_with_snapshot_cache(filepath, delimiter=delimiter)
             
             # Basic preprocessing
             self.current_graph = analyzer.validate_and_preprocess(
@@ -283,7 +284,10 @@ class InteractiveQA:
             
             analyzer = SocialGraphAnalyzer()
             analyzer.graph = self.current_graph
-            metrics = analyzer.calculate_comprehensive_metrics()
+            metrics = analyzer.calculate_comprehensive_metrics(fields=[
+                "basic_stats", "connectivity",
+                "degree_centrality", "betweenness_centrality", "closeness_centrality"
+            ])
             
             print(f"""
 🏗️  BASIC STRUCTURE:
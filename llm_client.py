@@ -206,9 +206,9 @@ Respond with a JSON object containing:
 Available analysis types:
 - basic_metrics: Overall network statistics and structure
 - centrality: Finding influential nodes and their roles
-- community_detection: Identifying groups and clusters
+- community_detection: Identifying groups and clusters (parameters: "method" is "louvain", "leiden", "label_propagation" (fastest, for very large networks) or "greedy_modularity"; "resolution" above 1 finds smaller groups, below 1 larger ones)
 - path_analysis: Shortest paths and connectivity
-- robustness: Network resilience to node removal
+- robustness: Network resilience to node removal (parameters: "mode" is "targeted" for attacks on central nodes, "random_failure" for random failures, or "both"; "percolation" is "node" or "edge")
 - neighborhood: Local analysis around specific nodes
 - custom: Combination of multiple analysis types
 
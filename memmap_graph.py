@@ -0,0 +1,322 @@
+from bisect import insort
+from types import MappingProxyType
+from typing import Any, Dict, Hashable, Iterator, List, Mapping, Optional, Tuple
+import json
+import os
+import numpy as np
+import networkx as nx
+
+from csr_graph import CSRGraph
+from edge_loader import Column, DEFAULT_CHUNK_ROWS, EdgeStream, ProgressCallback
+from graph_snapshot import SNAPSHOT_EXTENSION, load_snapshot
+
+
+STORE_EXTENSION = ".csrstore"
+
+_STORE_VERSION = 1
+_META_FILE = "meta.json"
+
+# Adjacency entries sorted and deduplicated at a time while compacting rows
+_COMPACT_ENTRIES = 1 << 22
+
+# Attribute dict shared by every node and edge of a memory-mapped graph
+_NO_DATA: Mapping[str, Any] = MappingProxyType({})
+
+
+def _unique_counts(values: np.ndarray, counts: np.ndarray) -> None:
+    """Add the occurrences of each value to ``counts`` (cost independent of its length)."""
+    touched, occurrences = np.unique(values, return_counts=True)
+    counts[touched] += occurrences
+
+
+def _grown(counts: np.ndarray, size: int) -> np.ndarray:
+    """``counts`` zero-padded to at least ``size`` entries, doubling to keep appends amortized."""
+    if size <= len(counts):
+        return counts
+    grown = np.zeros(max(size, 2 * len(counts)), dtype=counts.dtype)
+    grown[:len(counts)] = counts
+    return grown
+
+
+def _spill_edges(stream: EdgeStream, pairs_path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Pass 1: write every non-loop edge as an int32 pair; returns (row lengths, self loops)."""
+    counts = np.zeros(0, dtype=np.int64)
+    loops = []
+    with open(pairs_path, 'wb') as pairs:
+        for src, dst in stream:
+            if stream.num_nodes > np.iinfo(np.int32).max:
+                raise ValueError("CSR stores hold at most 2**31 - 1 nodes")
+            loop = src == dst
+            loops.append(np.unique(src[loop]))
+            src, dst = src[~loop], dst[~loop]
+            counts = _grown(counts, stream.num_nodes)
+            # Each pair fills one slot in the rows of both endpoints
+            _unique_counts(np.concatenate([src, dst]), counts)
+            np.column_stack([src, dst]).astype(np.int32).tofile(pairs)
+    n = stream.num_nodes
+    self_loops = np.zeros(n, dtype=np.int32)
+    if loops:
+        self_loops[np.concatenate(loops)] = 1
+    return counts[:n], self_loops
+
+
+def _scatter_edges(pairs_path: str, indices: np.ndarray, offsets: np.ndarray, chunk_rows: int) -> None:
+    """Pass 2: copy both directions of every spilled pair into its row's next free slot."""
+    pairs = np.memmap(pairs_path, dtype=np.int32, mode='r').reshape(-1, 2)
+    n = len(offsets) - 1
+    cursor = offsets[:-1].copy()
+    for start in range(0, len(pairs), chunk_rows):
+        chunk = np.array(pairs[start:start + chunk_rows], dtype=np.int64)
+        keys = np.sort(np.concatenate([chunk[:, 0] * n + chunk[:, 1], chunk[:, 1] * n + chunk[:, 0]]))
+        rows, cols = keys // n, keys % n
+        starts = np.flatnonzero(np.concatenate(([True], rows[1:] != rows[:-1])))
+        lengths = np.diff(np.append(starts, len(rows)))
+        # Sorted by row, so the writes sweep the file from front to back
+        indices[cursor[rows] + np.arange(len(rows)) - np.repeat(starts, lengths)] = cols
+        cursor[rows[starts]] += lengths
+    del pairs
+
+
+def _compact_rows(indices: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Pass 3: sort every row and drop duplicate entries in place; returns the new row lengths.
+    
+    Rows are processed in blocks of about ``_COMPACT_ENTRIES`` entries; a
+    block only ever moves towards the front of the file, past data that has
+    already been read.
+    """
+    n = len(offsets) - 1
+    lengths = np.zeros(n, dtype=np.int64)
+    written = 0
+    row = 0
+    while row < n:
+        stop = int(np.searchsorted(offsets, offsets[row] + _COMPACT_ENTRIES, side='right')) - 1
+        stop = min(max(stop, row + 1), n)
+        local = np.repeat(np.arange(stop - row, dtype=np.int64), np.diff(offsets[row:stop + 1]))
+        keys = np.sort(local * n + indices[offsets[row]:offsets[stop]])
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))] if len(keys) else keys
+        indices[written:written + len(keys)] = keys % n
+        lengths[row:stop] = np.bincount(keys // n, minlength=stop - row)
+        written += len(keys)
+        row = stop
+    return lengths
+
+
+def build_csr_store(filepath: str, store_dir: str, source_col: Column = 0, target_col: Column = 1,
+                    delimiter: str = ",", comment: str = "#", chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                    progress: Optional[ProgressCallback] = None) -> str:
+    """Convert an edge-list file into an on-disk CSR store without holding its edges in memory.
+    
+    The file is streamed as in ``read_edge_list`` (node IDs kept as text,
+    numbered in order of first appearance) and the undirected CSR arrays are
+    written in three passes that each hold one chunk at a time: the
+    interned pairs are spilled to a scratch file while row lengths are
+    counted, scattered into a memory-mapped ``indices`` file, then every
+    row is sorted and deduplicated in place. Self loops are kept out of the
+    adjacency and counted once per node, as in ``EdgeList.to_csr``. Memory
+    use is O(nodes + chunk); the arrays match ``EdgeList.to_csr`` exactly.
+    
+    The store is a directory of raw arrays plus ``meta.json``, which is
+    written last, so an interrupted build is never mistaken for a store. It
+    records the parse options, which ``store_is_current`` compares.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    meta_path = os.path.join(store_dir, _META_FILE)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    stream = EdgeStream(filepath, source_col, target_col, delimiter, comment, chunk_rows, progress)
+    pairs_path = os.path.join(store_dir, "pairs.partial")
+    indices_path = os.path.join(store_dir, "indices.bin")
+    
+    counts, self_loops = _spill_edges(stream, pairs_path)
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    if offsets[-1]:
+        indices = np.memmap(indices_path, dtype=np.int32, mode='w+', shape=(int(offsets[-1]),))
+        _scatter_edges(pairs_path, indices, offsets, chunk_rows)
+        lengths = _compact_rows(indices, offsets)
+        indices.flush()
+        del indices
+    else:
+        lengths = counts
+        open(indices_path, 'wb').close()
+    os.remove(pairs_path)
+    num_entries = int(lengths.sum())
+    os.truncate(indices_path, num_entries * np.dtype(np.int32).itemsize)
+    
+    offset_dtype = np.int32 if num_entries < np.iinfo(np.int32).max else np.int64
+    indptr = np.zeros(len(lengths) + 1, dtype=offset_dtype)
+    np.cumsum(lengths, out=indptr[1:])
+    np.save(os.path.join(store_dir, "indptr.npy"), indptr)
+    np.save(os.path.join(store_dir, "self_loops.npy"), self_loops)
+    ids = stream.values()
+    if ids.dtype.kind in 'iu':
+        np.save(os.path.join(store_dir, "ids.npy"), ids)
+    else:
+        with open(os.path.join(store_dir, "nodes.json"), 'w') as f:
+            json.dump(ids.tolist(), f)
+    with open(meta_path, 'w') as f:
+        json.dump({
+            'version': _STORE_VERSION,
+            'num_nodes': len(indptr) - 1,
+            'num_entries': num_entries,
+            'id_kind': 'int' if ids.dtype.kind in 'iu' else 'text',
+            'source': filepath,
+            'options': _store_options(source_col, target_col, delimiter, comment),
+            'rows': stream.rows,
+        }, f)
+    return store_dir
+
+
+def _store_options(source_col: Column, target_col: Column, delimiter: str, comment: str) -> Dict[str, Any]:
+    """The parse options a store records, as they read back from ``meta.json``."""
+    return json.loads(json.dumps({'source_col': source_col, 'target_col': target_col,
+                                  'delimiter': delimiter, 'comment': comment}))
+
+
+def store_is_current(store_dir: str, source_path: str, source_col: Column = 0, target_col: Column = 1,
+                     delimiter: str = ",", comment: str = "#") -> bool:
+    """True if a complete store exists, is at least as new as ``source_path`` and was parsed with these options."""
+    meta_path = os.path.join(store_dir, _META_FILE)
+    if not (os.path.exists(meta_path) and os.path.getmtime(meta_path) >= os.path.getmtime(source_path)):
+        return False
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except ValueError:
+        return False
+    return meta.get('options') == _store_options(source_col, target_col, delimiter, comment)
+
+
+def open_csr_store(store_dir: str) -> CSRGraph:
+    """Open a store written by ``build_csr_store``; the adjacency arrays are memory-mapped, not read.
+    
+    Raises ValueError if the directory holds no complete store of a supported version.
+    """
+    meta_path = os.path.join(store_dir, _META_FILE)
+    if not os.path.exists(meta_path):
+        raise ValueError(f"{store_dir} is not a CSR store")
+    with open(meta_path) as f:
+        meta = json.load(f)
+    if meta.get('version') != _STORE_VERSION:
+        raise ValueError(f"Unsupported CSR store version in {store_dir}: {meta.get('version')}")
+    
+    if meta['id_kind'] == 'int':
+        nodes: List[Hashable] = [str(node) for node in np.load(os.path.join(store_dir, "ids.npy")).tolist()]
+    else:
+        with open(os.path.join(store_dir, "nodes.json")) as f:
+            nodes = json.load(f)
+    indptr = np.load(os.path.join(store_dir, "indptr.npy"), mmap_mode='r')
+    self_loops = np.load(os.path.join(store_dir, "self_loops.npy"), mmap_mode='r')
+    if meta['num_entries']:
+        indices = np.memmap(os.path.join(store_dir, "indices.bin"), dtype=np.int32, mode='r')
+    else:
+        indices = np.empty(0, dtype=np.int32)
+    return CSRGraph(nodes, indptr, indices, self_loops)
+
+
+class _CSRNodeTable(Mapping):
+    """Node table of a ``MemmapGraph``: every node of the CSR view, with no attributes."""
+    
+    def __init__(self, csr: CSRGraph):
+        self._csr = csr
+    
+    def __getitem__(self, node: Hashable) -> Mapping[str, Any]:
+        if node not in self._csr.index:
+            raise KeyError(node)
+        return _NO_DATA
+    
+    def __contains__(self, node: object) -> bool:
+        return node in self._csr.index
+    
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._csr.nodes)
+    
+    def __len__(self) -> int:
+        return self._csr.num_nodes
+
+
+class _CSRNeighbors(Mapping):
+    """Neighbors of one node, read from its slice of the CSR arrays (a self loop lists the node itself)."""
+    
+    def __init__(self, csr: CSRGraph, i: int):
+        self._csr = csr
+        self._i = i
+    
+    def __getitem__(self, node: Hashable) -> Mapping[str, Any]:
+        if node not in self:
+            raise KeyError(node)
+        return _NO_DATA
+    
+    def __contains__(self, node: object) -> bool:
+        j = self._csr.index.get(node)
+        if j is None:
+            return False
+        if j == self._i:
+            return bool(self._csr.self_loops[j])
+        row = self._csr.neighbors(self._i)
+        slot = int(np.searchsorted(row, j))
+        return slot < len(row) and int(row[slot]) == j
+    
+    def __iter__(self) -> Iterator[Hashable]:
+        row = self._csr.neighbors(self._i).tolist()
+        if self._csr.self_loops[self._i]:
+            insort(row, self._i)
+        return map(self._csr.nodes.__getitem__, row)
+    
+    def __len__(self) -> int:
+        return len(self._csr.neighbors(self._i)) + int(self._csr.self_loops[self._i] > 0)
+
+
+class _CSRAdjacency(_CSRNodeTable):
+    """Outer adjacency of a ``MemmapGraph``: node -> its ``_CSRNeighbors``."""
+    
+    def __getitem__(self, node: Hashable) -> Mapping[Hashable, Mapping[str, Any]]:
+        return _CSRNeighbors(self._csr, self._csr.index[node])
+
+
+class MemmapGraph(nx.Graph):
+    """Read-only NetworkX graph whose adjacency lives in a memory-mapped ``CSRGraph``.
+    
+    Node and neighbor lookups read the CSR arrays, so NetworkX code runs on
+    it unchanged while only the pages it touches are loaded; the analyzer's
+    array-based metrics use ``csr`` directly. Only the node IDs are held in
+    memory. Nodes and edges carry no attributes and the graph is frozen, so
+    any mutation raises ``nx.NetworkXError``.
+    """
+    
+    def __init__(self, csr: CSRGraph, source: Optional[str] = None):
+        """Wrap a CSR view; ``source`` records the store or snapshot it was opened from."""
+        super().__init__()
+        self.csr = csr
+        self.source = source
+        self._node = _CSRNodeTable(csr)
+        self._adj = _CSRAdjacency(csr)
+        self._num_edges = csr.num_edges
+        nx.freeze(self)
+    
+    def number_of_edges(self, u: Optional[Hashable] = None, v: Optional[Hashable] = None) -> int:
+        """Edge count from the CSR arrays, or the number of edges between u and v."""
+        if u is None:
+            return self._num_edges
+        return super().number_of_edges(u, v)
+    
+    def size(self, weight: Optional[str] = None) -> float:
+        """Number of edges; there are no weights, so every edge counts 1."""
+        return self._num_edges
+    
+    def without_self_loops(self) -> "MemmapGraph":
+        """The same graph minus its self loops, sharing the memory-mapped adjacency."""
+        csr = CSRGraph(self.csr.nodes, self.csr.indptr, self.csr.indices)
+        return MemmapGraph(csr, self.source)
+
+
+def open_memmap_graph(path: str) -> MemmapGraph:
+    """Open a CSR store directory or an undirected ``.gsnap`` snapshot as a ``MemmapGraph``."""
+    if os.path.isdir(path):
+        return MemmapGraph(open_csr_store(path), path)
+    if path.endswith(SNAPSHOT_EXTENSION):
+        snapshot = load_snapshot(path)
+        if snapshot.directed:
+            raise ValueError("Memory-mapped graphs are undirected; the snapshot holds a directed graph")
+        return MemmapGraph(snapshot.csr, path)
+    raise ValueError(f"{path} is neither a CSR store directory nor a graph snapshot")
@@ -0,0 +1,119 @@
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+import itertools
+import weakref
+import networkx as nx
+
+
+# Key of the state stamp a MetricsCache keeps in its graph's __networkx_cache__,
+# which NetworkX clears on every structural mutation
+_STAMP_KEY = 'metrics_cache_stamp'
+_STAMPS = itertools.count()
+
+
+class MetricsCache:
+    """Per-graph memo of computed metrics, invalidated when the graph changes.
+    
+    Every metric is stored under its own key so callers that only need one
+    measure never pay for the others. Cached values are validated against a
+    cheap fingerprint of the graph (node count, edge count, an explicit
+    version counter and a stamp kept in the graph's ``__networkx_cache__``);
+    any change drops the whole cache.
+    
+    NetworkX clears ``__networkx_cache__`` on every structural mutation
+    (adding or removing nodes or edges, through any method), so edits made
+    directly on the graph invalidate the cache even when they leave both
+    counts unchanged. Attribute edits (e.g. ``G[u][v]['weight'] = w``) and
+    writes to the private adjacency dicts are not structural and are not
+    detected; call ``invalidate_metrics_cache`` after those.
+    """
+    
+    def __init__(self):
+        """Create an empty cache."""
+        self.version = 0
+        self._fingerprint: Optional[Tuple[int, int, int, Optional[int]]] = None
+        self._values: Dict[Hashable, Any] = {}
+    
+    def fingerprint(self, graph: nx.Graph) -> Tuple[int, int, int, Optional[int]]:
+        """Return the fingerprint identifying the current state of the graph."""
+        stamps = getattr(graph, '__networkx_cache__', None)
+        stamp = stamps.get(_STAMP_KEY) if stamps is not None else None
+        return (graph.number_of_nodes(), graph.number_of_edges(), self.version, stamp)
+    
+    def _stamp(self, graph: nx.Graph) -> Tuple[int, int, int, Optional[int]]:
+        """Mark the graph's present state and return its fingerprint."""
+        stamps = getattr(graph, '__networkx_cache__', None)
+        if stamps is not None:
+            stamps[_STAMP_KEY] = next(_STAMPS)
+        return self.fingerprint(graph)
+    
+    def _validate(self, graph: nx.Graph) -> None:
+        """Drop cached values if the graph no longer matches the fingerprint."""
+        if self.fingerprint(graph) != self._fingerprint:
+            self._values.clear()
+            self._fingerprint = self._stamp(graph)
+    
+    def get(self, key: Hashable, graph: nx.Graph, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for key, computing and storing it if missing."""
+        self._validate(graph)
+        if key not in self._values:
+            self._values[key] = compute()
+        return self._values[key]
+    
+    def peek(self, key: Hashable, graph: nx.Graph, default: Any = None) -> Any:
+        """Return the cached value for key without computing it."""
+        self._validate(graph)
+        return self._values.get(key, default)
+    
+    def put(self, key: Hashable, graph: nx.Graph, value: Any) -> None:
+        """Store a value computed elsewhere for the current graph state."""
+        self._validate(graph)
+        self._values[key] = value
+    
+    def keys(self, graph: nx.Graph) -> List[Hashable]:
+        """Keys currently cached for the graph's present state."""
+        self._validate(graph)
+        return list(self._values)
+    
+    def update(self, graph: nx.Graph, mutate: Callable[[], Any], keep: Iterable[Hashable]) -> Any:
+        """Mutate the graph in place, carrying only the ``keep`` entries over to its new state.
+        
+        For edits whose effect on those entries is maintained incrementally (or
+        that deliberately serve them stale); everything else is dropped as in
+        ``invalidate``.
+        """
+        self._validate(graph)
+        result = mutate()
+        self._values = {key: self._values[key] for key in keep if key in self._values}
+        self.version += 1
+        self._fingerprint = self._stamp(graph)
+        return result
+    
+    def invalidate(self, keys: Optional[Iterable[Hashable]] = None) -> None:
+        """Invalidate the given keys, or everything after a graph mutation."""
+        if keys is None:
+            self.version += 1
+            self._values.clear()
+            self._fingerprint = None
+        else:
+            for key in keys:
+                self._values.pop(key, None)
+
+
+# One cache per live graph object, shared by every analyzer looking at it
+_GRAPH_CACHES: "weakref.WeakKeyDictionary[nx.Graph, MetricsCache]" = weakref.WeakKeyDictionary()
+
+
+def get_metrics_cache(graph: nx.Graph) -> MetricsCache:
+    """Return the metrics cache shared by all analyzers of this graph object."""
+    cache = _GRAPH_CACHES.get(graph)
+    if cache is None:
+        cache = MetricsCache()
+        _GRAPH_CACHES[graph] = cache
+    return cache
+
+
+def invalidate_metrics_cache(graph: nx.Graph) -> None:
+    """Invalidate cached metrics after mutating a graph in place."""
+    cache = _GRAPH_CACHES.get(graph)
+    if cache is not None:
+        cache.invalidate()
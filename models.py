@@ -66,7 +66,11 @@ class AgentState(BaseModel):
 
 
 class GraphMetrics(BaseModel):
-    """Comprehensive metrics for social graph analysis."""
+    """Comprehensive metrics for social graph analysis.
+    
+    Fields that were not requested (see ``SocialGraphAnalyzer.calculate_comprehensive_metrics``
+    with ``fields=``) are left as None or empty dicts.
+    """
     
     # Basic metrics
     num_nodes: int
@@ -79,39 +83,86 @@ class GraphMetrics(BaseModel):
     closeness_centrality: Dict[Any, float] = Field(default_factory=dict)
     eigenvector_centrality: Dict[Any, float] = Field(default_factory=dict)
     
+    # None when betweenness is exact; otherwise the sampling guarantee
+    # (method, epsilon, delta, confidence, samples)
+    betweenness_approximation: Optional[Dict[str, Any]] = None
+    
     # Community metrics
-    clustering_coefficient: float
-    average_clustering: float
+    clustering_coefficient: Optional[float] = None
+    average_clustering: Optional[float] = None
     
-    # Path metrics
+    # Path metrics; average_shortest_path_length covers the largest component
+    # and its estimate carries the sampling error (mean, stderr, ci95, samples)
     average_shortest_path_length: Optional[float] = None
+    average_shortest_path_length_estimate: Optional[Dict[str, Any]] = None
     diameter: Optional[int] = None
+    radius: Optional[int] = None
+    
+    # HyperANF estimates: 90th-percentile distance and the neighborhood function
+    # digest (N(t) per hop, average distance, reachable pairs, counter error)
+    effective_diameter: Optional[float] = None
+    neighborhood_function: Optional[Dict[str, Any]] = None
     
     # Component analysis
-    num_connected_components: int
-    largest_component_size: int
+    num_connected_components: Optional[int] = None
+    largest_component_size: Optional[int] = None
+    
+    # Fields served from before the latest incremental graph edits
+    stale_fields: List[str] = Field(default_factory=list)
     
     def to_summary_dict(self) -> Dict[str, Any]:
         """Convert to a summary dictionary for LLM consumption."""
-        return {
+        summary = {
             "basic_stats": {
                 "nodes": self.num_nodes,
                 "edges": self.num_edges,
                 "density": round(self.density, 4)
-            },
-            "connectivity": {
-                "clustering_coefficient": round(self.clustering_coefficient, 4),
-                "connected_components": self.num_connected_components,
-                "largest_component_size": self.largest_component_size
-            },
-            "centrality_leaders": {
-                "degree": self._top_k_dict(self.degree_centrality, 5),
-                "betweenness": self._top_k_dict(self.betweenness_centrality, 5),
-                "closeness": self._top_k_dict(self.closeness_centrality, 5),
-                "eigenvector": self._top_k_dict(self.eigenvector_centrality, 5)
             }
         }
+        
+        connectivity = {
+            "clustering_coefficient": self._round(self.clustering_coefficient),
+            "connected_components": self.num_connected_components,
+            "largest_component_size": self.largest_component_size
+        }
+        if any(value is not None for value in connectivity.values()):
+            summary["connectivity"] = connectivity
+        
+        centralities = {
+            "degree": self.degree_centrality,
+            "betweenness": self.betweenness_centrality,
+            "closeness": self.closeness_centrality,
+            "eigenvector": self.eigenvector_centrality
+        }
+        if any(centralities.values()):
+            summary["centrality_leaders"] = {
+                name: self._top_k_dict(values, 5) for name, values in centralities.items()
+            }
+            if self.betweenness_approximation:
+                summary["betweenness_approximation"] = self.betweenness_approximation
+        
+        paths = {
+            "average_shortest_path_length": self._round(self.average_shortest_path_length),
+            "diameter": self.diameter,
+            "radius": self.radius,
+            "effective_diameter": self._round(self.effective_diameter)
+        }
+        if any(value is not None for value in paths.values()):
+            estimate = self.average_shortest_path_length_estimate
+            if estimate and not estimate.get("exact"):
+                paths["average_shortest_path_length_stderr"] = self._round(estimate["stderr"])
+                paths["average_shortest_path_length_samples"] = estimate["samples"]
+            summary["paths"] = paths
+        
+        if self.stale_fields:
+            summary["stale_metrics"] = self.stale_fields
+        
+        return summary
+    
+    def _round(self, value: Optional[float], digits: int = 4) -> Optional[float]:
+        """Round a value that may not have been computed."""
+        return round(value, digits) if value is not None else None
     
     def _top_k_dict(self, d: Dict[Any, float], k: int) -> Dict[Any, float]:
         """Get top k items from dictionary by value."""
-        return dict(sorted(d.items(), key=lambda x: x[1], reverse=True)[:k]) 
\ No newline at end of file
+        return dict(sorted(d.items(), key=lambda x: x[1], reverse=True)[:k])
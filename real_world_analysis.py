@@ -38,66 +38,77 @@ from datetime import datetime
 from social_graph_agent import SocialGraphAgent
 from models import NodeData, EdgeData, GraphMetrics
 from graph_tools import SocialGraphAnalyzer
+from edge_loader import DEFAULT_CHUNK_ROWS, EdgeList, read_edge_list
+from graph_snapshot import SNAPSHOT_EXTENSION, load_snapshot, save_snapshot, snapshot_is_current
+from memmap_graph import (STORE_EXTENSION, MemmapGraph, build_csr_store, open_memmap_graph,
+                          store_is_current)
+from metrics_cache import get_metrics_cache
+
+# Metric fields computed for the comprehensive report (closeness leaders are added separately)
+REPORT_METRIC_FIELDS = ('connectivity', 'clustering', 'degree_centrality', 'betweenness_centrality',
+                        'eigenvector_centrality', 'paths', 'neighborhood_function')
 
 
 class RealWorldGraphAnalyzer:
     """Analyzer for real-world graph datasets."""
     
-    def __init__(self, model_name: str = "gemma3n:latest"):
-        """Initialize the real-world graph analyzer."""
-        self.agent = SocialGraphAgent(model_name)
-        self.analyzer = SocialGraphAnalyzer()
+    def __init__(self, model_name: str = "gemma3n:latest", workers: Optional[int] = 1):
+        """Initialize the real-world graph analyzer.
+        
+        ``workers`` sets how many processes share the per-source BFS passes of
+        exact betweenness and closeness and the parsing of large edge-list
+        files (None uses every CPU core).
+        """
+        self.workers = workers
+        self.agent = SocialGraphAgent(model_name, workers=workers)
+        self.analyzer = SocialGraphAnalyzer(workers=workers)
         self.graph = None
+        self.edge_list: Optional[EdgeList] = None
         self.graph_info = {}
         self.analysis_results = {}
         
     def load_graph_from_csv_edgelist(self, filepath: str, source_col: Union[str, int] = "source", 
                                    target_col: Union[str, int] = "target", weight_col: Optional[Union[str, int]] = None,
-                                   directed: bool = False, delimiter: str = ",") -> nx.Graph:
-        """Load graph from CSV edge list format."""
+                                   directed: bool = False, delimiter: str = ",",
+                                   chunk_rows: int = DEFAULT_CHUNK_ROWS) -> nx.Graph:
+        """Load graph from CSV edge list format.
+        
+        The file is streamed ``chunk_rows`` lines at a time into NumPy arrays
+        with node IDs interned as it goes (see ``edge_loader``), so no more
+        than one chunk is held as a DataFrame; progress is printed per chunk on
+        multi-chunk files. With ``workers`` > 1, large files are split into
+        newline-aligned byte ranges parsed in a process pool and merged into
+        the same result as a serial pass. The graph is then built with bulk
+        inserts. Every column besides the endpoints stays available as a
+        per-edge array in ``self.edge_list.attributes``.
+        """
         print(f"📁 Loading graph from CSV edge list: {filepath}")
         
         try:
-            df = pd.read_csv(filepath, delimiter=delimiter, comment='#', header=None)
-            print(f"   📊 Found {len(df)} edges in file")
-            
             # For files with no headers, use column indices
             if source_col == "source":
                 source_col = 0
             if target_col == "target":  
                 target_col = 1
             
-            # Validate required columns
-            max_col = max(source_col if isinstance(source_col, int) else 0, 
-                         target_col if isinstance(target_col, int) else 1)
-            if max_col >= len(df.columns):
-                raise ValueError(f"Required column index {max_col} not found. Available columns: {len(df.columns)}")
-            
-            # Create graph
-            if directed:
-                G = nx.DiGraph()
-                print("   🔄 Creating directed graph")
-            else:
-                G = nx.Graph()
-                print("   🔄 Creating undirected graph")
-            
-            # Add edges
-            for _, row in df.iterrows():
-                source = str(row[source_col])
-                target = str(row[target_col])
-                
-                if weight_col is not None and isinstance(weight_col, int) and weight_col < len(df.columns):
-                    weight = float(row[weight_col])
-                    G.add_edge(source, target, weight=weight)
-                else:
-                    G.add_edge(source, target)
+            edges = read_edge_list(filepath, source_col, target_col, weight_col, delimiter,
+                                   chunk_rows=chunk_rows, progress=self._report_load_progress,
+                                   workers=self.workers)
+            print(f"   📊 Found {edges.num_edges} edges in file")
+            print(f"   🔄 Creating {'directed' if directed else 'undirected'} graph")
+            G = edges.to_networkx(directed)
+            self.edge_list = edges
+            if not directed:
+                # Hand the analyzer the CSR core built from the same arrays
+                get_metrics_cache(G).put('csr', G, edges.to_csr())
             
             self.graph_info = {
                 "source": filepath,
                 "format": "CSV EdgeList",
                 "directed": directed,
                 "loaded_at": datetime.now().isoformat(),
-                "original_edges": len(df),
+                "original_edges": edges.num_edges,
+                "edge_attributes": list(edges.attributes),
                 "final_nodes": G.number_of_nodes(),
                 "final_edges": G.number_of_edges()
             }
@@ -109,6 +120,139 @@ class RealWorldGraphAnalyzer:
             print(f"   ❌ Error loading CSV: {str(e)}")
             raise
     
+    @staticmethod
+    def _report_load_progress(rows: int, bytes_read: int, total_bytes: int) -> None:
+        """Print streaming progress for files that span several chunks."""
+        if bytes_read < total_bytes:
+            print(f"   ⏳ {rows:,} edges read ({bytes_read / total_bytes:.0%})")
+    
+    def load_graph_from_snapshot(self, filepath: str) -> nx.Graph:
+        """Load a graph snapshot written by ``export_results`` or ``load_with_snapshot_cache``.
+        
+        The CSR arrays are memory-mapped from the file and handed to the
+        analyzer as-is; only the NetworkX graph is rebuilt.
+        """
+        print(f"📁 Loading graph snapshot: {filepath}")
+        
+        try:
+            snapshot = load_snapshot(filepath)
+            G = snapshot.to_networkx()
+            get_metrics_cache(G).put('csr', G, snapshot.csr)
+            
+            self.graph_info = {
+                "source": filepath,
+                "format": "Graph Snapshot",
+                "directed": snapshot.directed,
+                "loaded_at": datetime.now().isoformat(),
+                "snapshot_of": snapshot.info,
+                "final_nodes": G.number_of_nodes(),
+                "final_edges": G.number_of_edges()
+            }
+            
+            print(f"   ✅ Graph loaded: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
+            return G
+        
+        except Exception as e:
+            print(f"   ❌ Error loading snapshot: {str(e)}")
+            raise
+    
+    def save_graph_snapshot(self, filepath: str, G: Optional[nx.Graph] = None,
+                            source_options: Optional[Dict[str, Any]] = None) -> str:
+        """Write G (the loaded graph by default) to a binary snapshot file.
+        
+        ``source_options`` records the loader options G was read with (see
+        ``load_with_snapshot_cache``).
+        """
+        G = G if G is not None else self.graph
+        if G is None:
+            raise ValueError("No graph loaded. Please load a graph first.")
+        # Reuse the CSR view if one was already built for this graph version
+        save_snapshot(filepath, G, csr=get_metrics_cache(G).peek('csr', G), info=self.graph_info,
+                      source_options=source_options)
+        return filepath
+    
+    def load_with_snapshot_cache(self, filepath: str, **kwargs) -> nx.Graph:
+        """Load a file through a snapshot cached next to it.
+        
+        The first load parses the file (``auto_detect_and_load`` with
+        ``kwargs``) and writes ``<name>.gsnap`` beside it, recording those
+        loader options. Later loads read that snapshot as long as it is newer
+        than the file and was made with the same options (delimiter, columns,
+        weight column, directed, ...); otherwise the file is parsed again and
+        the snapshot replaced.
+        """
+        snapshot_path = str(Path(filepath).with_suffix(SNAPSHOT_EXTENSION))
+        # Chunking changes how the file is read, not the graph
+        source_options = {name: value for name, value in kwargs.items() if name != 'chunk_rows'}
+        if snapshot_is_current(snapshot_path, filepath, source_options):
+            return self.load_graph_from_snapshot(snapshot_path)
+        
+        G = self.auto_detect_and_load(filepath, **kwargs)
+        try:
+            self.save_graph_snapshot(snapshot_path, G, source_options)
+            print(f"   💾 Cached snapshot: {snapshot_path}")
+        except OSError as e:
+            print(f"   ⚠️  Could not cache snapshot: {str(e)}")
+        return G
+    
+    def load_graph_out_of_core(self, filepath: str, source_col: Union[str, int] = "source",
+                               target_col: Union[str, int] = "target", weight_col: Optional[Union[str, int]] = None,
+                               directed: bool = False, delimiter: str = ",", chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                               store_dir: Optional[str] = None) -> MemmapGraph:
+        """Load a graph with the out-of-core backend, keeping its adjacency in memory-mapped files.
+        
+        ``filepath`` is a CSR store directory, an undirected graph snapshot or
+        an edge-list file. An edge list is converted into a store once
+        (``store_dir``, by default ``<name>.csrstore`` next to the file, rebuilt
+        when the file is newer or the columns or delimiter differ) without ever
+        holding its edges in memory. The
+        result is a read-only ``MemmapGraph`` that every analysis accepts;
+        edge attributes are not kept and directed graphs are not supported.
+        """
+        print(f"📁 Loading graph out of core: {filepath}")
+        
+        try:
+            if directed:
+                raise ValueError("The out-of-core backend only holds undirected graphs")
+            if weight_col is not None:
+                print(f"   ⚠️  Ignoring weight column {weight_col}: the out-of-core backend keeps no edge attributes")
+            
+            store = str(filepath)
+            if not (os.path.isdir(store) or store.endswith(SNAPSHOT_EXTENSION)):
+                # For files with no headers, use column indices
+                if source_col == "source":
+                    source_col = 0
+                if target_col == "target":
+                    target_col = 1
+                
+                store = store_dir or str(Path(filepath).with_suffix(STORE_EXTENSION))
+                if store_is_current(store, filepath, source_col, target_col, delimiter):
+                    print(f"   💾 Reusing CSR store: {store}")
+                else:
+                    print(f"   🔄 Building CSR store: {store}")
+                    build_csr_store(str(filepath), store, source_col, target_col, delimiter,
+                                    chunk_rows=chunk_rows, progress=self._report_load_progress)
+            G = open_memmap_graph(store)
+            self.edge_list = None
+            
+            self.graph_info = {
+                "source": str(filepath),
+                "format": "Memory-Mapped CSR",
+                "store": store,
+                "directed": False,
+                "loaded_at": datetime.now().isoformat(),
+                "final_nodes": G.number_of_nodes(),
+                "final_edges": G.number_of_edges()
+            }
+            
+            print(f"   ✅ Graph mapped: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges "
+                  f"({G.csr.nbytes / 2**20:.1f} MB of adjacency on disk)")
+            return G
+        
+        except Exception as e:
+            print(f"   ❌ Error loading out of core: {str(e)}")
+            raise
+    
     def load_graph_from_json(self, filepath: str) -> nx.Graph:
         """Load graph from JSON format (nodes and edges arrays)."""
         print(f"📁 Loading graph from JSON: {filepath}")
@@ -221,13 +365,22 @@ class RealWorldGraphAnalyzer:
             print(f"   ❌ Error loading adjacency matrix: {str(e)}")
             raise
     
-    def auto_detect_and_load(self, filepath: str, **kwargs) -> nx.Graph:
-        """Auto-detect file format and load appropriately."""
+    def auto_detect_and_load(self, filepath: str, backend: str = "memory", **kwargs) -> nx.Graph:
+        """Auto-detect file format and load appropriately.
+        
+        ``backend="memmap"`` loads through ``load_graph_out_of_core`` instead,
+        for graphs too large to hold as a NetworkX graph.
+        """
         filepath = Path(filepath)
         
         if not filepath.exists():
             raise FileNotFoundError(f"File not found: {filepath}")
         
+        if backend == "memmap":
+            return self.load_graph_out_of_core(str(filepath), **kwargs)
+        if backend != "memory":
+            raise ValueError(f"Unknown graph backend: {backend}")
+        
         extension = filepath.suffix.lower()
         
         print(f"🔍 Auto-detecting format for: {filepath.name}")
@@ -260,9 +413,15 @@ class RealWorldGraphAnalyzer:
             print("   📊 Detected: GraphML")
             return self.load_graph_from_graphml(str(filepath))
             
+        elif extension == SNAPSHOT_EXTENSION:
+            print("   📊 Detected: Graph Snapshot")
+            return self.load_graph_from_snapshot(str(filepath))
+        
         elif extension in ['.pkl', '.pickle']:
+            # nx.read_gpickle is gone in NetworkX 3; gpickles are plain pickles
             print("   📊 Detected: NetworkX Pickle")
-            return nx.read_gpickle(str(filepath))
+            with open(filepath, 'rb') as f:
+                return pickle.load(f)
             
         else:
             raise ValueError(f"Unsupported file format: {extension}")
@@ -276,12 +435,22 @@ class RealWorldGraphAnalyzer:
         original_edges = G.number_of_edges()
         
         # Remove self loops
-        if remove_self_loops:
+        if remove_self_loops and isinstance(G, MemmapGraph):
+            num_self_loops = int(G.csr.self_loops.sum())
+            if num_self_loops:
+                G = G.without_self_loops()
+                print(f"   🔄 Removed {num_self_loops} self loops")
+        elif remove_self_loops:
             self_loops = list(nx.selfloop_edges(G))
             if self_loops:
                 G.remove_edges_from(self_loops)
                 print(f"   🔄 Removed {len(self_loops)} self loops")
         
+        # Memory-mapped graphs are read-only, so node filters cannot apply
+        if isinstance(G, MemmapGraph) and (remove_isolates or largest_component_only):
+            print("   ⚠️  Skipping isolate and component filters on the out-of-core graph")
+            remove_isolates = largest_component_only = False
+        
         # Remove isolated nodes
         if remove_isolates:
             isolates = list(nx.isolates(G))
@@ -312,8 +481,15 @@ class RealWorldGraphAnalyzer:
         
         return G
     
-    def analyze_graph_comprehensively(self, query: str = "Provide a comprehensive analysis of this real-world social network") -> Dict[str, Any]:
-        """Perform comprehensive analysis of the loaded graph."""
+    def analyze_graph_comprehensively(self, query: str = "Provide a comprehensive analysis of this real-world social network",
+                                      modularity_weight: Optional[str] = None) -> Dict[str, Any]:
+        """Perform comprehensive analysis of the loaded graph.
+        
+        Communities are detected on the unweighted graph and their modularity
+        is reported the same way. Pass an edge attribute as
+        ``modularity_weight`` (``'weight'`` for a CSV loaded with
+        ``weight_col``) to report the weighted modularity of that partition.
+        """
         if self.graph is None:
             raise ValueError("No graph loaded. Please load a graph first.")
         
@@ -322,25 +498,28 @@ class RealWorldGraphAnalyzer:
         # Set the graph in analyzer
         self.analyzer.graph = self.graph
         
-        # Calculate all metrics
+        # Calculate the reported metrics; closeness only enters the report as
+        # its leaders, which the pruned top-k search finds without the O(n*m)
+        # all-sources pass on large graphs
         print("   🔢 Calculating network metrics...")
-        metrics = self.analyzer.calculate_comprehensive_metrics()
+        metrics = self.analyzer.calculate_comprehensive_metrics(fields=REPORT_METRIC_FIELDS)
+        metrics.closeness_centrality = dict(self.analyzer.top_k_closeness(5))
         
         # Detect communities
         print("   🏘️  Detecting communities...")
-        communities = self.analyzer.detect_communities()
+        partition = self.analyzer.community_partition()
+        communities = partition["communities"]
+        modularity = partition["modularity"]
+        if modularity_weight is not None and communities:
+            modularity = nx.community.modularity(self.graph, communities, weight=modularity_weight)
         
         # Find influential nodes
         print("   🎯 Identifying influential nodes...")
         influential = self.analyzer.find_influential_nodes(top_k=10)
         
-        # Analyze robustness (for smaller graphs)
-        robustness = None
-        if self.graph.number_of_nodes() <= 1000:
-            print("   🛡️  Analyzing network robustness...")
-            robustness = self.analyzer.analyze_graph_robustness(num_removals=min(5, self.graph.number_of_nodes()//10))
-        else:
-            print("   ⚠️  Skipping robustness analysis (graph too large)")
+        # Analyze robustness (attack curves scale to large graphs)
+        print("   🛡️  Analyzing network robustness...")
+        robustness = self.analyzer.analyze_graph_robustness(num_removals=min(5, self.graph.number_of_nodes()//10))
         
         # Get AI insights
         print("   🤖 Generating AI insights...")
@@ -357,7 +536,9 @@ class RealWorldGraphAnalyzer:
             "communities": {
                 "count": len(communities),
                 "sizes": [len(c) for c in communities],
-                "modularity": nx.community.modularity(self.graph, communities) if communities else 0
+                "modularity": modularity,
+                "coverage": partition["coverage"],
+                "bridges": self.analyzer.inter_community_index().summary()
             },
             "influential_nodes": influential,
             "robustness": robustness,
@@ -467,8 +648,14 @@ class RealWorldGraphAnalyzer:
                 "-" * 40,
                 f"Original Connectivity: {self._format_number(robustness.get('original_connectivity', 'N/A'), 4)}",
                 f"Critical Nodes Tested: {len(robustness.get('removal_results', []))}",
-                ""
             ])
+            for strategy, curve in robustness.get('attack_curves', {}).items():
+                report_lines.append(
+                    f"{strategy.replace('_', ' ').title()} Attack: "
+                    f"R = {self._format_number(curve['robustness_index'], 4)}, "
+                    f"largest component halved after {self._format_number(curve['critical_fraction'] * 100, 1)}% removed"
+                )
+            report_lines.append("")
         
         # AI Insights
         if self.analysis_results["ai_insights"]:
@@ -514,12 +701,26 @@ class RealWorldGraphAnalyzer:
         self.generate_report(report_file)
         output_files["report"] = report_file
         
+        # Binary snapshot, reloadable with load_graph_from_snapshot (an
+        # out-of-core graph already lives in its store)
+        if self.graph is not None and not isinstance(self.graph, MemmapGraph):
+            snapshot_file = os.path.join(output_dir, "processed_graph" + SNAPSHOT_EXTENSION)
+            self.save_graph_snapshot(snapshot_file)
+            output_files["snapshot"] = snapshot_file
+        
         # Graph export (if not too large)
         if self.graph and self.graph.number_of_nodes() <= 10000:
             graphml_file = os.path.join(output_dir, "processed_graph.graphml")
             nx.write_graphml(self.graph, graphml_file)
             output_files["graphml"] = graphml_file
         
+        # Distance oracle, if path queries already built one for this graph
+        oracle = self.analyzer.distance_oracle(build=False)
+        if oracle is not None:
+            oracle_file = os.path.join(output_dir, "distance_oracle.npz")
+            oracle.save(oracle_file)
+            output_files["distance_oracle"] = oracle_file
+        
         print(f"📁 Results exported to: {output_dir}")
         return output_files
 
@@ -580,13 +781,15 @@ def main():
     parser = argparse.ArgumentParser(description="Analyze real-world social network data")
     
     parser.add_argument("input_file", nargs="?", help="Input graph data file")
-    parser.add_argument("--format", choices=["auto", "csv", "json", "graphml", "adjacency"], 
+    parser.add_argument("--format", choices=["auto", "csv", "json", "graphml", "adjacency", "snapshot"], 
                        default="auto", help="Input file format")
     parser.add_argument("--directed", action="store_true", help="Treat graph as directed")
     parser.add_argument("--source-col", default="source", help="Source column name (for CSV)")
     parser.add_argument("--target-col", default="target", help="Target column name (for CSV)")
     parser.add_argument("--weight-col", help="Weight column name (for CSV)")
     parser.add_argument("--delimiter", default=",", help="CSV delimiter")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS,
+                       help="Edge-list lines parsed per chunk while streaming")
     parser.add_argument("--remove-self-loops", action="store_true", help="Remove self loops")
     parser.add_argument("--remove-isolates", action="store_true", help="Remove isolated nodes")
     parser.add_argument("--largest-component", action="store_true", help="Keep only largest component")
@@ -594,6 +797,11 @@ def main():
     parser.add_argument("--query", default="Provide a comprehensive analysis of this real-world social network",
                        help="Analysis query for AI insights")
     parser.add_argument("--create-samples", action="store_true", help="Create sample datasets and exit")
+    parser.add_argument("--backend", choices=["memory", "memmap"], default="memory",
+                       help="Graph backend: NetworkX in memory, or memory-mapped CSR files for graphs larger than RAM")
+    parser.add_argument("--store-dir", help="CSR store directory for the memmap backend (default: <input>.csrstore)")
+    parser.add_argument("--workers", type=int, default=1,
+                       help="Processes for exact betweenness/closeness and edge-list parsing (0 = all CPU cores)")
     
     args = parser.parse_args()
     
@@ -614,29 +822,42 @@ def main():
     
     try:
         # Initialize analyzer
-        analyzer = RealWorldGraphAnalyzer()
+        analyzer = RealWorldGraphAnalyzer(workers=args.workers)
         
         # Load graph
-        if args.format == "auto":
+        if args.backend == "memmap":
+            graph = analyzer.load_graph_out_of_core(args.input_file,
+                                                    source_col=args.source_col,
+                                                    target_col=args.target_col,
+                                                    weight_col=args.weight_col,
+                                                    directed=args.directed,
+                                                    delimiter=args.delimiter,
+                                                    chunk_rows=args.chunk_rows,
+                                                    store_dir=args.store_dir)
+        elif args.format == "auto":
             graph = analyzer.auto_detect_and_load(args.input_file, 
                                                  source_col=args.source_col,
                                                  target_col=args.target_col,
                                                  weight_col=args.weight_col,
                                                  directed=args.directed,
-                                                 delimiter=args.delimiter)
+                                                 delimiter=args.delimiter,
+                                                 chunk_rows=args.chunk_rows)
         elif args.format == "csv":
             graph = analyzer.load_graph_from_csv_edgelist(args.input_file,
                                                          source_col=args.source_col,
                                                          target_col=args.target_col,
                                                          weight_col=args.weight_col,
                                                          directed=args.directed,
-                                                         delimiter=args.delimiter)
+                                                         delimiter=args.delimiter,
+                                                         chunk_rows=args.chunk_rows)
         elif args.format == "json":
             graph = analyzer.load_graph_from_json(args.input_file)
         elif args.format == "graphml":
             graph = analyzer.load_graph_from_graphml(args.input_file)
         elif args.format == "adjacency":
             graph = analyzer.load_graph_from_adjacency_matrix(args.input_file, args.delimiter)
+        elif args.format == "snapshot":
+            graph = analyzer.load_graph_from_snapshot(args.input_file)
         
         # Preprocess
         analyzer.graph = analyzer.validate_and_preprocess(
@@ -0,0 +1,266 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Hashable, List, NamedTuple, Optional, Sequence, Tuple
+import heapq
+import numpy as np
+
+from csr_graph import CSRGraph
+from shortest_paths import resolve_workers
+
+
+# CSR view installed in each pool worker by _init_worker (sent once per worker, not per task)
+_WORKER_CSR: Optional[CSRGraph] = None
+
+
+class AttackCurve(NamedTuple):
+    """Connectivity after removing the first ``i`` nodes of an attack order, for i = 0..n."""
+    order: np.ndarray
+    largest_component: np.ndarray
+    components: np.ndarray
+
+
+def degree_attack_order(csr: CSRGraph) -> np.ndarray:
+    """Remove nodes by initial degree, highest first (ties by node index)."""
+    return np.argsort(-csr.degree(), kind='stable').astype(np.int64)
+
+
+def centrality_attack_order(csr: CSRGraph, centrality: Dict[Hashable, float]) -> np.ndarray:
+    """Remove nodes by a precomputed centrality, highest first (ties by node index)."""
+    values = np.array([centrality.get(node, 0.0) for node in csr.nodes], dtype=np.float64)
+    return np.argsort(-values, kind='stable').astype(np.int64)
+
+
+def adaptive_degree_attack_order(csr: CSRGraph) -> np.ndarray:
+    """Always remove the node of highest degree in the remaining graph.
+    
+    Degrees are decremented as neighbors disappear; a lazy max-heap skips
+    outdated entries, so the whole order costs O(m log n).
+    """
+    n = csr.num_nodes
+    indptr = csr.indptr.tolist()
+    indices = csr.indices.tolist()
+    degree = np.diff(csr.indptr).tolist()
+    removed = [False] * n
+    heap = [(-d, v) for v, d in enumerate(degree)]
+    heapq.heapify(heap)
+    
+    order = []
+    while heap:
+        d, v = heapq.heappop(heap)
+        if removed[v] or -d != degree[v]:
+            continue
+        removed[v] = True
+        order.append(v)
+        for u in indices[indptr[v]:indptr[v + 1]]:
+            if not removed[u]:
+                degree[u] -= 1
+                heapq.heappush(heap, (-degree[u], u))
+    return np.array(order, dtype=np.int64)
+
+
+def attack_curve(csr: CSRGraph, order: np.ndarray) -> AttackCurve:
+    """Largest component and component count along a full removal order.
+    
+    Instead of deleting nodes and recomputing components n times, nodes are
+    re-inserted in reverse order into a union-find (union by size, path
+    halving), so the whole curve costs one pass over the edges.
+    """
+    n = csr.num_nodes
+    indptr = csr.indptr.tolist()
+    indices = csr.indices.tolist()
+    parent = list(range(n))
+    size = [1] * n
+    present = [False] * n
+    
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+    
+    largest_component = np.zeros(n + 1, dtype=np.int64)
+    components = np.zeros(n + 1, dtype=np.int64)
+    largest = 0
+    count = 0
+    for i in range(n - 1, -1, -1):
+        v = int(order[i])
+        present[v] = True
+        count += 1
+        root = v
+        for u in indices[indptr[v]:indptr[v + 1]]:
+            if not present[u]:
+                continue
+            other = find(u)
+            if other == root:
+                continue
+            if size[other] > size[root]:
+                root, other = other, root
+            parent[other] = root
+            size[root] += size[other]
+            count -= 1
+        largest = max(largest, size[root])
+        largest_component[i] = largest
+        components[i] = count
+    return AttackCurve(np.asarray(order), largest_component, components)
+
+
+def robustness_index(curve: AttackCurve) -> float:
+    """Schneider's R: mean largest-component fraction over all removal steps (0 to 0.5)."""
+    n = len(curve.order)
+    return float(curve.largest_component[1:].sum()) / (n * n) if n else 0.0
+
+
+def critical_fraction(curve: AttackCurve) -> float:
+    """Smallest fraction of removed nodes that halves the largest component."""
+    n = len(curve.order)
+    if n == 0:
+        return 0.0
+    halved = np.flatnonzero(curve.largest_component * 2 <= curve.largest_component[0])
+    return float(halved[0]) / n
+
+
+def summarize_curve(curve: AttackCurve, points: int = 21) -> Dict[str, Any]:
+    """Downsample a curve to ``points`` evenly spaced removal fractions plus its summary statistics."""
+    n = len(curve.order)
+    steps = np.unique(np.round(np.linspace(0, n, max(points, 2))).astype(np.int64))
+    return {
+        'fraction_removed': (steps / n if n else steps.astype(np.float64)).tolist(),
+        'largest_component_fraction': (curve.largest_component[steps] / n if n else steps * 0.0).tolist(),
+        'components': curve.components[steps].tolist(),
+        'robustness_index': robustness_index(curve),
+        'critical_fraction': critical_fraction(curve),
+    }
+
+
+class PercolationCurve(NamedTuple):
+    """Monte Carlo average of the largest cluster against the number of occupied nodes or edges.
+    
+    ``largest_mean[k]``/``largest_std[k]`` describe the largest cluster once
+    ``k`` elements are occupied; ``thresholds`` holds each run's estimate of
+    the critical occupation fraction.
+    """
+    mode: str
+    runs: int
+    num_nodes: int
+    largest_mean: np.ndarray
+    largest_std: np.ndarray
+    thresholds: np.ndarray
+
+
+def _bond_percolation_run(csr: CSRGraph, src: List[int], dst: List[int], order: np.ndarray) -> np.ndarray:
+    """Largest cluster after occupying each prefix of an edge order (all nodes present)."""
+    n = csr.num_nodes
+    parent = list(range(n))
+    size = [1] * n
+    
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+    
+    largest_component = np.empty(len(order) + 1, dtype=np.int64)
+    largest = 1 if n else 0
+    largest_component[0] = largest
+    for k, e in enumerate(order.tolist(), start=1):
+        a, b = find(src[e]), find(dst[e])
+        if a != b:
+            if size[a] < size[b]:
+                a, b = b, a
+            parent[b] = a
+            size[a] += size[b]
+            largest = max(largest, size[a])
+        largest_component[k] = largest
+    return largest_component
+
+
+def _percolation_runs(csr: CSRGraph, mode: str, seeds: Sequence[np.random.SeedSequence]
+                      ) -> Tuple[np.ndarray, np.ndarray, List[float]]:
+    """Sum and sum of squares of the largest-cluster curves of a batch of runs, plus their thresholds."""
+    if mode == 'edge':
+        src, dst = (part.tolist() for part in csr.edge_array())
+        total = len(src)
+    else:
+        total = csr.num_nodes
+    
+    curve_sum = np.zeros(total + 1, dtype=np.float64)
+    curve_sq = np.zeros(total + 1, dtype=np.float64)
+    thresholds = []
+    for seed in seeds:
+        order = np.random.default_rng(seed).permutation(total)
+        if mode == 'edge':
+            largest = _bond_percolation_run(csr, src, dst, order)
+        else:
+            # Occupying nodes in order is removing them in reverse order
+            largest = attack_curve(csr, order[::-1]).largest_component[::-1]
+        curve_sum += largest
+        curve_sq += largest.astype(np.float64) ** 2
+        # The occupation at which this run's largest cluster jumps the most
+        thresholds.append(float(np.argmax(np.diff(largest)) + 1) / total if total else 0.0)
+    return curve_sum, curve_sq, thresholds
+
+
+def _init_worker(csr: CSRGraph) -> None:
+    global _WORKER_CSR
+    _WORKER_CSR = csr
+
+
+def _worker_runs(mode: str, seeds: Sequence[np.random.SeedSequence]) -> Tuple[np.ndarray, np.ndarray, List[float]]:
+    return _percolation_runs(_WORKER_CSR, mode, seeds)
+
+
+def percolation_curve(csr: CSRGraph, mode: str = 'node', runs: int = 100, seed: Optional[int] = None,
+                      workers: Optional[int] = 1) -> PercolationCurve:
+    """Random-failure percolation by Newman-Ziff sweeps.
+    
+    Each run occupies nodes (``mode='node'``, site percolation) or edges
+    (``mode='edge'``, bond percolation) in a random order, adding them one at
+    a time to a union-find, so one run yields the largest cluster for every
+    occupation level in a single pass. Runs are independent and are split
+    across ``workers`` processes; each run draws from its own child of
+    ``seed``, so results do not depend on the worker count.
+    """
+    if mode not in ('node', 'edge'):
+        raise ValueError(f"Unknown percolation mode: {mode}")
+    if runs < 1:
+        raise ValueError("percolation needs at least one run")
+    seeds = np.random.SeedSequence(seed).spawn(runs)
+    workers = min(resolve_workers(workers), runs)
+    if workers <= 1:
+        parts = [_percolation_runs(csr, mode, seeds)]
+    else:
+        # Contiguous chunks keep the per-run thresholds in seed order
+        chunks = [list(chunk) for chunk in np.array_split(np.array(seeds, dtype=object), workers)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(csr,)) as pool:
+            parts = list(pool.map(_worker_runs, [mode] * len(chunks), chunks))
+    
+    curve_sum = np.sum([part[0] for part in parts], axis=0)
+    curve_sq = np.sum([part[1] for part in parts], axis=0)
+    mean = curve_sum / runs
+    return PercolationCurve(
+        mode=mode,
+        runs=runs,
+        num_nodes=csr.num_nodes,
+        largest_mean=mean,
+        largest_std=np.sqrt(np.maximum(curve_sq / runs - mean ** 2, 0.0)),
+        thresholds=np.array([value for part in parts for value in part[2]], dtype=np.float64),
+    )
+
+
+def summarize_percolation(curve: PercolationCurve, points: int = 21) -> Dict[str, Any]:
+    """Downsample a percolation curve to ``points`` occupation fractions plus the threshold estimate.
+    
+    ``critical_threshold`` is the mean of the per-run threshold estimates and
+    ``critical_threshold_std`` their standard deviation, reported separately.
+    """
+    total = len(curve.largest_mean) - 1
+    n = max(curve.num_nodes, 1)
+    steps = np.unique(np.round(np.linspace(0, total, max(points, 2))).astype(np.int64))
+    return {
+        'mode': curve.mode,
+        'runs': curve.runs,
+        'occupation_fraction': (steps / max(total, 1)).tolist(),
+        'largest_component_fraction': (curve.largest_mean[steps] / n).tolist(),
+        'largest_component_std': (curve.largest_std[steps] / n).tolist(),
+        'critical_threshold': float(curve.thresholds.mean()) if len(curve.thresholds) else 0.0,
+        'critical_threshold_std': float(curve.thresholds.std()) if len(curve.thresholds) else 0.0,
+    }
@@ -0,0 +1,443 @@
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+import heapq
+import os
+import numpy as np
+
+from csr_graph import CSRGraph
+
+
+# CSR view installed in each pool worker by _init_worker (sent once per worker, not per task)
+_WORKER_CSR: Optional[CSRGraph] = None
+
+# Sweep chunk size; fixed so partial sums add up in the same order for any worker count
+_SOURCES_PER_CHUNK = 64
+
+
+def resolve_workers(workers: Optional[int]) -> int:
+    """Normalize a ``workers=`` knob: None or <= 0 means one process per CPU core."""
+    if workers is None or workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def _single_source_brandes(csr: CSRGraph, source: int, with_dependencies: bool = True
+                           ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Level-synchronous BFS from source with Brandes dependency accumulation.
+    
+    Returns the hop distances (-1 where unreachable) and, if requested, the
+    dependency ``delta[v]`` of the source on every node v.
+    """
+    n = csr.num_nodes
+    dist = np.full(n, -1, dtype=np.int32)
+    dist[source] = 0
+    sigma = np.zeros(n, dtype=np.float64)
+    sigma[source] = 1.0
+    
+    # Shortest-path DAG edges (predecessor, successor) of every level
+    dag_levels: List[Tuple[np.ndarray, np.ndarray]] = []
+    frontier = np.array([source], dtype=np.int32)
+    depth = 0
+    while len(frontier):
+        src, nbr = csr.expand(frontier)
+        unseen = dist[nbr] == -1
+        dist[nbr[unseen]] = depth + 1
+        tree = dist[nbr] == depth + 1
+        src, nbr = src[tree], nbr[tree]
+        if with_dependencies and len(nbr):
+            sigma += np.bincount(nbr, weights=sigma[src], minlength=n)
+            dag_levels.append((src, nbr))
+        frontier = np.unique(nbr)
+        depth += 1
+    
+    if not with_dependencies:
+        return dist, None
+    
+    delta = np.zeros(n, dtype=np.float64)
+    for src, nbr in reversed(dag_levels):
+        delta += np.bincount(src, weights=sigma[src] / sigma[nbr] * (1.0 + delta[nbr]), minlength=n)
+    delta[source] = 0.0
+    return dist, delta
+
+
+class SingleSourcePaths(Mapping):
+    """Shortest paths from one source as a BFS tree: one distance and one predecessor per node.
+    
+    Takes O(n) memory instead of the O(n * depth) of a dict of path lists.
+    It reads as a mapping from each reachable node to its path, with paths
+    rebuilt on access by walking predecessors back to the source. Iteration
+    follows increasing distance.
+    """
+    
+    def __init__(self, csr: CSRGraph, source: int, dist: np.ndarray, pred: np.ndarray):
+        """Wrap BFS arrays; use ``single_source_paths`` instead."""
+        self.csr = csr
+        self.source = source
+        self.dist = dist
+        self.pred = pred
+    
+    def __getitem__(self, node: Hashable) -> List[Hashable]:
+        path = self.path_to(node)
+        if path is None:
+            raise KeyError(node)
+        return path
+    
+    def __iter__(self) -> Iterator[Hashable]:
+        reached = np.flatnonzero(self.dist >= 0)
+        for i in reached[np.argsort(self.dist[reached], kind='stable')].tolist():
+            yield self.csr.nodes[i]
+    
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.dist >= 0))
+    
+    def __contains__(self, node: object) -> bool:
+        i = self.csr.index.get(node)
+        return i is not None and self.dist[i] >= 0
+    
+    def distance(self, node: Hashable) -> Optional[int]:
+        """Hop distance from the source (None when unreachable)."""
+        d = int(self.dist[self.csr.index[node]])
+        return d if d >= 0 else None
+    
+    def path_to(self, node: Hashable) -> Optional[List[Hashable]]:
+        """Shortest path from the source to node (None when unreachable)."""
+        i = self.csr.index[node]
+        if self.dist[i] < 0:
+            return None
+        path = [i]
+        while i != self.source:
+            i = int(self.pred[i])
+            path.append(i)
+        return [self.csr.nodes[j] for j in reversed(path)]
+    
+    def distance_histogram(self) -> Dict[int, int]:
+        """Number of nodes at each hop distance (the source is distance 0)."""
+        counts = np.bincount(self.dist[self.dist >= 0])
+        return {d: int(count) for d, count in enumerate(counts.tolist()) if count}
+    
+    def summary(self) -> Dict[str, Any]:
+        """JSON-ready digest: reach, eccentricity, mean distance and distance histogram."""
+        reached = self.dist[self.dist >= 0]
+        return {
+            'source': self.csr.nodes[self.source],
+            'reachable_nodes': len(reached),
+            'eccentricity': int(reached.max()),
+            'average_distance': float(reached.sum()) / (len(reached) - 1) if len(reached) > 1 else 0.0,
+            'distance_histogram': self.distance_histogram(),
+        }
+
+
+def single_source_paths(csr: CSRGraph, source: int) -> SingleSourcePaths:
+    """One level-synchronous BFS recording hop distances and a predecessor per node."""
+    n = csr.num_nodes
+    dist = np.full(n, -1, dtype=np.int32)
+    pred = np.full(n, -1, dtype=np.int32)
+    dist[source] = 0
+    frontier = np.array([source], dtype=np.int32)
+    depth = 0
+    while len(frontier):
+        src, nbr = csr.expand(frontier)
+        unseen = dist[nbr] == -1
+        # Keep the first edge reaching each new node as its tree edge
+        frontier, first = np.unique(nbr[unseen], return_index=True)
+        pred[frontier] = src[unseen][first]
+        depth += 1
+        dist[frontier] = depth
+    return SingleSourcePaths(csr, source, dist, pred)
+
+
+class PathSweep(NamedTuple):
+    """Everything one BFS per source yields, accumulated over all sources.
+    
+    ``distance_sums``, ``reachable`` and ``eccentricity`` are per source node;
+    ``dependency_sum`` is the summed Brandes dependency of every node, or None
+    when the sweep skipped the backward pass.
+    """
+    distance_sums: np.ndarray
+    reachable: np.ndarray
+    eccentricity: np.ndarray
+    dependency_sum: Optional[np.ndarray]
+
+
+def _accumulate_sources(csr: CSRGraph, sources: Sequence[int], betweenness: bool) -> PathSweep:
+    """Run the fused kernel for a batch of sources."""
+    count = len(sources)
+    distance_sums = np.zeros(count, dtype=np.int64)
+    reachable = np.zeros(count, dtype=np.int64)
+    eccentricity = np.zeros(count, dtype=np.int32)
+    dependency_sum = np.zeros(csr.num_nodes, dtype=np.float64) if betweenness else None
+    
+    for i, source in enumerate(sources):
+        dist, delta = _single_source_brandes(csr, source, with_dependencies=betweenness)
+        reached = dist[dist >= 0]
+        distance_sums[i] = reached.sum()
+        reachable[i] = len(reached)
+        eccentricity[i] = reached.max()
+        if betweenness:
+            dependency_sum += delta
+    return PathSweep(distance_sums, reachable, eccentricity, dependency_sum)
+
+
+def _init_worker(csr: CSRGraph) -> None:
+    global _WORKER_CSR
+    _WORKER_CSR = csr
+
+
+def _worker_accumulate(sources: Sequence[int], betweenness: bool) -> PathSweep:
+    return _accumulate_sources(_WORKER_CSR, sources, betweenness)
+
+
+def _merge_sweeps(n: int, parts: Iterable[PathSweep], betweenness: bool) -> PathSweep:
+    """Concatenate per-chunk sweeps in source order, adding dependencies chunk by chunk."""
+    distance_sums, reachable, eccentricity = [], [], []
+    dependency_sum = np.zeros(n, dtype=np.float64) if betweenness else None
+    for part in parts:
+        distance_sums.append(part.distance_sums)
+        reachable.append(part.reachable)
+        eccentricity.append(part.eccentricity)
+        if betweenness:
+            dependency_sum += part.dependency_sum
+    return PathSweep(np.concatenate(distance_sums), np.concatenate(reachable), np.concatenate(eccentricity),
+                     dependency_sum)
+
+
+def all_sources_sweep(csr: CSRGraph, betweenness: bool = True, workers: Optional[int] = 1,
+                      sources: Optional[np.ndarray] = None) -> PathSweep:
+    """One BFS per source feeding betweenness, closeness, ASPL and diameter together.
+    
+    Sources are independent, so with ``workers`` > 1 their chunks are spread
+    across a process pool. Chunks are the same whatever the worker count and
+    are merged in order, so results are identical to a serial sweep.
+    ``sources`` restricts the sweep to a subset (per-source arrays follow its
+    order).
+    """
+    n = csr.num_nodes
+    if sources is None:
+        sources = np.arange(n, dtype=np.int32)
+    chunks = np.array_split(sources, max(1, -(-len(sources) // _SOURCES_PER_CHUNK)))
+    workers = min(resolve_workers(workers), len(chunks))
+    if workers <= 1:
+        return _merge_sweeps(n, (_accumulate_sources(csr, chunk, betweenness) for chunk in chunks), betweenness)
+    
+    # Many small chunks keep the pool balanced when BFS costs vary
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(csr,)) as pool:
+        return _merge_sweeps(n, pool.map(_worker_accumulate, chunks, [betweenness] * len(chunks)), betweenness)
+
+
+def betweenness_from_sweep(csr: CSRGraph, sweep: PathSweep) -> Dict[Any, float]:
+    """Normalized betweenness centrality (same values as ``nx.betweenness_centrality``)."""
+    n = csr.num_nodes
+    if sweep.dependency_sum is None:
+        raise ValueError("Sweep was run without betweenness dependencies")
+    values = sweep.dependency_sum.copy()
+    if n > 2:
+        values *= 1.0 / ((n - 1) * (n - 2))
+    return csr.to_dict(values)
+
+
+def closeness_from_sweep(csr: CSRGraph, sweep: PathSweep) -> Dict[Any, float]:
+    """Closeness with Wasserman-Faust scaling (as ``nx.closeness_centrality``)."""
+    n = csr.num_nodes
+    values = np.zeros(n, dtype=np.float64)
+    if n > 1:
+        found = sweep.distance_sums > 0
+        others = (sweep.reachable[found] - 1).astype(np.float64)
+        values[found] = (others / sweep.distance_sums[found]) * (others / (n - 1))
+    return csr.to_dict(values)
+
+
+def average_shortest_path_length_from_sweep(csr: CSRGraph, sweep: PathSweep) -> float:
+    """Mean hop distance over all ordered pairs (the graph must be connected)."""
+    n = csr.num_nodes
+    return float(sweep.distance_sums.sum()) / (n * (n - 1)) if n > 1 else 0.0
+
+
+def diameter_from_sweep(sweep: PathSweep) -> int:
+    """Largest eccentricity seen by the sweep."""
+    return int(sweep.eccentricity.max()) if len(sweep.eccentricity) else 0
+
+
+def top_k_closeness(csr: CSRGraph, k: int) -> List[Tuple[Any, float]]:
+    """The ``k`` most central nodes by closeness, with pruned BFS.
+    
+    Candidates are tried in decreasing degree order. While a BFS runs, the
+    nodes not yet reached must sit at least one level further out than the
+    current frontier can reach in one hop, which bounds the final distance sum
+    from below and so the closeness from above; the BFS is cut as soon as
+    that bound falls below the current k-th best. Values and tie order match
+    ``closeness_from_sweep`` followed by a full sort.
+    """
+    n = csr.num_nodes
+    if n == 0 or k <= 0:
+        return []
+    
+    degree = csr.degree()
+    labels = csr.connected_components()
+    component_size = np.bincount(labels, minlength=n)[labels]
+    
+    # Min-heap of (value, -index): the root is the current k-th best
+    best: List[Tuple[float, int]] = []
+    for source in np.argsort(-degree, kind='stable'):
+        others = int(component_size[source]) - 1
+        scale = others / (n - 1) if n > 1 else 0.0
+        distance_sum = 0
+        seen = 0
+        pruned = False
+        for depth, frontier in enumerate(csr.bfs_levels(int(source))):
+            distance_sum += depth * len(frontier)
+            seen += len(frontier)
+            remaining = others + 1 - seen
+            if remaining == 0 or len(best) < k:
+                continue
+            # Each frontier node spends one edge on its parent (except the source)
+            next_level = min(remaining, int(degree[frontier].sum()) - (len(frontier) if depth else 0))
+            lower_sum = distance_sum + (depth + 1) * next_level + (depth + 2) * (remaining - next_level)
+            if (others / lower_sum) * scale < best[0][0]:
+                pruned = True
+                break
+        if pruned:
+            continue
+        
+        value = (others / distance_sum) * scale if distance_sum > 0 else 0.0
+        entry = (value, -int(source))
+        if len(best) < k:
+            heapq.heappush(best, entry)
+        elif entry > best[0]:
+            heapq.heapreplace(best, entry)
+    
+    ranked = sorted(best, reverse=True)
+    return [(csr.nodes[-index], value) for value, index in ranked]
+
+
+def estimate_average_shortest_path_length(csr: CSRGraph, sample_budget: int = 500, seed: Optional[int] = None,
+                                          workers: Optional[int] = 1) -> Dict[str, Any]:
+    """Estimate the average shortest path length of the largest component by sampled BFS sources.
+    
+    Each sampled source contributes its mean distance to the rest of the
+    component; the estimate is the sample mean with a finite-population
+    corrected standard error, so cost is bounded by ``sample_budget`` BFS runs
+    rather than by n^2. Components no larger than the budget are solved
+    exactly (stderr 0).
+    """
+    labels = csr.connected_components()
+    sizes = np.bincount(labels, minlength=csr.num_nodes)
+    if len(sizes) == 0 or sizes.max() < 2:
+        return {"mean": 0.0, "stderr": 0.0, "ci95": [0.0, 0.0], "samples": 0,
+                "population": int(sizes.max()) if len(sizes) else 0,
+                "scope": "graph", "exact": True}
+    
+    members = np.flatnonzero(labels == np.argmax(sizes)).astype(np.int32)
+    population = len(members)
+    exact = population <= sample_budget
+    if exact:
+        sources = members
+    else:
+        rng = np.random.default_rng(seed)
+        sources = np.sort(rng.choice(members, size=sample_budget, replace=False))
+    
+    sweep = all_sources_sweep(csr, betweenness=False, workers=workers, sources=sources)
+    per_source = sweep.distance_sums / (population - 1)
+    mean = float(per_source.mean())
+    samples = len(sources)
+    if exact or samples < 2:
+        stderr = 0.0
+    else:
+        stderr = float(per_source.std(ddof=1) / np.sqrt(samples) * np.sqrt(1 - samples / population))
+    
+    return {
+        "mean": mean,
+        "stderr": stderr,
+        "ci95": [mean - 1.96 * stderr, mean + 1.96 * stderr],
+        "samples": samples,
+        "population": population,
+        "scope": "graph" if population == csr.num_nodes else "largest_component",
+        "exact": exact,
+    }
+
+
+def betweenness_centrality(csr: CSRGraph, workers: Optional[int] = 1) -> Dict[Any, float]:
+    """Exact normalized betweenness centrality."""
+    return betweenness_from_sweep(csr, all_sources_sweep(csr, betweenness=True, workers=workers))
+
+
+def closeness_centrality(csr: CSRGraph, workers: Optional[int] = 1) -> Dict[Any, float]:
+    """Closeness centrality without the Brandes backward pass."""
+    return closeness_from_sweep(csr, all_sources_sweep(csr, betweenness=False, workers=workers))
+
+
+def _farthest(dist: np.ndarray, degree: np.ndarray) -> int:
+    """Farthest reached node, preferring high degree among ties."""
+    far = dist == dist.max()
+    candidates = np.flatnonzero(far)
+    return int(candidates[np.argmax(degree[candidates])])
+
+
+def diameter_and_radius(csr: CSRGraph, source: Optional[int] = None) -> Tuple[int, int, int]:
+    """Exact diameter and radius of the component containing ``source``.
+    
+    Bound-based eccentricity pruning (Takes & Kosters): every BFS from v with
+    eccentricity e tightens, for each node w at distance d, the bounds
+    ``max(e - d, d) <= ecc(w) <= e + d``. A double sweep seeds a tight diameter
+    lower bound, after which BFS sources alternate between the node with the
+    largest upper bound and the one with the smallest lower bound, and nodes
+    whose bounds can no longer change either answer are dropped. On real-world
+    graphs this settles after a handful of BFS runs instead of one per node.
+    
+    Returns (diameter, radius, number of BFS runs).
+    """
+    degree = np.diff(csr.indptr)
+    if source is None:
+        source = int(np.argmax(degree)) if csr.num_nodes else 0
+    if csr.num_nodes == 0:
+        return 0, 0, 0
+    
+    first = csr.bfs(source)
+    component = np.flatnonzero(first >= 0)
+    if len(component) == 1:
+        return 0, 0, 1
+    
+    ecc_lower = np.zeros(csr.num_nodes, dtype=np.int64)
+    ecc_upper = np.full(csr.num_nodes, np.iinfo(np.int64).max, dtype=np.int64)
+    candidate = np.zeros(csr.num_nodes, dtype=bool)
+    candidate[component] = True
+    
+    def tighten(v: int, dist: np.ndarray) -> None:
+        d = dist[component].astype(np.int64)
+        ecc = int(d.max())
+        ecc_lower[component] = np.maximum(ecc_lower[component], np.maximum(ecc - d, d))
+        ecc_upper[component] = np.minimum(ecc_upper[component], ecc + d)
+        ecc_lower[v] = ecc_upper[v] = ecc
+    
+    tighten(source, first)
+    # Double sweep: the farthest node from the start is a good diameter endpoint candidate
+    far = _farthest(np.where(first >= 0, first, -1), degree)
+    tighten(far, csr.bfs(far))
+    runs = 2
+    
+    pick_upper = True
+    while True:
+        diameter_lower = int(ecc_lower[component].max())
+        diameter_upper = int(ecc_upper[component].max())
+        radius_lower = int(ecc_lower[component].min())
+        radius_upper = int(ecc_upper[component].min())
+        if diameter_lower == diameter_upper and radius_lower == radius_upper:
+            return diameter_lower, radius_upper, runs
+        
+        # Nodes that can no longer move either bound are pruned from selection
+        settled = ecc_lower == ecc_upper
+        irrelevant = (ecc_upper <= diameter_lower) & (ecc_lower >= radius_upper)
+        candidate &= ~(settled | irrelevant)
+        pool = np.flatnonzero(candidate)
+        if len(pool) == 0:
+            return diameter_lower, radius_upper, runs
+        
+        if pick_upper:
+            best = pool[ecc_upper[pool] == ecc_upper[pool].max()]
+        else:
+            best = pool[ecc_lower[pool] == ecc_lower[pool].min()]
+        v = int(best[np.argmax(degree[best])])
+        tighten(v, csr.bfs(v))
+        candidate[v] = False
+        runs += 1
+        pick_upper = not pick_upper
@@ -24,9 +24,9 @@ class GraphAgentState(TypedDict):
 class SocialGraphAgent:
     """LangGraph agent for social network analysis using NetworkX and Ollama."""
     
-    def __init__(self, model_name: str = "gemma3n:latest"):
+    def __init__(self, model_name: str = "gemma3n:latest", workers: Optional[int] = 1):
         """Initialize the social graph analysis agent."""
-        self.analyzer = SocialGraphAnalyzer()
+        self.analyzer = SocialGraphAnalyzer(workers=workers)
         self.llm_client = OllamaClient(model_name)
         self.graph = self._build_graph()
     
@@ -150,17 +150,20 @@ class SocialGraphAgent:
     def _calculate_basic_metrics(self, state: GraphAgentState) -> GraphAgentState:
         """Calculate comprehensive network metrics."""
         try:
-            metrics = self.analyzer.calculate_comprehensive_metrics()
+            # Only structural statistics are reported here; centralities and
+            # all-pairs path metrics are left to the routes that need them
+            metrics = self.analyzer.calculate_comprehensive_metrics(fields=["basic_stats", "connectivity"])
+            summary = metrics.to_summary_dict()
             
             result = GraphAnalysisResult(
                 operation="basic_metrics",
-                result=metrics.to_summary_dict(),
-                metrics=metrics.to_summary_dict()["basic_stats"],
+                result=summary,
+                metrics=summary["basic_stats"],
                 description="Comprehensive network metrics analysis"
             )
             
             state["analysis_results"].append(result)
-            state["current_metrics"].update(metrics.to_summary_dict()["basic_stats"])
+            state["current_metrics"].update(summary["basic_stats"])
             
         except Exception as e:
             state["error_message"] = f"Error calculating basic metrics: {str(e)}"
@@ -174,10 +177,16 @@ class SocialGraphAgent:
             top_k = analysis_request.parameters.get("top_k", 5) if analysis_request else 5
             influential_nodes = self.analyzer.find_influential_nodes(top_k=top_k)
             
+            description = f"Top {top_k} influential nodes by different centrality measures"
+            approximation = self.analyzer.top_k_betweenness(top_k)[1]
+            if approximation:
+                description += (f" (betweenness estimated within ±{approximation['epsilon']:.3f} "
+                                f"with {approximation['confidence']:.0%} confidence)")
+            
             result = GraphAnalysisResult(
                 operation="centrality",
                 result=influential_nodes,
-                description=f"Top {top_k} influential nodes by different centrality measures"
+                description=description
             )
             
             state["analysis_results"].append(result)
@@ -191,18 +200,27 @@ class SocialGraphAgent:
         """Detect communities in the social network."""
         try:
             analysis_request = state.get("analysis_request")
-            method = analysis_request.parameters.get("method", "greedy_modularity") if analysis_request else "greedy_modularity"
-            communities = self.analyzer.detect_communities(method=method)
+            parameters = analysis_request.parameters if analysis_request else {}
+            method = parameters.get("method", "louvain")
+            resolution = parameters.get("resolution", 1.0)
+            seed = parameters.get("seed", 0)
+            partition = self.analyzer.community_partition(method=method, resolution=resolution, seed=seed)
+            bridges = self.analyzer.inter_community_index(method=method, resolution=resolution, seed=seed)
             
             # Convert sets to lists for serialization
-            communities_data = [list(community) for community in communities]
+            communities_data = [list(community) for community in partition["communities"]]
             
             result = GraphAnalysisResult(
                 operation="community_detection",
                 result={
                     "communities": communities_data,
-                    "num_communities": len(communities),
-                    "community_sizes": [len(c) for c in communities]
+                    "num_communities": partition["num_communities"],
+                    "community_sizes": partition["community_sizes"],
+                    "modularity": partition["modularity"],
+                    "coverage": partition["coverage"],
+                    "resolution": resolution,
+                    "quality": partition["quality"],
+                    "bridges": bridges.summary()
                 },
                 description=f"Community detection using {method} method"
             )
@@ -227,6 +245,9 @@ class SocialGraphAgent:
                 source = list(self.analyzer.graph.nodes())[0]
             
             path_results = self.analyzer.find_shortest_paths(source, target)
+            if not target:
+                # Report the reach summary, not one path per node
+                path_results = {key: value for key, value in path_results.items() if key != 'paths'}
             
             result = GraphAnalysisResult(
                 operation="path_analysis",
@@ -245,13 +266,29 @@ class SocialGraphAgent:
         """Analyze network robustness."""
         try:
             analysis_request = state.get("analysis_request")
-            num_removals = analysis_request.parameters.get("num_removals", 5) if analysis_request else 5
-            robustness_results = self.analyzer.analyze_graph_robustness(num_removals=num_removals)
+            parameters = analysis_request.parameters if analysis_request else {}
+            num_removals = parameters.get("num_removals", 5)
+            # "targeted" (attack curves), "random_failure" (percolation) or "both"
+            mode = parameters.get("mode", "targeted")
+            
+            robustness_results = {}
+            descriptions = []
+            if mode in ("targeted", "both"):
+                robustness_results = self.analyzer.analyze_graph_robustness(num_removals=num_removals)
+                descriptions.append(f"targeted attacks with {num_removals} node removals")
+            if mode in ("random_failure", "both"):
+                percolation = parameters.get("percolation", "node")
+                runs = parameters.get("runs", 100)
+                robustness_results["random_failure"] = self.analyzer.analyze_random_failure(
+                    percolation=percolation, runs=runs, seed=parameters.get("seed"))
+                descriptions.append(f"random {percolation} failures averaged over {runs} percolation runs")
+            if not descriptions:
+                raise ValueError(f"Unknown robustness mode: {mode}")
             
             result = GraphAnalysisResult(
                 operation="robustness",
                 result=robustness_results,
-                description=f"Network robustness analysis with {num_removals} node removals"
+                description="Network robustness analysis: " + "; ".join(descriptions)
             )
             
             state["analysis_results"].append(result)
@@ -267,18 +304,24 @@ class SocialGraphAgent:
             analysis_request = state.get("analysis_request")
             params = analysis_request.parameters if analysis_request else {}
             node_id = params.get("node_id")
+            node_ids = params.get("node_ids")
             radius = params.get("radius", 1)
             
-            if not node_id:
-                # Use a random node if none specified
-                node_id = list(self.analyzer.graph.nodes())[0]
-            
-            neighborhood_results = self.analyzer.analyze_node_neighborhood(str(node_id), radius)
+            if node_ids:
+                # Many nodes are profiled in one batched pass
+                neighborhood_results = self.analyzer.analyze_neighborhoods([str(node) for node in node_ids], radius)
+                description = f"Neighborhood analysis for {len(node_ids)} nodes with radius {radius}"
+            else:
+                if not node_id:
+                    # Use a random node if none specified
+                    node_id = list(self.analyzer.graph.nodes())[0]
+                neighborhood_results = self.analyzer.analyze_node_neighborhood(str(node_id), radius)
+                description = f"Neighborhood analysis for node {node_id} with radius {radius}"
             
             result = GraphAnalysisResult(
                 operation="neighborhood",
                 result=neighborhood_results,
-                description=f"Neighborhood analysis for node {node_id} with radius {radius}"
+                description=description
             )
             
             state["analysis_results"].append(result)
@@ -0,0 +1,77 @@
+"""Accuracy and cost of the sampled betweenness estimators."""
+import math
+
+import networkx as nx
+import pytest
+
+from csr_graph import CSRGraph
+from centrality import (approximate_betweenness_centrality, betweenness_sample_size, top_k_betweenness_centrality,
+                        vertex_diameter_bound)
+
+
+def test_sample_size_follows_vc_bound():
+    # VD 10 gives VC dimension floor(log2 8) + 1 = 4
+    assert betweenness_sample_size(0.1, 0.1, 10) == math.ceil(50 * (4 + math.log(10)))
+    assert betweenness_sample_size(0.05, 0.1, 10) > betweenness_sample_size(0.1, 0.1, 10)
+    assert betweenness_sample_size(0.1, 0.1, 2) == math.ceil(50 * (1 + math.log(10)))
+    for epsilon, delta in ((0.0, 0.1), (1.0, 0.1), (0.1, 0.0), (0.1, 1.5)):
+        with pytest.raises(ValueError):
+            betweenness_sample_size(epsilon, delta, 10)
+
+
+def test_vertex_diameter_bound_covers_longest_path():
+    G = nx.path_graph(10)
+    G.add_edge(20, 21)
+    assert vertex_diameter_bound(G) == 10
+    assert vertex_diameter_bound(CSRGraph.from_networkx(G)) == 10
+
+
+def test_approximate_betweenness_is_seeded():
+    G = nx.barabasi_albert_graph(200, 2, seed=4)
+    first = approximate_betweenness_centrality(G, epsilon=0.1, seed=7)
+    assert approximate_betweenness_centrality(G, epsilon=0.1, seed=7) == first
+    assert approximate_betweenness_centrality(G, epsilon=0.1, seed=8)[0] != first[0]
+
+
+@pytest.mark.parametrize("as_csr", [False, True])
+def test_approximate_betweenness_within_epsilon(as_csr):
+    G = nx.barabasi_albert_graph(300, 3, seed=5)
+    exact = nx.betweenness_centrality(G)
+    epsilon = 0.05
+    estimate, approximation = approximate_betweenness_centrality(
+        CSRGraph.from_networkx(G) if as_csr else G, epsilon=epsilon, delta=0.1, seed=3)
+    assert set(estimate) == set(G)
+    assert approximation["samples"] == betweenness_sample_size(epsilon, 0.1, approximation["vertex_diameter_bound"])
+    assert max(abs(estimate[node] - exact[node]) for node in G) <= approximation["epsilon"]
+
+
+def _hubs_graph() -> nx.Graph:
+    """Four hubs on a path, each with its own fan of leaves."""
+    G = nx.path_graph(4)
+    for hub in range(4):
+        G.add_edges_from((hub, (hub, leaf)) for leaf in range(40))
+    return G
+
+
+def test_top_k_stops_early_on_clear_leaders():
+    G = nx.barabasi_albert_graph(300, 2, seed=1)
+    exact = nx.betweenness_centrality(G)
+    leaders, approximation = top_k_betweenness_centrality(G, 3, seed=1)
+    assert approximation["samples"] <= approximation["max_samples"] // 4
+    assert approximation["separated"] or approximation["stable"]
+    assert {node for node, _ in leaders} == set(sorted(exact, key=exact.get, reverse=True)[:3])
+    for node, value in leaders:
+        assert abs(value - exact[node]) <= 0.05
+
+
+def test_top_k_separates_hubs_in_one_round():
+    leaders, approximation = top_k_betweenness_centrality(_hubs_graph(), 4, seed=1)
+    assert approximation["separated"]
+    assert approximation["samples"] == 256
+    assert {node for node, _ in leaders} == {0, 1, 2, 3}
+
+
+def test_top_k_accepts_csr_graph():
+    G = _hubs_graph()
+    leaders, _ = top_k_betweenness_centrality(CSRGraph.from_networkx(G), 4, seed=1)
+    assert {node for node, _ in leaders} == {0, 1, 2, 3}
@@ -0,0 +1,145 @@
+"""Louvain, Leiden and label propagation: valid partitions whose modularity matches NetworkX."""
+import networkx as nx
+import numpy as np
+import pytest
+
+import community_detection
+from csr_graph import CSRGraph
+from graph_tools import SocialGraphAnalyzer
+
+
+def _disconnected() -> nx.Graph:
+    G = nx.disjoint_union(nx.karate_club_graph(), nx.caveman_graph(3, 5))
+    G.add_nodes_from([100, 101])
+    G.add_edge(5, 5)
+    return G
+
+
+GRAPHS = {
+    'karate': nx.karate_club_graph,
+    'string_ids': nx.les_miserables_graph,
+    'disconnected': _disconnected,
+    'planted': lambda: nx.planted_partition_graph(4, 20, 0.5, 0.02, seed=5),
+}
+
+METHODS = {
+    'louvain': lambda csr, resolution, seed: community_detection.louvain(csr, resolution=resolution, seed=seed),
+    'leiden': lambda csr, resolution, seed: community_detection.leiden(csr, resolution=resolution, seed=seed),
+    'label_propagation': lambda csr, resolution, seed: community_detection.label_propagation(csr, seed=seed),
+}
+
+
+def _communities(csr: CSRGraph, labels: np.ndarray):
+    communities = [set() for _ in range(int(labels.max()) + 1)] if len(labels) else []
+    for node, label in zip(csr.nodes, labels.tolist()):
+        communities[label].add(node)
+    return communities
+
+
+@pytest.mark.parametrize('name', list(GRAPHS))
+@pytest.mark.parametrize('method', list(METHODS))
+@pytest.mark.parametrize('resolution', [1.0, 0.5, 2.0])
+def test_partition_and_modularity(name, method, resolution):
+    G = GRAPHS[name]()
+    csr = CSRGraph.from_networkx(G)
+    result = METHODS[method](csr, resolution, 42)
+    communities = _communities(csr, result.labels)
+    
+    assert len(result.labels) == G.number_of_nodes()
+    assert all(communities) and nx.community.is_partition(G, communities)
+    # Canonical labels: largest community first
+    sizes = [len(community) for community in communities]
+    assert sizes == sorted(sizes, reverse=True)
+    
+    reported = 1.0 if method == 'label_propagation' else resolution
+    assert result.resolution == reported
+    assert result.modularity == pytest.approx(
+        nx.community.modularity(G, communities, weight=None, resolution=reported), abs=1e-9)
+
+
+@pytest.mark.parametrize('method', list(METHODS))
+def test_fixed_seed_is_reproducible(method):
+    csr = CSRGraph.from_networkx(nx.les_miserables_graph())
+    first, second = METHODS[method](csr, 1.0, 7), METHODS[method](csr, 1.0, 7)
+    assert np.array_equal(first.labels, second.labels)
+    assert first.modularity == second.modularity
+
+
+@pytest.mark.parametrize('method', ['louvain', 'leiden'])
+def test_finds_planted_communities(method):
+    G = nx.planted_partition_graph(4, 20, 0.5, 0.02, seed=5)
+    csr = CSRGraph.from_networkx(G)
+    result = METHODS[method](csr, 1.0, 0)
+    assert sorted(map(sorted, _communities(csr, result.labels))) == sorted(map(sorted, G.graph['partition']))
+
+
+def test_leiden_communities_are_connected():
+    G = nx.les_miserables_graph()
+    csr = CSRGraph.from_networkx(G)
+    for seed in range(5):
+        for community in _communities(csr, community_detection.leiden(csr, seed=seed).labels):
+            assert nx.is_connected(G.subgraph(community))
+
+
+def test_higher_resolution_gives_more_communities():
+    csr = CSRGraph.from_networkx(nx.les_miserables_graph())
+    counts = [community_detection.louvain(csr, resolution=r, seed=0).labels.max() + 1 for r in (0.25, 1.0, 4.0)]
+    assert counts[0] < counts[1] < counts[2]
+
+
+@pytest.mark.parametrize('method', list(METHODS))
+def test_graphs_without_edges(method):
+    G = nx.empty_graph(4)
+    result = METHODS[method](CSRGraph.from_networkx(G), 1.0, 0)
+    assert sorted(result.labels.tolist()) == [0, 1, 2, 3]
+    assert result.modularity == 0.0
+    assert len(METHODS[method](CSRGraph.from_networkx(nx.Graph()), 1.0, 0).labels) == 0
+
+
+def test_partition_modularity_ignores_edge_weights():
+    G = nx.les_miserables_graph()
+    assert nx.is_weighted(G)
+    partition = SocialGraphAnalyzer(G, workers=1).community_partition('louvain', resolution=1.5, seed=3)
+    communities = partition['communities']
+    assert partition['modularity'] == pytest.approx(
+        nx.community.modularity(G, communities, weight=None, resolution=1.5), abs=1e-9)
+    assert partition['modularity'] != pytest.approx(
+        nx.community.modularity(G, communities, weight='weight', resolution=1.5))
+
+
+def _cliques(G: nx.Graph):
+    return sorted(sorted(c) for c in nx.find_cliques(G) if len(c) > 2)
+
+
+@pytest.mark.parametrize('block_entries', [1 << 22, 20])
+def test_label_propagation_finds_cliques(block_entries):
+    G = nx.ring_of_cliques(6, 8)
+    csr = CSRGraph.from_networkx(G)
+    result = community_detection.label_propagation(csr, seed=1, block_entries=block_entries)
+    assert sorted(map(sorted, _communities(csr, result.labels))) == _cliques(G)
+    assert 1 <= result.levels <= 20
+
+
+def test_propagate_labels_over_edge_list_chunks():
+    G = nx.ring_of_cliques(5, 6)
+    csr = CSRGraph.from_networkx(G)
+    src, dst = csr.edge_array()
+    rows, neighbors = np.concatenate([src, dst]), np.concatenate([dst, src])
+    order = np.argsort(rows, kind='stable')
+    rows, neighbors = rows[order], neighbors[order]
+    # Chunks of about 25 entries, cut only between rows
+    cuts = np.unique(np.searchsorted(rows, rows[::25]))
+    bounds = list(zip(cuts.tolist(), cuts[1:].tolist() + [len(rows)]))
+    
+    labels, iterations = community_detection.propagate_labels(
+        csr.num_nodes, lambda: ((rows[a:b], neighbors[a:b]) for a, b in bounds), seed=2)
+    communities = _communities(csr, community_detection._canonical(labels))
+    assert sorted(map(sorted, communities)) == _cliques(G)
+    assert iterations >= 1
+
+
+def test_analyzer_label_propagation_partition():
+    G = nx.les_miserables_graph()
+    communities = SocialGraphAnalyzer(G, workers=1).detect_communities('label_propagation', seed=4)
+    assert nx.community.is_partition(G, communities)
+    assert [len(c) for c in communities] == sorted((len(c) for c in communities), reverse=True)
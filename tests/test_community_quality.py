@@ -0,0 +1,94 @@
+"""Vectorized community quality and the inter-community edge index against brute force."""
+from collections import Counter
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from community_quality import InterCommunityIndex, community_quality, modularity, summarize_quality
+from csr_graph import CSRGraph
+
+
+def _quality_graph() -> nx.Graph:
+    G = nx.les_miserables_graph()
+    G.add_edges_from([('Valjean', 'Valjean'), ('Myriel', 'Myriel')])
+    G.add_node('alone')
+    return G
+
+
+def _random_labels(csr: CSRGraph, k: int, seed: int) -> np.ndarray:
+    labels = np.random.default_rng(seed).integers(k, size=csr.num_nodes)
+    labels[:k] = np.arange(k)
+    return labels
+
+
+def _communities(csr: CSRGraph, labels: np.ndarray):
+    communities = [set() for _ in range(int(labels.max()) + 1)]
+    for node, label in zip(csr.nodes, labels.tolist()):
+        communities[label].add(node)
+    return communities
+
+
+@pytest.mark.parametrize('k', [1, 4, 12])
+@pytest.mark.parametrize('resolution', [1.0, 0.5, 2.0])
+def test_quality_matches_networkx(k, resolution):
+    G = _quality_graph()
+    csr = CSRGraph.from_networkx(G)
+    labels = _random_labels(csr, k, seed=k)
+    communities = _communities(csr, labels)
+    quality = community_quality(csr, labels, resolution)
+    
+    assert quality.modularity == pytest.approx(
+        nx.community.modularity(G, communities, weight=None, resolution=resolution), abs=1e-12)
+    assert modularity(csr, labels, resolution) == quality.modularity
+    assert quality.coverage == pytest.approx(nx.community.partition_quality(G, communities)[0])
+    for label, community in enumerate(communities):
+        inside = G.subgraph(community)
+        assert quality.sizes[label] == len(community)
+        assert quality.internal_edges[label] == inside.number_of_edges()
+        assert quality.cut_edges[label] == nx.cut_size(G, community)
+        assert quality.volume[label] == nx.volume(G, community)
+        assert quality.internal_density[label] == pytest.approx(nx.density(inside) if len(community) > 1 else 0.0)
+        if k > 1:
+            assert quality.conductance[label] == pytest.approx(nx.conductance(G, community))
+    
+    summary = summarize_quality(quality, top=3)
+    assert [c['size'] for c in summary['communities']] == sorted(quality.sizes.tolist(), reverse=True)[:3]
+
+
+def test_quality_without_edges():
+    csr = CSRGraph.from_networkx(nx.empty_graph(3))
+    quality = community_quality(csr, np.array([0, 1, 1]))
+    assert quality.modularity == 0.0 and quality.coverage == 0.0
+    assert quality.sizes.tolist() == [1, 2]
+    assert quality.conductance.tolist() == [0.0, 0.0]
+
+
+def test_inter_community_index_matches_brute_force():
+    G = _quality_graph()
+    csr = CSRGraph.from_networkx(G)
+    labels = _random_labels(csr, 5, seed=9)
+    label_of = dict(zip(csr.nodes, labels.tolist()))
+    index = InterCommunityIndex(csr, labels)
+    
+    crossing = [(u, v) for u, v in G.edges() if label_of[u] != label_of[v]]
+    pairs = Counter(tuple(sorted((label_of[u], label_of[v]))) for u, v in crossing)
+    assert index.num_edges == len(crossing)
+    assert len(index.pair_keys) == len(pairs)
+    for a in range(5):
+        assert index.linked_communities(a) == {
+            high if low == a else low: count for (low, high), count in pairs.items() if a in (low, high)}
+        for b in range(5):
+            expected = {(u, v) if label_of[u] == a else (v, u) for u, v in crossing
+                        if {label_of[u], label_of[v]} == {a, b}}
+            assert index.edge_count(a, b) == len(expected) == pairs.get(tuple(sorted((a, b))), 0)
+            assert set(index.edges_between(a, b)) == expected
+            bridges = index.bridge_nodes(a, b)
+            if a != b:
+                assert set(bridges[a]) == {u for u, _ in expected}
+                assert set(bridges[b]) == {v for _, v in expected}
+    
+    assert [count for *_, count in index.strongest_links(3)] == sorted(pairs.values(), reverse=True)[:3]
+    degree_out = Counter(node for edge in crossing for node in edge)
+    assert [count for _, count in index.top_bridges(4)] == sorted(degree_out.values(), reverse=True)[:4]
+    assert index.summary()['inter_community_edges'] == len(crossing)
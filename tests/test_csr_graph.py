@@ -0,0 +1,151 @@
+"""Parity of the CSRGraph kernels with the NetworkX functions they replace."""
+import networkx as nx
+import numpy as np
+import pytest
+
+from csr_graph import CSRGraph
+from graph_tools import SocialGraphAnalyzer
+
+
+def _with_self_loops() -> nx.Graph:
+    G = nx.karate_club_graph()
+    G.add_edges_from([(0, 0), (5, 5), (33, 33)])
+    return G
+
+
+def _with_isolates() -> nx.Graph:
+    G = nx.gnp_random_graph(60, 0.08, seed=7)
+    G.add_nodes_from(range(60, 66))
+    return G
+
+
+def _string_ids() -> nx.Graph:
+    G = nx.les_miserables_graph()
+    return nx.relabel_nodes(G, {node: f"n:{node}" for node in G})
+
+
+def _single_node() -> nx.Graph:
+    G = nx.Graph()
+    G.add_node("only")
+    return G
+
+
+GRAPHS = {
+    'empty': nx.Graph,
+    'single_node': _single_node,
+    'karate': nx.karate_club_graph,
+    'self_loops': _with_self_loops,
+    'isolated_nodes': _with_isolates,
+    'string_ids': _string_ids,
+    'components': lambda: nx.disjoint_union_all([nx.cycle_graph(5), nx.complete_graph(4), nx.path_graph(3)]),
+}
+
+
+@pytest.fixture(params=list(GRAPHS))
+def graphs(request):
+    G = GRAPHS[request.param]()
+    return G, CSRGraph.from_networkx(G)
+
+
+def _without_self_loops(G: nx.Graph) -> nx.Graph:
+    H = G.copy()
+    H.remove_edges_from(list(nx.selfloop_edges(H)))
+    return H
+
+
+def test_nodes_and_edges(graphs):
+    G, csr = graphs
+    assert csr.nodes == list(G.nodes())
+    assert csr.num_nodes == G.number_of_nodes()
+    assert csr.num_edges == G.number_of_edges()
+    assert {csr.nodes[i] for i in range(csr.num_nodes)} == set(G)
+
+
+def test_degree(graphs):
+    G, csr = graphs
+    assert csr.to_dict(csr.degree()) == dict(G.degree())
+
+
+def test_from_edge_array_deduplicates():
+    G = nx.karate_club_graph()
+    src, dst = np.array(list(G.edges())).T
+    # Every edge in both directions plus a repeat: the same CSR as listing each once
+    doubled = CSRGraph.from_edge_array(list(G), np.concatenate([src, dst, src]), np.concatenate([dst, src, dst]))
+    reference = CSRGraph.from_networkx(G)
+    assert np.array_equal(doubled.indptr, reference.indptr)
+    assert np.array_equal(doubled.indices, reference.indices)
+
+
+def test_bfs(graphs):
+    G, csr = graphs
+    for source in list(G)[:5]:
+        dist = csr.bfs(csr.index[source])
+        expected = nx.single_source_shortest_path_length(G, source)
+        assert {node: d for node, d in csr.to_dict(dist).items() if d >= 0} == expected
+        levels = [set(csr.nodes[i] for i in frontier) for frontier in csr.bfs_levels(csr.index[source])]
+        assert levels == [set(level) for level in nx.bfs_layers(G, source)]
+
+
+def test_connected_components(graphs):
+    G, csr = graphs
+    labels = csr.connected_components()
+    found = {}
+    for node, label in csr.to_dict(labels).items():
+        found.setdefault(label, set()).add(node)
+    expected = list(nx.connected_components(G))
+    assert sorted(map(sorted, found.values()), key=str) == sorted(map(sorted, expected), key=str)
+    # Labels are the smallest node index of each component
+    assert all(label == min(csr.index[node] for node in members) for label, members in found.items())
+    assert sorted(csr.component_sizes().tolist()) == sorted(len(c) for c in expected)
+
+
+def test_core_numbers(graphs):
+    G, csr = graphs
+    # nx.core_number rejects self loops; the CSR kernel ignores them
+    assert csr.to_dict(csr.core_numbers()) == nx.core_number(_without_self_loops(G))
+
+
+def test_triangles_clustering_transitivity(graphs):
+    G, csr = graphs
+    stats = csr.triangle_stats()
+    assert csr.to_dict(stats.triangles) == nx.triangles(G)
+    clustering = csr.to_dict(csr.clustering(stats.triangles))
+    assert clustering == pytest.approx(nx.clustering(G))
+    assert stats.transitivity == pytest.approx(nx.transitivity(G))
+    if G.number_of_nodes():
+        assert stats.average_clustering == pytest.approx(nx.average_clustering(G))
+
+
+def test_triangles_in_small_chunks():
+    G = nx.gnp_random_graph(80, 0.2, seed=3)
+    csr = CSRGraph.from_networkx(G)
+    assert csr.to_dict(csr.triangles(pair_chunk=7)) == nx.triangles(G)
+
+
+def test_triangles_ignore_self_loops():
+    G = nx.complete_graph(6)
+    nx.add_path(G, [5, 6, 7, 5])
+    G.add_edges_from((node, node) for node in G)
+    csr = CSRGraph.from_networkx(G)
+    assert csr.to_dict(csr.triangles(pair_chunk=3)) == nx.triangles(G)
+    assert csr.to_dict(csr.clustering()) == pytest.approx(nx.clustering(G))
+    assert csr.transitivity() == pytest.approx(nx.transitivity(G))
+    
+    metrics = SocialGraphAnalyzer(G).calculate_comprehensive_metrics(fields=['clustering'])
+    assert metrics.clustering_coefficient == pytest.approx(nx.transitivity(G))
+    assert metrics.average_clustering == pytest.approx(nx.average_clustering(G))
+
+
+@pytest.mark.parametrize('name', ['single_node', 'karate', 'self_loops', 'string_ids'])
+def test_eigenvector_centrality(name):
+    G = GRAPHS[name]()
+    csr = CSRGraph.from_networkx(G)
+    values = csr.to_dict(csr.eigenvector_centrality(max_iter=1000))
+    assert values == pytest.approx(nx.eigenvector_centrality(G, max_iter=1000), abs=1e-4)
+
+
+def test_eigenvector_centrality_errors():
+    with pytest.raises(nx.NetworkXPointlessConcept):
+        CSRGraph.from_networkx(nx.Graph()).eigenvector_centrality()
+    with pytest.raises(nx.PowerIterationFailedConvergence):
+        CSRGraph.from_networkx(nx.karate_club_graph()).eigenvector_centrality(max_iter=2)
@@ -0,0 +1,104 @@
+"""DistanceOracle answers against NetworkX shortest paths."""
+import itertools
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from csr_graph import CSRGraph
+from distance_oracle import DistanceOracle
+from graph_tools import SocialGraphAnalyzer
+
+
+def _disconnected() -> nx.Graph:
+    G = nx.disjoint_union(nx.les_miserables_graph(), nx.cycle_graph(9))
+    G.add_nodes_from(['isolated', 'also isolated'])
+    return G
+
+
+GRAPHS = {
+    'karate': nx.karate_club_graph,
+    'grid': lambda: nx.grid_2d_graph(7, 9),
+    'long_path': lambda: nx.path_graph(40),
+    'disconnected': _disconnected,
+    'random': lambda: nx.gnp_random_graph(70, 0.05, seed=11),
+}
+
+
+def _assert_exact(G: nx.Graph, oracle: DistanceOracle) -> None:
+    lengths = dict(nx.all_pairs_shortest_path_length(G))
+    for source, target in itertools.product(G, repeat=2):
+        expected = lengths[source].get(target)
+        assert oracle.distance(source, target) == expected
+        path = oracle.shortest_path(source, target)
+        if expected is None:
+            assert path is None
+            continue
+        assert path[0] == source and path[-1] == target
+        assert len(path) == expected + 1
+        assert all(G.has_edge(u, v) for u, v in zip(path, path[1:]))
+
+
+@pytest.mark.parametrize('name', list(GRAPHS))
+@pytest.mark.parametrize('strategy', ['degree', 'farthest', 'mixed'])
+def test_exact_distances_and_valid_paths(name, strategy):
+    G = GRAPHS[name]()
+    _assert_exact(G, DistanceOracle.build(CSRGraph.from_networkx(G), num_landmarks=4, strategy=strategy))
+
+
+@pytest.mark.parametrize('num_landmarks', [0, 1, 64])
+def test_landmark_budget(num_landmarks):
+    G = _disconnected()
+    oracle = DistanceOracle.build(CSRGraph.from_networkx(G), num_landmarks=num_landmarks)
+    assert len(oracle.landmarks) <= num_landmarks
+    _assert_exact(G, oracle)
+
+
+def test_unreachable_pairs_need_no_search():
+    G = _disconnected()
+    oracle = DistanceOracle.build(CSRGraph.from_networkx(G), num_landmarks=4)
+    index = oracle.csr.index
+    answer = oracle.query(index['isolated'], index[0])
+    assert answer == (None, None, 0)
+    assert oracle.distance('isolated', 'also isolated') is None
+    assert oracle.shortest_path('isolated', 'isolated') == ['isolated']
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        DistanceOracle.build(CSRGraph.from_networkx(nx.path_graph(3)), strategy='random')
+
+
+def test_save_load_round_trip(tmp_path):
+    G = _disconnected()
+    csr = CSRGraph.from_networkx(G)
+    oracle = DistanceOracle.build(csr, num_landmarks=6)
+    path = str(tmp_path / 'oracle.npz')
+    oracle.save(path)
+    
+    loaded = DistanceOracle.load(path, CSRGraph.from_networkx(G))
+    assert np.array_equal(loaded.landmarks, oracle.landmarks)
+    assert np.array_equal(loaded.distances, oracle.distances)
+    assert np.array_equal(loaded.components, oracle.components)
+    assert loaded.summary() == oracle.summary()
+    _assert_exact(G, loaded)
+    
+    other = G.copy()
+    other.add_edge(0, 'isolated')
+    with pytest.raises(ValueError):
+        DistanceOracle.load(path, CSRGraph.from_networkx(other))
+    relabeled = nx.relabel_nodes(G, {0: 'renamed'})
+    with pytest.raises(ValueError):
+        DistanceOracle.load(path, CSRGraph.from_networkx(relabeled))
+
+
+def test_analyzer_reuses_saved_oracle(tmp_path):
+    G = nx.karate_club_graph()
+    path = str(tmp_path / 'karate.npz')
+    SocialGraphAnalyzer(G.copy(), workers=1).save_distance_oracle(path)
+    
+    analyzer = SocialGraphAnalyzer(G, workers=1)
+    assert analyzer.distance_oracle(build=False) is None
+    loaded = analyzer.load_distance_oracle(path)
+    assert analyzer.distance_oracle() is loaded
+    _assert_exact(G, loaded)
@@ -0,0 +1,179 @@
+"""Edge-list loading gives the same nodes and edges however the file is split into chunks or ranges."""
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+
+import edge_loader
+from edge_loader import EdgeStream, read_edge_list
+
+
+# Integer-only lines first, so the first chunks look numeric; padded IDs come later
+MIXED_LINES = [
+    "# comment line",
+    "1 2", "2 3", "7 10", "3 7", "10 1", "4 5", "5 6", "6 4",
+    "007 7", "07 007", "7 2", "abc 7", "0 00", "00 abc", "9223372036854775807 0",
+    "+5 5", "1 2", "10 010",
+]
+
+
+def _write(path, lines):
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+def _loads(filepath, monkeypatch, **kwargs):
+    """The same file read in one chunk, in tiny chunks, and split into byte ranges across workers."""
+    results = {'single_chunk': read_edge_list(filepath, **kwargs)}
+    for chunk_rows in (1, 2, 5):
+        results[f'chunks_of_{chunk_rows}'] = read_edge_list(filepath, chunk_rows=chunk_rows, **kwargs)
+    monkeypatch.setattr(edge_loader, '_MIN_RANGE_BYTES', 16)
+    results['parallel'] = read_edge_list(filepath, chunk_rows=2, workers=3, **kwargs)
+    return results
+
+
+def _assert_identical(results):
+    reference = results['single_chunk']
+    for name, edges in results.items():
+        assert edges.nodes == reference.nodes, name
+        assert np.array_equal(edges.src, reference.src), name
+        assert np.array_equal(edges.dst, reference.dst), name
+        assert edges.attributes.keys() == reference.attributes.keys(), name
+        for column, values in reference.attributes.items():
+            assert np.array_equal(edges.attributes[column], values), name
+
+
+def test_ids_keep_their_text_across_chunk_boundaries(tmp_path, monkeypatch):
+    filepath = _write(tmp_path / "mixed.txt", MIXED_LINES)
+    results = _loads(filepath, monkeypatch, delimiter=" ")
+    _assert_identical(results)
+    
+    edges = results['single_chunk']
+    assert edges.nodes == ['1', '2', '3', '7', '10', '4', '5', '6', '007', '07', 'abc', '0', '00',
+                           '9223372036854775807', '+5', '010']
+    pairs = [(edges.nodes[u], edges.nodes[v]) for u, v in zip(edges.src.tolist(), edges.dst.tolist())]
+    assert pairs == [tuple(line.split()) for line in MIXED_LINES[1:]]
+
+
+def test_integer_ids(tmp_path, monkeypatch):
+    lines = [f"{(i * 7919) % 503} {(i * 104729) % 509}" for i in range(400)]
+    filepath = _write(tmp_path / "ints.txt", lines)
+    results = _loads(filepath, monkeypatch, delimiter=" ")
+    _assert_identical(results)
+    
+    G = results['parallel'].to_networkx()
+    expected = nx.parse_edgelist(lines, nodetype=str)
+    assert set(G.nodes()) == set(expected.nodes())
+    assert {frozenset(edge) for edge in G.edges()} == {frozenset(edge) for edge in expected.edges()}
+
+
+def test_zero_padded_ids_stay_text(tmp_path, monkeypatch):
+    filepath = _write(tmp_path / "padded.txt", ["001 002", "002 003", "1 2", "003 001"])
+    results = _loads(filepath, monkeypatch, delimiter=" ")
+    _assert_identical(results)
+    assert results['single_chunk'].nodes == ['001', '002', '003', '1', '2']
+
+
+def test_header_columns_and_weights(tmp_path, monkeypatch):
+    lines = ["src,dst,weight,label"] + [f"{i % 9},{'n%d' % i if i > 30 else (i * 5) % 11},{i / 4},x{i}" for i in range(60)]
+    lines.insert(20, "4,,1.5,missing")
+    filepath = _write(tmp_path / "edges.csv", lines)
+    results = _loads(filepath, monkeypatch, source_col="src", target_col="dst", weight_col="weight")
+    _assert_identical(results)
+    
+    edges = results['single_chunk']
+    assert edges.num_edges == 60
+    assert edges.attributes['weight'].tolist() == [i / 4 for i in range(60)]
+    assert edges.attributes['label'].tolist() == [f"x{i}" for i in range(60)]
+
+
+def test_edge_stream_matches_read_edge_list(tmp_path):
+    filepath = _write(tmp_path / "mixed.txt", MIXED_LINES)
+    reference = read_edge_list(filepath, delimiter=" ")
+    for chunk_rows in (1, 3, 100):
+        stream = EdgeStream(filepath, delimiter=" ", chunk_rows=chunk_rows)
+        chunks = list(stream)
+        assert np.array_equal(np.concatenate([src for src, _ in chunks]), reference.src)
+        assert np.array_equal(np.concatenate([dst for _, dst in chunks]), reference.dst)
+        assert stream.nodes() == reference.nodes
+        assert stream.num_nodes == len(reference.nodes)
+
+
+def test_integer_stream_keeps_numeric_ids(tmp_path):
+    filepath = _write(tmp_path / "ints.txt", ["3 1", "1 20", "20 3", "5 3"])
+    stream = EdgeStream(filepath, delimiter=" ", chunk_rows=1)
+    list(stream)
+    assert stream.values().dtype == np.int64
+    assert stream.values().tolist() == [3, 1, 20, 5]
+    assert stream.nodes() == ['3', '1', '20', '5']
+
+
+def test_missing_column(tmp_path):
+    filepath = _write(tmp_path / "edges.csv", ["a,b", "1,2"])
+    with pytest.raises(ValueError):
+        read_edge_list(filepath, source_col="a", target_col="c")
+
+
+def _iterrows_loader(filepath, source_col=0, target_col=1, weight_col=None, directed=False, delimiter=","):
+    """The row-by-row CSV loader that ``read_edge_list`` replaced in ``real_world_analysis``."""
+    df = pd.read_csv(filepath, delimiter=delimiter, comment='#', header=None)
+    G = nx.DiGraph() if directed else nx.Graph()
+    for _, row in df.iterrows():
+        source = str(row[source_col])
+        target = str(row[target_col])
+        if weight_col is not None and isinstance(weight_col, int) and weight_col < len(df.columns):
+            G.add_edge(source, target, weight=float(row[weight_col]))
+        else:
+            G.add_edge(source, target)
+    return G
+
+
+def _assert_same_graph(G, expected):
+    assert sorted(G.nodes()) == sorted(expected.nodes())
+    assert G.number_of_edges() == expected.number_of_edges()
+    for u, v, data in expected.edges(data=True):
+        assert G.has_edge(u, v)
+        assert G.edges[u, v] == data
+
+
+@pytest.mark.parametrize('directed', [False, True])
+def test_matches_iterrows_loader_on_weighted_edges(tmp_path, directed):
+    rng = np.random.default_rng(3)
+    # String IDs: the old loader turned integer IDs next to a float weight into "1.0"
+    lines = ["# user interactions"] + [f"u{a},u{b},{w:.3f}" for a, b, w in zip(
+        rng.integers(40, size=300), rng.integers(40, size=300), rng.random(300) * 10)]
+    lines += ["u3,u3,2.5", "u1,u2,7.0", "u2,u1,9.5"]
+    filepath = _write(tmp_path / "weighted.csv", lines)
+    
+    edges = read_edge_list(filepath, weight_col=2, chunk_rows=37)
+    _assert_same_graph(edges.to_networkx(directed), _iterrows_loader(filepath, weight_col=2, directed=directed))
+
+
+def test_matches_iterrows_loader_on_integer_ids(tmp_path):
+    lines = [f"{i % 17}\t{(i * 5) % 23}\t{i % 4}" for i in range(200)]
+    filepath = _write(tmp_path / "ints.tsv", lines)
+    edges = read_edge_list(filepath, weight_col=2, delimiter="\t", chunk_rows=16)
+    _assert_same_graph(edges.to_networkx(), _iterrows_loader(filepath, weight_col=2, delimiter="\t"))
+    _assert_same_graph(read_edge_list(filepath, delimiter="\t").to_networkx(),
+                       _iterrows_loader(filepath, delimiter="\t"))
+
+
+@pytest.mark.parametrize('trailing_newline', [True, False])
+def test_byte_ranges_start_at_line_starts(tmp_path, trailing_newline):
+    # Uneven line lengths, one line long enough to hold several nominal split points
+    lines = ["# header comment", "src dst"] + [f"{i} {'x' * (i % 13)}{i * 7}" for i in range(60)]
+    lines.insert(30, "long " + "y" * 400)
+    data = ("\n".join(lines) + ("\n" if trailing_newline else "")).encode()
+    filepath = tmp_path / "ranges.txt"
+    filepath.write_bytes(data)
+    start = edge_loader._data_start(str(filepath), "#")
+    assert data[:start] == b"# header comment\nsrc dst\n"
+    
+    for count in (1, 2, 3, 7, 16, 64, 1000):
+        ranges = edge_loader._byte_ranges(str(filepath), start, len(data), count)
+        assert 1 <= len(ranges) <= count
+        assert ranges[0][0] == start and ranges[-1][1] == len(data)
+        assert all(end == next_start for (_, end), (next_start, _) in zip(ranges, ranges[1:]))
+        assert all(a < b for a, b in ranges)
+        assert all(data[a - 1:a] == b"\n" for a, _ in ranges)
+        assert b"".join(data[a:b] for a, b in ranges) == data[start:]
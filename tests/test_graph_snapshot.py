@@ -0,0 +1,79 @@
+"""Snapshot round trips and the freshness check that lets a snapshot stand in for its source file."""
+import os
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from csr_graph import CSRGraph
+from graph_snapshot import load_snapshot, save_snapshot, snapshot_is_current
+
+
+def _edges_with_data(G: nx.Graph):
+    return sorted((str(u), str(v), sorted(data.items())) for u, v, data in G.edges(data=True))
+
+
+@pytest.mark.parametrize('directed', [False, True])
+def test_round_trip(tmp_path, directed):
+    G = nx.les_miserables_graph()
+    G = G.to_directed() if directed else G
+    G.graph['name'] = 'les mis'
+    G.nodes['Valjean']['role'] = 'lead'
+    path = str(tmp_path / 'graph.gsnap')
+    save_snapshot(path, G, info={'source': 'test'})
+    
+    snapshot = load_snapshot(path)
+    H = snapshot.to_networkx()
+    assert H.is_directed() == directed
+    assert list(H.nodes(data=True)) == list(G.nodes(data=True))
+    assert _edges_with_data(H) == _edges_with_data(G)
+    assert H.graph == G.graph
+    assert snapshot.info == {'source': 'test'}
+    csr = CSRGraph.from_networkx(G.to_undirected())
+    assert np.array_equal(snapshot.csr.indptr, csr.indptr)
+    assert np.array_equal(snapshot.csr.indices, csr.indices)
+
+
+def test_current_only_for_the_same_loader_options(tmp_path):
+    source = tmp_path / 'edges.txt'
+    source.write_text("1\t2\n2\t3\n")
+    path = str(tmp_path / 'edges.gsnap')
+    options = {'delimiter': '\t', 'source_col': 0, 'target_col': 1, 'weight_col': None, 'directed': False}
+    save_snapshot(path, nx.path_graph(3), source_options=options)
+    
+    assert snapshot_is_current(path, str(source), dict(options))
+    for name, value in (('delimiter', ','), ('source_col', 1), ('weight_col', 2), ('directed', True)):
+        assert not snapshot_is_current(path, str(source), {**options, name: value})
+    assert not snapshot_is_current(path, str(source), {})
+    assert not snapshot_is_current(path, str(source), {**options, 'comment': '%'})
+
+
+def test_options_compare_as_stored(tmp_path):
+    source = tmp_path / 'edges.txt'
+    source.write_text("1 2\n")
+    path = str(tmp_path / 'edges.gsnap')
+    save_snapshot(path, nx.path_graph(2), source_options={'columns': (0, 1)})
+    assert snapshot_is_current(path, str(source), {'columns': [0, 1]})
+    save_snapshot(path, nx.path_graph(2))
+    assert snapshot_is_current(path, str(source))
+    assert snapshot_is_current(path, str(source), {})
+
+
+def test_stale_missing_or_unreadable_snapshots(tmp_path):
+    source = tmp_path / 'edges.txt'
+    source.write_text("1 2\n")
+    path = str(tmp_path / 'edges.gsnap')
+    assert not snapshot_is_current(path, str(source))
+    
+    save_snapshot(path, nx.path_graph(2))
+    stat = os.stat(path)
+    os.utime(str(source), (stat.st_atime, stat.st_mtime + 10))
+    assert not snapshot_is_current(path, str(source))
+    
+    for contents in (b"", b"GSNAP", b"not a snapshot at all", b"GSNAP\x00\x00\x01" + b"\xff" * 8):
+        with open(path, 'wb') as handle:
+            handle.write(contents)
+        os.utime(path, (stat.st_atime, stat.st_mtime + 20))
+        assert not snapshot_is_current(path, str(source))
+        with pytest.raises(ValueError):
+            load_snapshot(path)
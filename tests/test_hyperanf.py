@@ -0,0 +1,61 @@
+"""HyperANF estimates against exact neighborhood functions."""
+import networkx as nx
+import numpy as np
+import pytest
+
+from csr_graph import CSRGraph
+import hyperanf
+
+
+def _anf_graph() -> nx.Graph:
+    G = nx.connected_watts_strogatz_graph(400, 6, 0.05, seed=12)
+    nx.add_path(G, range(1000, 1040))
+    return G
+
+
+def _exact_neighborhood(G: nx.Graph) -> np.ndarray:
+    """N(t) for t = 0..diameter: ordered pairs within distance t."""
+    distances = [d for _, lengths in nx.all_pairs_shortest_path_length(G) for d in lengths.values()]
+    return np.cumsum(np.bincount(distances)).astype(np.float64)
+
+
+def test_reach_within_sketch_error():
+    G = _anf_graph()
+    csr = CSRGraph.from_networkx(G)
+    nf = hyperanf.hyperanf(csr, precision=8, seed=3)
+    error = 1.04 / 2 ** (8 / 2)
+    
+    component_size = {node: len(component) for component in nx.connected_components(G) for node in component}
+    exact_reach = np.array([component_size[node] for node in csr.nodes], dtype=np.float64)
+    relative = np.abs(nf.reach - exact_reach) / exact_reach
+    assert np.median(relative) <= error
+    assert np.mean(relative <= 3 * error) >= 0.99
+    
+    exact = _exact_neighborhood(G)
+    assert len(nf.neighborhood) <= len(exact)
+    assert nf.iterations <= max(nx.diameter(G.subgraph(c)) for c in nx.connected_components(G))
+    steps = min(len(nf.neighborhood), len(exact))
+    assert np.all(np.abs(nf.neighborhood[:steps] - exact[:steps]) <= error * exact[:steps])
+    
+    summary = hyperanf.summarize_neighborhood_function(nf)
+    assert summary['relative_standard_error'] == pytest.approx(error)
+    exact_nf = hyperanf.NeighborhoodFunction(exact, exact_reach, 8, len(exact) - 1)
+    assert summary['effective_diameter'] == pytest.approx(hyperanf.effective_diameter(exact_nf), abs=1.0)
+    assert summary['average_distance'] == pytest.approx(hyperanf.average_distance(exact_nf), rel=error)
+
+
+def test_exact_neighborhood_summaries():
+    # On a path of 5 nodes: N = 5, 13, 19, 23, 25
+    nf = hyperanf.NeighborhoodFunction(np.array([5.0, 13.0, 19.0, 23.0, 25.0]), np.full(5, 5.0), 6, 4)
+    assert hyperanf.average_distance(nf) == pytest.approx((8 * 1 + 6 * 2 + 4 * 3 + 2 * 4) / 20)
+    assert hyperanf.effective_diameter(nf, quantile=0.7) == pytest.approx(2.0)
+
+
+def test_hyperanf_is_seeded():
+    csr = CSRGraph.from_networkx(_anf_graph())
+    first = hyperanf.hyperanf(csr, precision=6, seed=5)
+    again = hyperanf.hyperanf(csr, precision=6, seed=5)
+    assert np.array_equal(first.neighborhood, again.neighborhood)
+    assert np.array_equal(first.reach, again.reach)
+    with pytest.raises(ValueError):
+        hyperanf.hyperanf(csr, precision=3)
@@ -0,0 +1,149 @@
+"""IncrementalMetrics against NetworkX under random edits, and the analyzer's stale-metric contract."""
+import gc
+import random
+import weakref
+
+import networkx as nx
+import pytest
+
+from csr_graph import CSRGraph
+from graph_tools import SocialGraphAnalyzer
+from incremental_metrics import IncrementalMetrics
+
+
+def _assert_matches_networkx(state: IncrementalMetrics, G: nx.Graph) -> None:
+    components = list(nx.connected_components(G))
+    assert state.num_nodes == G.number_of_nodes()
+    assert state.num_components == len(components)
+    assert state.largest_component_size == max(map(len, components), default=0)
+    assert sorted(map(sorted, state.members.values())) == sorted(map(sorted, components))
+    assert all(state.members[state.component[node]] == component for component in components for node in component)
+    
+    simple = G.copy()
+    simple.remove_edges_from(list(nx.selfloop_edges(simple)))
+    assert state.degree == dict(simple.degree())
+    assert state.degree_centrality() == pytest.approx(nx.degree_centrality(G))
+    assert state.triangles == nx.triangles(G)
+    assert state.total_triangles == sum(nx.triangles(G).values()) // 3
+    assert state.transitivity == pytest.approx(nx.transitivity(G))
+    assert state.average_clustering == pytest.approx(nx.average_clustering(G) if len(G) else 0.0)
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_random_edits_match_networkx(seed):
+    rng = random.Random(seed)
+    G = nx.gnp_random_graph(30, 0.12, seed=seed)
+    state = IncrementalMetrics(G)
+    _assert_matches_networkx(state, G)
+    next_node = G.number_of_nodes()
+    
+    for _ in range(300):
+        nodes = list(G)
+        edges = list(G.edges())
+        action = rng.random()
+        if action < 0.45 or len(nodes) < 2:
+            if rng.random() < 0.1:
+                u = v = rng.choice(nodes) if nodes else next_node
+            else:
+                u, v = rng.sample(nodes + [next_node], 2)
+            next_node += max(u, v) == next_node
+            state.add_edge(u, v)
+        elif action < 0.8 and edges:
+            state.remove_edge(*rng.choice(edges))
+        elif action < 0.9:
+            state.add_node(next_node)
+            next_node += 1
+        else:
+            state.remove_node(rng.choice(nodes))
+        _assert_matches_networkx(state, G)
+
+
+def test_remove_missing_edge_raises():
+    state = IncrementalMetrics(nx.path_graph(3))
+    with pytest.raises(nx.NetworkXError):
+        state.remove_edge(0, 2)
+    with pytest.raises(nx.NetworkXError):
+        state.remove_node(7)
+
+
+def test_edits_through_analyzer_mark_expensive_metrics_stale():
+    G = nx.karate_club_graph()
+    analyzer = SocialGraphAnalyzer(G, workers=1)
+    closeness = analyzer.get_metric('closeness_centrality')
+    betweenness = analyzer.get_metric('betweenness_centrality')
+    assert analyzer.stale_metrics == []
+    
+    analyzer.add_edges([(0, 9), (16, 26)])
+    analyzer.remove_edges([(0, 1)])
+    assert set(analyzer.stale_metrics) >= {'closeness_centrality', 'betweenness_centrality',
+                                          'betweenness_approximation'}
+    assert analyzer.get_metric('closeness_centrality') == closeness
+    assert analyzer.get_metric('betweenness_centrality') == betweenness
+    # Maintained metrics are current
+    assert analyzer.get_metric('degree_centrality') == pytest.approx(nx.degree_centrality(G))
+    assert analyzer.get_metric('num_connected_components') == nx.number_connected_components(G)
+    
+    analyzer.remove_nodes([33])
+    assert 33 not in analyzer.get_metric('closeness_centrality')
+    assert 33 not in analyzer.get_metric('betweenness_centrality')
+    
+    analyzer.refresh_stale_metrics()
+    assert analyzer.stale_metrics == []
+    assert analyzer.get_metric('closeness_centrality') == pytest.approx(nx.closeness_centrality(G))
+    assert analyzer.get_metric('betweenness_centrality') == pytest.approx(nx.betweenness_centrality(G))
+
+
+def test_direct_edits_invalidate_maintained_metrics():
+    G = nx.path_graph(5)
+    analyzer = SocialGraphAnalyzer(G, workers=1)
+    analyzer.get_metric('closeness_centrality')
+    analyzer.add_edges([(0, 2)])
+    assert analyzer.stale_metrics == ['closeness_centrality']
+    
+    # Same node and edge counts, edited behind the analyzer's back
+    G.remove_edge(1, 2)
+    G.add_edge(0, 4)
+    assert analyzer.stale_metrics == []
+    assert analyzer.get_metric('closeness_centrality') == pytest.approx(nx.closeness_centrality(G))
+    assert analyzer.get_metric('num_connected_components') == nx.number_connected_components(G)
+    analyzer.add_edges([(3, 0)])
+    assert analyzer.get_metric('degree_centrality') == pytest.approx(nx.degree_centrality(G))
+    assert analyzer.get_metric('average_clustering') == pytest.approx(nx.average_clustering(G))
+
+
+def test_edits_do_not_rebuild_graph_wide_state(monkeypatch):
+    G = nx.barabasi_albert_graph(3000, 4, seed=2)
+    analyzer = SocialGraphAnalyzer(G, workers=1)
+    analyzer.add_edges([(0, 1)])
+    
+    def rebuilt(*args, **kwargs):
+        raise AssertionError("graph-wide state rebuilt after a small edit")
+    for name in ('from_networkx', 'triangles', 'clustering', 'connected_components', 'degree'):
+        monkeypatch.setattr(CSRGraph, name, rebuilt)
+    monkeypatch.setattr(IncrementalMetrics, '__init__', rebuilt)
+    
+    analyzer.add_edges([(10, 2000), (2000, 2001), (7, 8)])
+    analyzer.remove_edges([(10, 2000)])
+    analyzer.remove_nodes([2999])
+    metrics = analyzer.calculate_comprehensive_metrics(fields=['components', 'clustering', 'degree_centrality'])
+    monkeypatch.undo()
+    
+    assert metrics.num_connected_components == nx.number_connected_components(G)
+    assert metrics.clustering_coefficient == pytest.approx(nx.transitivity(G))
+    assert metrics.average_clustering == pytest.approx(nx.average_clustering(G))
+    assert metrics.degree_centrality == pytest.approx(nx.degree_centrality(G))
+
+
+def test_graph_is_freed_after_edits():
+    G = nx.karate_club_graph()
+    graph_ref = weakref.ref(G)
+    analyzer = SocialGraphAnalyzer(G, workers=1)
+    analyzer.calculate_comprehensive_metrics(fields=['centrality', 'components'])
+    analyzer.add_edges([(0, 9)])
+    analyzer.remove_edges([(0, 1)])
+    analyzer.remove_nodes([5])
+    assert analyzer.get_metric('num_connected_components') == nx.number_connected_components(G)
+    
+    del G, analyzer
+    gc.collect()
+    assert graph_ref() is None
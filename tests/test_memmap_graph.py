@@ -0,0 +1,46 @@
+"""The on-disk CSR store matches the in-memory loader and is reused only for the same file and options."""
+import os
+
+import networkx as nx
+import numpy as np
+
+from edge_loader import read_edge_list
+from memmap_graph import MemmapGraph, build_csr_store, open_csr_store, store_is_current
+
+
+LINES = ["# comment", "1 2", "2 3", "3 1", "007 7", "7 7", "abc 2", "2 1", "8 9"]
+
+
+def test_store_matches_edge_list(tmp_path):
+    source = tmp_path / "edges.txt"
+    source.write_text("\n".join(LINES) + "\n")
+    store = str(tmp_path / "edges.csrstore")
+    build_csr_store(str(source), store, delimiter=" ", chunk_rows=2)
+    
+    csr, reference = open_csr_store(store), read_edge_list(str(source), delimiter=" ").to_csr()
+    assert csr.nodes == reference.nodes
+    for name in ('indptr', 'indices', 'self_loops'):
+        assert np.array_equal(getattr(csr, name), getattr(reference, name))
+    
+    G = MemmapGraph(csr)
+    expected = nx.parse_edgelist(LINES[1:], nodetype=str)
+    assert set(G.nodes()) == set(expected.nodes())
+    assert G.number_of_edges() == expected.number_of_edges()
+    assert {frozenset(edge) for edge in G.edges()} == {frozenset(edge) for edge in expected.edges()}
+
+
+def test_store_reused_only_for_the_same_options(tmp_path):
+    source = tmp_path / "edges.csv"
+    source.write_text("a,b,c\n1,2,3\n2,3,4\n")
+    store = str(tmp_path / "edges.csrstore")
+    assert not store_is_current(store, str(source), "a", "b")
+    
+    build_csr_store(str(source), store, "a", "b")
+    assert store_is_current(store, str(source), "a", "b")
+    assert not store_is_current(store, str(source), "a", "c")
+    assert not store_is_current(store, str(source), "a", "b", delimiter=";")
+    assert not store_is_current(store, str(source))
+    
+    stat = os.stat(os.path.join(store, "meta.json"))
+    os.utime(str(source), (stat.st_atime, stat.st_mtime + 10))
+    assert not store_is_current(store, str(source), "a", "b")
@@ -0,0 +1,63 @@
+"""The shared per-graph metrics cache and when it has to recompute."""
+import networkx as nx
+import pytest
+
+from graph_tools import SocialGraphAnalyzer
+from metrics_cache import MetricsCache, get_metrics_cache, invalidate_metrics_cache
+
+
+def _counting_compute(calls: list, value):
+    def compute():
+        calls.append(value)
+        return value
+    return compute
+
+
+def test_values_are_computed_once_per_graph_state():
+    G = nx.path_graph(4)
+    cache, calls = MetricsCache(), []
+    assert cache.get('a', G, _counting_compute(calls, 1)) == 1
+    assert cache.get('a', G, _counting_compute(calls, 2)) == 1
+    assert cache.peek('b', G) is None
+    cache.put('b', G, 5)
+    assert cache.peek('b', G) == 5
+    assert calls == [1]
+    
+    cache.invalidate(['a'])
+    assert cache.get('a', G, _counting_compute(calls, 3)) == 3
+    assert cache.peek('b', G) == 5
+
+
+def test_in_place_edits_with_the_same_counts_invalidate():
+    G = nx.path_graph(5)
+    cache, calls = MetricsCache(), []
+    cache.get('degree', G, _counting_compute(calls, dict(G.degree())))
+    # Same node and edge counts as before
+    G.remove_edge(1, 2)
+    G.add_edge(0, 2)
+    assert cache.get('degree', G, _counting_compute(calls, dict(G.degree()))) == dict(G.degree())
+    assert len(calls) == 2
+
+
+def test_analyzers_of_one_graph_share_the_cache():
+    G = nx.karate_club_graph()
+    first, second = SocialGraphAnalyzer(G), SocialGraphAnalyzer(G)
+    assert first.metrics_cache is second.metrics_cache is get_metrics_cache(G)
+    assert get_metrics_cache(nx.karate_club_graph()) is not first.metrics_cache
+    
+    metrics = first.calculate_comprehensive_metrics()
+    assert first.metrics_cache.peek('degree_centrality', G) == metrics.degree_centrality
+    assert second.calculate_comprehensive_metrics().degree_centrality == metrics.degree_centrality
+    
+    G.add_edge(0, 'new')
+    assert second.calculate_comprehensive_metrics().degree_centrality == pytest.approx(nx.degree_centrality(G))
+
+
+def test_attribute_edits_need_an_explicit_invalidate():
+    G = nx.path_graph(3)
+    cache = get_metrics_cache(G)
+    cache.put('weight', G, 1)
+    G[0][1]['weight'] = 7
+    assert cache.peek('weight', G) == 1
+    invalidate_metrics_cache(G)
+    assert cache.peek('weight', G) is None
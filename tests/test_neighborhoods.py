@@ -0,0 +1,52 @@
+"""Batched k-hop neighborhood statistics against NetworkX ego graphs."""
+import networkx as nx
+import numpy as np
+import pytest
+
+from csr_graph import CSRGraph
+from graph_tools import SocialGraphAnalyzer
+
+
+def _neighborhood_graph() -> nx.Graph:
+    G = nx.les_miserables_graph()
+    G.add_edges_from([('Valjean', 'Valjean'), ('Napoleon', 'Napoleon')])
+    nx.add_path(G, ['a', 'b', 'c'])
+    G.add_node('alone')
+    return G
+
+
+@pytest.mark.parametrize("radius", [1, 2, 3])
+def test_analyze_neighborhoods_matches_ego_graph(radius):
+    G = _neighborhood_graph()
+    nodes = list(G)
+    results = SocialGraphAnalyzer(G).analyze_neighborhoods(nodes, radius, include_members=True)
+    assert list(results) == nodes
+    for node in nodes:
+        ego = nx.ego_graph(G, node, radius=radius)
+        result = results[node]
+        assert result['neighborhood_size'] == ego.number_of_nodes() - 1
+        assert result['degree'] == G.degree(node)
+        assert sorted(result['neighbors']) == sorted(set(ego) - {node})
+        assert result['subgraph_edges'] == ego.number_of_edges()
+        assert result['local_density'] == pytest.approx(nx.density(ego))
+        assert result['local_clustering'] == pytest.approx(nx.clustering(G, node))
+
+
+def test_single_node_neighborhood():
+    G = _neighborhood_graph()
+    result = SocialGraphAnalyzer(G).analyze_node_neighborhood('Myriel', radius=2)
+    assert set(result['neighbors']) == set(nx.ego_graph(G, 'Myriel', radius=2)) - {'Myriel'}
+    with pytest.raises(ValueError):
+        SocialGraphAnalyzer(G).analyze_neighborhoods(['Myriel', 'nobody'])
+
+
+def test_ego_stats_batches_and_repeated_sources():
+    G = nx.gnp_random_graph(120, 0.04, seed=8)
+    csr = CSRGraph.from_networkx(G)
+    sources = np.array([5, 0, 5, 119, 42], dtype=np.int64)
+    stats = csr.ego_stats(sources, radius=2, batch_size=2)
+    for i, source in enumerate(sources.tolist()):
+        ego = nx.ego_graph(G, csr.nodes[source], radius=2)
+        assert stats.size[i] == ego.number_of_nodes()
+        assert stats.edges[i] == ego.number_of_edges()
+        assert stats.density[i] == pytest.approx(nx.density(ego))
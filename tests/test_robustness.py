@@ -0,0 +1,114 @@
+"""Attack curves and percolation sweeps against brute-force node removal."""
+import networkx as nx
+import numpy as np
+import pytest
+
+from csr_graph import CSRGraph
+import robustness
+
+
+def _attack_graph() -> nx.Graph:
+    G = nx.karate_club_graph()
+    nx.add_path(G, [40, 41, 42])
+    G.add_node(50)
+    return G
+
+
+def _brute_force_curve(G: nx.Graph, removal: list) -> tuple:
+    H = G.copy()
+    largest, components = [], []
+    for i in range(len(removal) + 1):
+        sizes = [len(c) for c in nx.connected_components(H)]
+        largest.append(max(sizes, default=0))
+        components.append(len(sizes))
+        if i < len(removal):
+            H.remove_node(removal[i])
+    return largest, components
+
+
+def _brute_force_adaptive_order(G: nx.Graph, index: dict) -> list:
+    H = G.copy()
+    removal = []
+    while H:
+        # Highest remaining degree, lowest index among ties
+        node = max(H, key=lambda v: (H.degree(v), -index[v]))
+        removal.append(node)
+        H.remove_node(node)
+    return removal
+
+
+@pytest.mark.parametrize("strategy", ["degree", "betweenness", "adaptive_degree"])
+def test_attack_curve_matches_brute_force(strategy):
+    G = _attack_graph()
+    csr = CSRGraph.from_networkx(G)
+    if strategy == "degree":
+        order = robustness.degree_attack_order(csr)
+    elif strategy == "betweenness":
+        order = robustness.centrality_attack_order(csr, nx.betweenness_centrality(G))
+    else:
+        order = robustness.adaptive_degree_attack_order(csr)
+        assert [csr.nodes[i] for i in order] == _brute_force_adaptive_order(G, csr.index)
+    
+    removal = [csr.nodes[i] for i in order]
+    assert sorted(removal) == sorted(G)
+    largest, components = _brute_force_curve(G, removal)
+    curve = robustness.attack_curve(csr, order)
+    assert curve.largest_component.tolist() == largest
+    assert curve.components.tolist() == components
+    
+    n = G.number_of_nodes()
+    assert robustness.robustness_index(curve) == pytest.approx(sum(largest[1:]) / n ** 2)
+    halved = next(i for i, size in enumerate(largest) if 2 * size <= largest[0])
+    assert robustness.critical_fraction(curve) == pytest.approx(halved / n)
+
+
+def test_degree_order_breaks_ties_by_index():
+    csr = CSRGraph.from_networkx(nx.star_graph(4))
+    assert robustness.degree_attack_order(csr).tolist() == [0, 1, 2, 3, 4]
+
+
+def _brute_force_site_percolation(G: nx.Graph, occupation: list) -> list:
+    largest = [0]
+    for k in range(1, len(occupation) + 1):
+        largest.append(max(len(c) for c in nx.connected_components(G.subgraph(occupation[:k]))))
+    return largest
+
+
+def test_site_percolation_run_matches_brute_force():
+    G = _attack_graph()
+    csr = CSRGraph.from_networkx(G)
+    seed = np.random.SeedSequence(5).spawn(1)
+    curve_sum, curve_sq, thresholds = robustness._percolation_runs(csr, 'node', seed)
+    order = np.random.default_rng(seed[0]).permutation(csr.num_nodes)
+    expected = _brute_force_site_percolation(G, [csr.nodes[i] for i in order])
+    assert curve_sum.tolist() == expected
+    assert curve_sq.tolist() == [size ** 2 for size in expected]
+    assert len(thresholds) == 1
+
+
+def test_bond_percolation_ends_at_component_sizes():
+    G = _attack_graph()
+    curve = robustness.percolation_curve(CSRGraph.from_networkx(G), mode='edge', runs=5, seed=1)
+    assert len(curve.largest_mean) == G.number_of_edges() + 1
+    assert curve.largest_mean[0] == 1
+    assert curve.largest_mean[-1] == max(len(c) for c in nx.connected_components(G))
+    assert np.all(np.diff(curve.largest_mean) >= 0)
+
+
+@pytest.mark.parametrize("mode", ["node", "edge"])
+def test_percolation_independent_of_workers(mode):
+    csr = CSRGraph.from_networkx(nx.barabasi_albert_graph(200, 2, seed=3))
+    serial = robustness.percolation_curve(csr, mode=mode, runs=9, seed=11, workers=1)
+    parallel = robustness.percolation_curve(csr, mode=mode, runs=9, seed=11, workers=3)
+    assert np.array_equal(serial.largest_mean, parallel.largest_mean)
+    assert np.array_equal(serial.largest_std, parallel.largest_std)
+    assert np.array_equal(serial.thresholds, parallel.thresholds)
+    assert robustness.summarize_percolation(serial) == robustness.summarize_percolation(parallel)
+
+
+def test_percolation_rejects_bad_arguments():
+    csr = CSRGraph.from_networkx(nx.path_graph(4))
+    with pytest.raises(ValueError):
+        robustness.percolation_curve(csr, runs=0)
+    with pytest.raises(ValueError):
+        robustness.percolation_curve(csr, mode='site')
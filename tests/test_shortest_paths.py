@@ -0,0 +1,128 @@
+"""Parity of the BFS sweeps with NetworkX and across worker counts."""
+import networkx as nx
+import pytest
+
+from csr_graph import CSRGraph
+from graph_tools import SocialGraphAnalyzer
+import shortest_paths
+
+
+def _two_components() -> nx.Graph:
+    G = nx.barabasi_albert_graph(300, 3, seed=1)
+    nx.add_path(G, range(1000, 1006))
+    return G
+
+
+@pytest.mark.parametrize("G", [nx.karate_club_graph(), _two_components(), nx.empty_graph(3)])
+def test_sweep_matches_networkx_centrality(G):
+    csr = CSRGraph.from_networkx(G)
+    sweep = shortest_paths.all_sources_sweep(csr)
+    assert shortest_paths.betweenness_from_sweep(csr, sweep) == pytest.approx(nx.betweenness_centrality(G))
+    assert shortest_paths.closeness_from_sweep(csr, sweep) == pytest.approx(nx.closeness_centrality(G))
+
+
+def test_sweep_matches_networkx_aspl_and_diameter():
+    G = nx.connected_watts_strogatz_graph(200, 6, 0.1, seed=3)
+    csr = CSRGraph.from_networkx(G)
+    sweep = shortest_paths.all_sources_sweep(csr, betweenness=False)
+    assert shortest_paths.average_shortest_path_length_from_sweep(csr, sweep) == pytest.approx(
+        nx.average_shortest_path_length(G))
+    assert shortest_paths.diameter_from_sweep(sweep) == nx.diameter(G)
+    
+    analyzer = SocialGraphAnalyzer(G, workers=1)
+    analyzer.get_metric('closeness_centrality')
+    assert analyzer.get_metric('average_shortest_path_length') == pytest.approx(nx.average_shortest_path_length(G))
+
+
+@pytest.mark.parametrize("workers", [2, 3])
+def test_workers_match_serial_sweep(workers):
+    csr = CSRGraph.from_networkx(_two_components())
+    assert (shortest_paths.betweenness_centrality(csr, workers=workers)
+            == shortest_paths.betweenness_centrality(csr, workers=1))
+    assert (shortest_paths.closeness_centrality(csr, workers=workers)
+            == shortest_paths.closeness_centrality(csr, workers=1))
+
+
+@pytest.mark.parametrize("G", [
+    nx.karate_club_graph(),
+    nx.path_graph(9),
+    nx.cycle_graph(12),
+    nx.barabasi_albert_graph(300, 2, seed=6),
+    nx.connected_watts_strogatz_graph(200, 4, 0.05, seed=2),
+])
+def test_diameter_and_radius_match_networkx(G):
+    diameter, radius, runs = shortest_paths.diameter_and_radius(CSRGraph.from_networkx(G))
+    assert (diameter, radius) == (nx.diameter(G), nx.radius(G))
+    assert 1 <= runs <= G.number_of_nodes()
+
+
+def test_diameter_and_radius_of_source_component():
+    G = _two_components()
+    csr = CSRGraph.from_networkx(G)
+    path = G.subgraph(range(1000, 1006))
+    assert shortest_paths.diameter_and_radius(csr, csr.index[1000])[:2] == (nx.diameter(path), nx.radius(path))
+    
+    analyzer = SocialGraphAnalyzer(G, workers=1)
+    assert analyzer.get_metric('diameter') is None
+    assert analyzer.get_metric('radius') is None
+
+
+def test_aspl_reports_largest_component_exactly():
+    G = _two_components()
+    largest = G.subgraph(max(nx.connected_components(G), key=len))
+    estimate = shortest_paths.estimate_average_shortest_path_length(CSRGraph.from_networkx(G), sample_budget=500)
+    assert estimate["exact"] and estimate["scope"] == "largest_component"
+    assert estimate["population"] == largest.number_of_nodes()
+    assert estimate["mean"] == pytest.approx(nx.average_shortest_path_length(largest))
+    
+    analyzer = SocialGraphAnalyzer(G, workers=1)
+    assert analyzer.get_metric('average_shortest_path_length') == pytest.approx(estimate["mean"])
+
+
+def test_sampled_aspl_interval_contains_exact_value():
+    G = nx.connected_watts_strogatz_graph(800, 6, 0.05, seed=9)
+    estimate = shortest_paths.estimate_average_shortest_path_length(CSRGraph.from_networkx(G), sample_budget=100,
+                                                                    seed=4)
+    assert not estimate["exact"] and estimate["samples"] == 100
+    assert estimate["stderr"] > 0
+    low, high = estimate["ci95"]
+    assert low <= nx.average_shortest_path_length(G) <= high
+    assert estimate["mean"] == shortest_paths.estimate_average_shortest_path_length(
+        CSRGraph.from_networkx(G), sample_budget=100, seed=4)["mean"]
+
+
+
+@pytest.mark.parametrize("G", [nx.karate_club_graph(), _two_components(), nx.cycle_graph(10)])
+@pytest.mark.parametrize("k", [1, 5, 20])
+def test_top_k_closeness_matches_full_ranking(G, k):
+    csr = CSRGraph.from_networkx(G)
+    closeness = shortest_paths.closeness_from_sweep(csr, shortest_paths.all_sources_sweep(csr, betweenness=False))
+    assert shortest_paths.top_k_closeness(csr, k) == sorted(closeness.items(), key=lambda item: -item[1])[:k]
+
+
+def test_single_source_paths_are_shortest_paths():
+    G = _two_components()
+    csr = CSRGraph.from_networkx(G)
+    source = 7
+    paths = shortest_paths.single_source_paths(csr, csr.index[source])
+    lengths = nx.single_source_shortest_path_length(G, source)
+    assert len(paths) == len(lengths)
+    assert set(paths) == set(lengths)
+    distances = [paths.distance(node) for node in paths]
+    assert distances == sorted(distances)
+    for node, length in lengths.items():
+        assert paths.distance(node) == length
+        assert paths[node] in list(nx.all_shortest_paths(G, source, node))
+    
+    assert 1003 not in paths and paths.distance(1003) is None and paths.path_to(1003) is None
+    with pytest.raises(KeyError):
+        paths[1003]
+    
+    summary = paths.summary()
+    assert summary['reachable_nodes'] == len(lengths)
+    assert summary['eccentricity'] == max(lengths.values())
+    assert summary['average_distance'] == pytest.approx(sum(lengths.values()) / (len(lengths) - 1))
+    assert sum(summary['distance_histogram'].values()) == len(lengths)
+    
+    result = SocialGraphAnalyzer(G).find_shortest_paths(source)
+    assert result['paths'][1] == paths[1] and result['reachable_nodes'] == len(lengths)